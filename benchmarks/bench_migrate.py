@@ -0,0 +1,256 @@
+"""
+Benchmark the migration CLI’s rewriting with pyperf, on a generated corpus
+of test files.
+
+Run with:
+
+    python benchmarks/bench_migrate.py -o results.json
+
+See benchmarks/README.rst for how to compare results.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from collections.abc import Callable
+
+import pyperf
+from tokenize_rt import src_to_tokens
+
+from time_machine.cli import (
+    ast_parse,
+    migrate_contents,
+    rewrite_all,
+    rewrite_spans,
+    visit,
+)
+
+# Seed for generating the corpus, so every run measures the same files.
+SEED = 20240101
+
+DESTINATIONS = [
+    '"2020-01-01"',
+    '"2020-02-29 12:30:00"',
+    "dt.datetime(2021, 6, 1, tzinfo=dt.timezone.utc)",
+    "dt.date(2022, 1, 1)",
+    "0",
+]
+
+HEADERS = [
+    "import freezegun\n",
+    "from freezegun import freeze_time\n",
+    "import pytest\n",
+    "from unittest import TestCase, mock\n",
+    "import datetime as dt\n",
+    "import time\n",
+]
+
+# Test bodies, each taking an indent and a destination. Most use freezegun
+# in a form the migrator handles, but some use forms it leaves alone, as in
+# real codebases.
+TEMPLATES = [
+    # Plain code, with nothing to migrate.
+    (
+        "{i}def test_plain_{n}():\n"
+        "{i}    values = {{'a': 1, 'b': [1, 2, 3], 'c': ('x', 'y')}}\n"
+        "{i}    for key, value in values.items():\n"
+        "{i}        if isinstance(value, list):\n"
+        "{i}            assert sum(value) == 6\n"
+        "{i}    assert '''freeze\n"
+        "{i}    time''' != 'patch'\n"
+    ),
+    (
+        "{i}@freeze_time({d})\n"
+        "{i}def test_decorator_{n}():\n"
+        "{i}    assert dt.date.today().year > 2000\n"
+    ),
+    (
+        "{i}@freeze_time({d}, tick=True)\n"
+        "{i}def test_decorator_tick_{n}():\n"
+        "{i}    assert time.time() > 0\n"
+    ),
+    (
+        "{i}@freeze_time({d}, tz_offset=-4)\n"
+        "{i}def test_decorator_unsupported_{n}():\n"
+        "{i}    assert time.time() > 0\n"
+    ),
+    (
+        "{i}def test_context_manager_{n}():\n"
+        "{i}    with freeze_time({d}):\n"
+        "{i}        assert time.time() > 0\n"
+        "{i}        with freezegun.freeze_time({d}):\n"
+        "{i}            assert dt.datetime.now().year > 2000\n"
+    ),
+    (
+        "{i}def test_context_manager_as_{n}():\n"
+        "{i}    with freeze_time({d}) as frozen:\n"
+        "{i}        frozen.tick()\n"
+        "{i}        frozen.tick(dt.timedelta(seconds=10))\n"
+        "{i}        frozen.move_to({d})\n"
+    ),
+    (
+        "{i}@pytest.mark.freeze_time({d})\n"
+        "{i}def test_marker_{n}(freezer):\n"
+        "{i}    freezer.move_to({d})\n"
+        "{i}    freezer.tick(\n"
+        "{i}        delta=dt.timedelta(hours=1),\n"
+        "{i}    )\n"
+    ),
+    (
+        "{i}def test_freezer_{n}(freezer):\n"
+        "{i}    freezer.move_to({d})\n"
+        "{i}    for _ in range(3):\n"
+        "{i}        freezer.tick()\n"
+        "{i}    assert dt.datetime.now() == dt.datetime.now()\n"
+    ),
+    (
+        "{i}def test_mock_patch_{n}():\n"
+        "{i}    with mock.patch('time.time', return_value=1.5):\n"
+        "{i}        assert time.time() == 1.5\n"
+    ),
+    (
+        "{i}def test_manual_start_{n}():\n"
+        "{i}    freezer = freeze_time({d})\n"
+        "{i}    freezer.start()\n"
+        "{i}    try:\n"
+        "{i}        assert time.time() > 0\n"
+        "{i}    finally:\n"
+        "{i}        freezer.stop()\n"
+    ),
+]
+
+# Deepest level of nested classes in generated files.
+MAX_DEPTH = 4
+
+
+def generate_corpus(count: int) -> list[str]:
+    """
+    Generate the given number of test files, of varying lengths.
+    """
+    rng = random.Random(SEED)
+    return [generate_file(rng) for _ in range(count)]
+
+
+def generate_file(rng: random.Random) -> str:
+    parts = list(HEADERS)
+    counter = 0
+
+    def add_tests(indent: str, count: int) -> None:
+        nonlocal counter
+        for _ in range(count):
+            counter += 1
+            template = rng.choice(TEMPLATES)
+            parts.append("\n")
+            parts.append(
+                template.format(i=indent, n=counter, d=rng.choice(DESTINATIONS))
+            )
+
+    def add_class(indent: str, depth: int) -> None:
+        nonlocal counter
+        counter += 1
+        parts.append("\n\n")
+        if rng.random() < 0.3:
+            parts.append(f"{indent}@freeze_time({rng.choice(DESTINATIONS)})\n")
+        parts.append(f"{indent}class Test{counter}(TestCase):\n")
+        inner = indent + "    "
+        add_tests(inner, rng.randint(1, 6))
+        if depth < MAX_DEPTH and rng.random() < 0.5:
+            add_class(inner, depth + 1)
+
+    for _ in range(rng.randint(1, 8)):
+        if rng.random() < 0.5:
+            add_class("", 1)
+        else:
+            add_tests("", rng.randint(1, 10))
+    return "".join(parts)
+
+
+def time_phase(
+    loops: int, func: Callable[..., object], inputs: list[tuple[object, ...]]
+) -> float:
+    """
+    Time calling func over all inputs, loops times.
+    """
+    range_it = range(loops)
+    start = time.perf_counter()
+    for _ in range_it:
+        for args in inputs:
+            func(*args)
+    return time.perf_counter() - start
+
+
+def add_benchmarks(runner: pyperf.Runner, name: str, corpus: list[str]) -> None:
+    trees = [ast_parse(contents) for contents in corpus]
+    callbacks = [visit(tree) for tree in trees]
+    changed = [
+        (contents, tree, funcs)
+        for contents, tree, funcs in zip(corpus, trees, callbacks)
+        if funcs
+    ]
+
+    runner.bench_time_func(
+        f"migrate_contents() {name}",
+        time_phase,
+        migrate_contents,
+        [(contents,) for contents in corpus],
+    )
+    runner.bench_time_func(
+        f"ast_parse() {name}",
+        time_phase,
+        ast_parse,
+        [(contents,) for contents in corpus],
+    )
+    runner.bench_time_func(
+        f"visit() {name}",
+        time_phase,
+        visit,
+        [(tree,) for tree in trees],
+    )
+    # The rewriting phases only run on files with callbacks.
+    runner.bench_time_func(
+        f"src_to_tokens() {name}",
+        time_phase,
+        src_to_tokens,
+        [(contents,) for contents, _, _ in changed],
+    )
+    runner.bench_time_func(
+        f"rewrite_spans() {name}",
+        time_phase,
+        rewrite_spans,
+        changed,
+    )
+    runner.bench_time_func(
+        f"rewrite_all() {name}",
+        time_phase,
+        rewrite_all,
+        [(contents, funcs) for contents, _, funcs in changed],
+    )
+
+
+def add_cmdline_args(cmd: list[str], args: argparse.Namespace) -> None:
+    # Pass the corpus size on to pyperf’s worker processes.
+    cmd.extend(("--files", str(args.files)))
+
+
+def main() -> None:
+    runner = pyperf.Runner(add_cmdline_args=add_cmdline_args)
+    runner.metadata["description"] = "time-machine migration CLI benchmarks"
+    runner.argparser.add_argument(
+        "--files",
+        type=int,
+        default=1000,
+        help="Number of files in the generated corpus (default: 1000).",
+    )
+    args = runner.parse_args()
+
+    corpus = generate_corpus(args.files)
+    add_benchmarks(runner, "corpus", corpus)
+    # A single large file, as a stress test for per-file overheads that grow
+    # with file length.
+    add_benchmarks(runner, "large file", ["\n".join(corpus[:200])])
+
+
+if __name__ == "__main__":
+    main()
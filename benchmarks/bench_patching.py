@@ -0,0 +1,186 @@
+"""
+Benchmark time-machine’s patching layer with pyperf.
+
+Run with:
+
+    python benchmarks/bench_patching.py -o results.json
+
+See benchmarks/README.rst for how to compare results.
+"""
+
+from __future__ import annotations
+
+import time
+
+import pyperf
+
+COMMON_SETUP = """\
+import datetime as dt
+import time
+import warnings
+from zoneinfo import ZoneInfo
+
+import _time_machine
+import time_machine
+
+# Silence utcnow()'s deprecation warning, on Python 3.12+.
+warnings.simplefilter("ignore", DeprecationWarning)
+"""
+
+# Statements calling each patched function, in the form that time-machine
+# intercepts.
+PATCHED_FUNCTIONS = {
+    "datetime.date.today()": "dt.date.today()",
+    "datetime.datetime.now()": "dt.datetime.now()",
+    "datetime.datetime.now(tz)": "dt.datetime.now(dt.timezone.utc)",
+    "datetime.datetime.today()": "dt.datetime.today()",
+    "datetime.datetime.utcnow()": "dt.datetime.utcnow()",
+    "time.gmtime()": "time.gmtime()",
+    "time.localtime()": "time.localtime()",
+    "time.strftime()": 'time.strftime("%Y-%m-%d")',
+    "time.time()": "time.time()",
+    "time.time_ns()": "time.time_ns()",
+}
+if hasattr(time, "clock_gettime"):
+    PATCHED_FUNCTIONS["time.clock_gettime()"] = (
+        "time.clock_gettime(time.CLOCK_REALTIME)"
+    )
+    PATCHED_FUNCTIONS["time.clock_gettime_ns()"] = (
+        "time.clock_gettime_ns(time.CLOCK_REALTIME)"
+    )
+
+# Modes for the patched functions, as (setup, teardown) pairs:
+# * unpatched: time-machine imported but never started.
+# * idle: functions patched but no travel active, as when another
+#   interpreter is travelling.
+# * frozen / ticking: travelling with tick=False / tick=True.
+MODES = {
+    "unpatched": ("", ""),
+    "idle": ("_time_machine.patch()", "_time_machine.unpatch()"),
+    "frozen": (
+        "travel = time_machine.travel(0, tick=False)\ntravel.start()",
+        "travel.stop()",
+    ),
+    "ticking": (
+        "travel = time_machine.travel(0)\ntravel.start()",
+        "travel.stop()",
+    ),
+}
+
+# Operations on travel() and Traveller objects, as (setup, statement,
+# teardown) triples.
+TRAVEL_OPERATIONS = {
+    "travel start() / stop()": (
+        "travel = time_machine.travel(0)",
+        "travel.start()\ntravel.stop()",
+        "",
+    ),
+    "travel context manager": (
+        "travel = time_machine.travel(0)",
+        "with travel:\n    pass",
+        "",
+    ),
+    "travel start() / stop() zoneinfo": (
+        "travel = time_machine.travel("
+        "dt.datetime(2020, 1, 1, tzinfo=ZoneInfo('Europe/London')))",
+        "travel.start()\ntravel.stop()",
+        "",
+    ),
+    "Traveller.shift() forwards": (
+        "travel = time_machine.travel(0, tick=False)\ntraveller = travel.start()",
+        "traveller.shift(1)",
+        "travel.stop()",
+    ),
+    "Traveller.shift() forwards and backwards": (
+        "travel = time_machine.travel(0, tick=False)\ntraveller = travel.start()",
+        "traveller.shift(1)\ntraveller.shift(-1)",
+        "travel.stop()",
+    ),
+    "Traveller.move_to() int": (
+        "travel = time_machine.travel(0, tick=False)\ntraveller = travel.start()",
+        "traveller.move_to(0)",
+        "travel.stop()",
+    ),
+    "Traveller.move_to() zoneinfo": (
+        "travel = time_machine.travel(0, tick=False)\ntraveller = travel.start()\n"
+        "destination = dt.datetime(2020, 1, 1, tzinfo=ZoneInfo('Europe/London'))",
+        "traveller.move_to(destination)",
+        "travel.stop()",
+    ),
+}
+
+# Depths of already-active travels to nest a start() / stop() within.
+NESTING_DEPTHS = [1, 10, 100]
+
+# Arguments to extract_timestamp_tzname(), by destination type.
+DESTINATIONS = {
+    "int": "0",
+    "float": "0.5",
+    "datetime utc": "dt.datetime(2020, 1, 1, tzinfo=dt.timezone.utc)",
+    "datetime zoneinfo": "dt.datetime(2020, 1, 1, tzinfo=ZoneInfo('Europe/London'))",
+    "datetime naive": "dt.datetime(2020, 1, 1)",
+    "date": "dt.date(2020, 1, 1)",
+    "timedelta": "dt.timedelta(days=1)",
+    "str isoformat": "'2020-01-01T00:00:00+00:00'",
+    "str dateutil": "'1st January 2020'",
+    "callable": "lambda: 0",
+}
+
+
+def add_patched_function_benchmarks(runner: pyperf.Runner) -> None:
+    for mode, (mode_setup, mode_teardown) in MODES.items():
+        for name, stmt in PATCHED_FUNCTIONS.items():
+            runner.timeit(
+                f"{name} {mode}",
+                stmt=stmt,
+                setup=COMMON_SETUP + mode_setup,
+                teardown=mode_teardown,
+            )
+
+
+def add_travel_benchmarks(runner: pyperf.Runner) -> None:
+    for name, (setup, stmt, teardown) in TRAVEL_OPERATIONS.items():
+        runner.timeit(
+            name,
+            stmt=stmt,
+            setup=COMMON_SETUP + setup,
+            teardown=teardown,
+        )
+
+    for depth in NESTING_DEPTHS:
+        runner.timeit(
+            f"travel start() / stop() nested depth {depth}",
+            stmt="travel.start()\ntravel.stop()",
+            setup=(
+                COMMON_SETUP
+                + f"outer = [time_machine.travel(0) for _ in range({depth})]\n"
+                + "for t in outer:\n    t.start()\n"
+                + "travel = time_machine.travel(0)"
+            ),
+            teardown="for t in reversed(outer):\n    t.stop()",
+        )
+
+
+def add_destination_benchmarks(runner: pyperf.Runner) -> None:
+    for name, destination in DESTINATIONS.items():
+        runner.timeit(
+            f"extract_timestamp_tzname() {name}",
+            stmt="extract_timestamp_tzname(destination)",
+            setup=(
+                COMMON_SETUP
+                + "from time_machine import extract_timestamp_tzname\n"
+                + f"destination = {destination}"
+            ),
+        )
+
+
+def main() -> None:
+    runner = pyperf.Runner()
+    runner.metadata["description"] = "time-machine patching layer benchmarks"
+    add_patched_function_benchmarks(runner)
+    add_travel_benchmarks(runner)
+    add_destination_benchmarks(runner)
+
+
+if __name__ == "__main__":
+    main()
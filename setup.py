@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+import os
 import sys
 
 from setuptools import Extension, setup
+from setuptools.command.build_py import build_py
+from setuptools.command.editable_wheel import editable_wheel
 
 if hasattr(sys, "pypy_version_info"):
     raise RuntimeError(
@@ -18,12 +21,56 @@ if sys.platform != "win32":
     ]
 
 
+class build_py_with_pth(build_py):
+    """
+    Install time_machine.pth into site-packages, to resume travel in child
+    processes per travel(propagate=True).
+    """
+
+    def run(self) -> None:
+        super().run()
+        self.copy_file(
+            os.path.join("src", "time_machine.pth"),
+            os.path.join(self.build_lib, "time_machine.pth"),
+            preserve_mode=False,
+        )
+
+
+class editable_wheel_with_pth(editable_wheel):
+    """
+    Install time_machine.pth for editable installs too, which don't use the
+    build_py output. There's no public hook for this, so extend the method
+    that fills the wheel's directory.
+    """
+
+    def _run_build_commands(
+        self,
+        dist_name: str,
+        unpacked_wheel: str,
+        build_lib: str,
+        tmp_dir: str,
+    ) -> tuple[list[str], dict[str, str]]:
+        result = super()._run_build_commands(
+            dist_name, unpacked_wheel, build_lib, tmp_dir
+        )
+        self.copy_file(
+            os.path.join("src", "time_machine.pth"),
+            os.path.join(unpacked_wheel, "time_machine.pth"),
+            preserve_mode=False,
+        )
+        return result
+
+
 setup(
+    cmdclass={
+        "build_py": build_py_with_pth,
+        "editable_wheel": editable_wheel_with_pth,
+    },
     ext_modules=[
         Extension(
             name="_time_machine",
             sources=["src/_time_machine.c"],
             extra_compile_args=extra_compile_args,
         )
-    ]
+    ],
 )
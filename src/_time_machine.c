@@ -1,5 +1,10 @@
 #include "Python.h"
+#if PY_VERSION_HEX < 0x030b0000
+// PyFrameObject's fields, for f_globals, before PyFrame_GetGlobals().
+#include "frameobject.h"
+#endif
 #include <limits.h>
+#include <stdint.h>
 #include <stdlib.h>
 
 // Module state
@@ -13,6 +18,8 @@ typedef struct {
     PyObject *str_time_ns;
     PyObject *str_replace;
     PyObject *str_fromtimestamp;
+    PyObject *str_date;
+    PyObject *str___name__;
     PyObject *tzinfo_kwnames;
     PyObject *microsecond_kwnames;
     PyObject *nanoseconds_per_second;
@@ -28,6 +35,14 @@ typedef struct {
     PyCFunctionObject *time_strftime;
     PyCFunctionObject *time_time;
     PyCFunctionObject *time_time_ns;
+    /*
+        Module names whose callers see the real time, per the active
+        traveller's travel(ignore=...), paired with a dict caching whether
+        each calling code object is ignored, as a (tuple, dict) tuple, or
+        NULL for none. Replaced with patch_mutex held, and on free-threaded
+        builds only read with it held, since another thread may replace it.
+    */
+    PyObject *ignore;
     // Whether this interpreter has patched the date and time functions
     int patched;
 } _time_machine_state;
@@ -113,62 +128,224 @@ patch_mutex_unlock(void)
 */
 
 /*
-    Return the current interpreter's active traveller,
-    time_machine.traveller_stack[-1], as a new reference, and set *state to
-    the current interpreter's module state.
-
-    Return NULL, with no exception set, if the current interpreter is not
-    time travelling: because time_machine is not imported in it, or no travel
-    is in progress. Patching applies process-wide, so this happens when
-    another interpreter is travelling and this one is not. Callers should
-    then fall back to the original functions.
+    Return the traveller_stack attribute of the named module, as a new
+    reference, and set *state to the current interpreter's module state.
+    Return NULL, with no exception set, if the module is not in sys.modules
+    or lacks the attributes.
 */
 static PyObject *
-_time_machine_current_traveller(_time_machine_state **state)
+_time_machine_find_traveller_stack(const char *module_name, _time_machine_state **state)
 {
-    PyObject *name = PyUnicode_FromString("time_machine");
+    PyObject *name = PyUnicode_FromString(module_name);
     if (name == NULL) {
         PyErr_Clear();
         return NULL;
     }
     // Only look in sys.modules, to avoid triggering an import of
-    // time_machine in interpreters that don't use it.
-    PyObject *time_machine_module = PyImport_GetModule(name);
+    // the module in interpreters that don't use it.
+    PyObject *module = PyImport_GetModule(name);
     Py_DECREF(name);
-    if (time_machine_module == NULL) {
+    if (module == NULL) {
         PyErr_Clear();
         return NULL;
     }
 
-    PyObject *c_module = PyObject_GetAttrString(time_machine_module, "_time_machine");
+    PyObject *c_module = PyObject_GetAttrString(module, "_time_machine");
     if (c_module == NULL) {
         PyErr_Clear();
-        Py_DECREF(time_machine_module);
+        Py_DECREF(module);
         return NULL;
     }
     *state = (_time_machine_state *)PyModule_GetState(c_module);
-    // The references in sys.modules and the time_machine module keep this
-    // module, and thus its state, alive.
+    // The references in sys.modules and the named module keep this module,
+    // and thus its state, alive.
     Py_DECREF(c_module);
     if (*state == NULL || (*state)->str_traveller_stack == NULL) {
         PyErr_Clear();
-        Py_DECREF(time_machine_module);
+        Py_DECREF(module);
         return NULL;
     }
 
-    PyObject *traveller_stack =
-        PyObject_GetAttr(time_machine_module, (*state)->str_traveller_stack);
-    Py_DECREF(time_machine_module);
+    PyObject *traveller_stack = PyObject_GetAttr(module, (*state)->str_traveller_stack);
+    Py_DECREF(module);
     if (traveller_stack == NULL) {
         PyErr_Clear();
         return NULL;
     }
+    return traveller_stack;
+}
+
+/*
+    Return whether the module name is in the ignore tuple, or a submodule of
+    one of its modules, or -1 with an exception set on error.
+*/
+static int
+_time_machine_module_ignored(PyObject *name, PyObject *ignore)
+{
+    Py_ssize_t name_length = PyUnicode_GET_LENGTH(name);
+    for (Py_ssize_t i = 0; i < PyTuple_GET_SIZE(ignore); i++) {
+        PyObject *module = PyTuple_GET_ITEM(ignore, i);
+        Py_ssize_t module_length = PyUnicode_GET_LENGTH(module);
+        if (module_length > name_length) {
+            continue;
+        }
+        Py_ssize_t match = PyUnicode_Tailmatch(name, module, 0, module_length, -1);
+        if (match < 0) {
+            return -1;
+        }
+        if (match && (module_length == name_length ||
+                         PyUnicode_READ_CHAR(name, module_length) == '.')) {
+            return 1;
+        }
+    }
+    return 0;
+}
+
+/*
+    Return whether the calling Python code is in an ignored module, or -1
+    with an exception set on error. The decision for each code object is
+    cached, so after the first call from some code, this costs one dict
+    lookup.
+
+    The cache is keyed by the code object's address, since code objects
+    compare equal by value, so identical functions in different modules
+    would otherwise share an entry. Cached values are (code, ignored)
+    tuples, which keep the code objects alive, so addresses aren't reused.
+*/
+static int
+_time_machine_caller_ignored(_time_machine_state *state)
+{
+    // Take a reference, since another thread may change the traveller,
+    // freeing the pair. With the GIL, no other thread can run during the
+    // read, so only lock on free-threaded builds, keeping the lock off the
+    // hot path.
+#ifdef Py_GIL_DISABLED
+    patch_mutex_lock();
+    PyObject *pair = Py_XNewRef(state->ignore);
+    patch_mutex_unlock();
+#else
+    PyObject *pair = Py_XNewRef(state->ignore);
+#endif
+    if (pair == NULL) {
+        return 0;
+    }
+
+    PyFrameObject *frame = PyEval_GetFrame();
+    if (frame == NULL) {
+        Py_DECREF(pair);
+        return 0;
+    }
+
+    PyObject *ignore = PyTuple_GET_ITEM(pair, 0);
+    PyObject *ignore_cache = PyTuple_GET_ITEM(pair, 1);
+    PyObject *code = (PyObject *)PyFrame_GetCode(frame);
+    PyObject *key = PyLong_FromVoidPtr(code);
+    int result = -1;
+    if (key == NULL) {
+        goto done;
+    }
+
+#if PY_VERSION_HEX >= 0x030d0000
+    PyObject *cached;
+    int found = PyDict_GetItemRef(ignore_cache, key, &cached);
+    if (found < 0) {
+        goto done;
+    }
+    if (found) {
+        result = PyTuple_GET_ITEM(cached, 1) == Py_True;
+        Py_DECREF(cached);
+        goto done;
+    }
+#else
+    PyObject *cached = PyDict_GetItemWithError(ignore_cache, key);
+    if (cached != NULL) {
+        result = PyTuple_GET_ITEM(cached, 1) == Py_True;
+        goto done;
+    }
+    if (PyErr_Occurred()) {
+        goto done;
+    }
+#endif
+
+#if PY_VERSION_HEX >= 0x030b0000
+    PyObject *globals = PyFrame_GetGlobals(frame);
+#else
+    PyObject *globals = Py_NewRef(frame->f_globals);
+#endif
+    PyObject *name = PyDict_GetItemWithError(globals, state->str___name__);
+    Py_XINCREF(name);
+    Py_DECREF(globals);
+    if (name == NULL && PyErr_Occurred()) {
+        goto done;
+    }
+
+    int ignored = 0;
+    if (name != NULL && PyUnicode_Check(name)) {
+        ignored = _time_machine_module_ignored(name, ignore);
+    }
+    Py_XDECREF(name);
+    if (ignored < 0) {
+        goto done;
+    }
+
+    PyObject *value = PyTuple_Pack(2, code, ignored ? Py_True : Py_False);
+    if (value == NULL) {
+        goto done;
+    }
+    int set = PyDict_SetItem(ignore_cache, key, value);
+    Py_DECREF(value);
+    if (set < 0) {
+        goto done;
+    }
+    result = ignored;
+
+done:
+    Py_XDECREF(key);
+    Py_DECREF(code);
+    Py_DECREF(pair);
+    return result;
+}
+
+/*
+    Return the current interpreter's active traveller,
+    time_machine.traveller_stack[-1], as a new reference, and set *state to
+    the current interpreter's module state.
+
+    Before time_machine is imported, or whilst it is importing, fall back to
+    the _time_machine_startup module, which starts travel at interpreter
+    startup per the TIME_MACHINE_TRAVEL environment variable.
+
+    Return NULL, with no exception set, if the current interpreter is not
+    time travelling: because time_machine is not imported in it, or no travel
+    is in progress. Patching applies process-wide, so this happens when
+    another interpreter is travelling and this one is not. Also return NULL
+    if the caller is in a module that the active traveller ignores. Callers
+    should then fall back to the original functions.
+*/
+static PyObject *
+_time_machine_current_traveller(_time_machine_state **state)
+{
+    PyObject *traveller_stack = _time_machine_find_traveller_stack("time_machine", state);
+    if (traveller_stack == NULL) {
+        traveller_stack = _time_machine_find_traveller_stack("_time_machine_startup", state);
+        if (traveller_stack == NULL) {
+            return NULL;
+        }
+    }
     PyObject *traveller = PySequence_GetItem(traveller_stack, -1);
     Py_DECREF(traveller_stack);
     if (traveller == NULL) {
         PyErr_Clear();
         return NULL;
     }
+
+    int ignored = _time_machine_caller_ignored(*state);
+    if (ignored != 0) {
+        // On error, fall back to the original functions too.
+        PyErr_Clear();
+        Py_DECREF(traveller);
+        return NULL;
+    }
     return traveller;
 }
 
@@ -383,11 +560,8 @@ _time_machine_original_utcnow(PyObject *module, PyObject *args)
         return NULL;
     }
 
-    /*
-        Warn pointing at the caller of the Python wrapper in time_machine that
-        calls this function (stacklevel 2), rather than the wrapper itself.
-    */
-    if (_time_machine_warn_utcnow_deprecated(2) < 0) {
+    // Warn as the original function would, pointing at its caller.
+    if (_time_machine_warn_utcnow_deprecated(1) < 0) {
         return NULL;
     }
 
@@ -438,6 +612,48 @@ _time_machine_today(PyObject *cls, PyObject *args)
     return result;
 }
 
+/*
+    The original date.today() calls time.time(), which is patched, so
+    implement the originals on top of the original datetime.now() instead.
+*/
+
+static PyObject *
+_time_machine_original_today(PyObject *module, PyObject *unused)
+{
+    _time_machine_state *state = get_time_machine_state(module);
+
+    if (!state->patched) {
+        PyErr_SetString(PyExc_ValueError, "Not currently time-travelling.");
+        return NULL;
+    }
+
+    // datetime.today() is equivalent to datetime.now() without a timezone.
+    return original_now(state->datetime_class, NULL, 0, NULL);
+}
+PyDoc_STRVAR(original_today_doc,
+    "original_today() -> datetime\n\
+\n\
+Return what datetime.datetime.today() would, after patching.");
+
+static PyObject *
+_time_machine_original_date_today(PyObject *module, PyObject *unused)
+{
+    PyObject *now = _time_machine_original_today(module, unused);
+    if (now == NULL) {
+        return NULL;
+    }
+
+    // date.today() is equivalent to datetime.now().date().
+    _time_machine_state *state = get_time_machine_state(module);
+    PyObject *result = PyObject_CallMethodNoArgs(now, state->str_date);
+    Py_DECREF(now);
+    return result;
+}
+PyDoc_STRVAR(original_date_today_doc,
+    "original_date_today() -> date\n\
+\n\
+Return what datetime.date.today() would, after patching.");
+
 /* time.clock_gettime() */
 
 static PyObject *
@@ -942,6 +1158,270 @@ PyDoc_STRVAR(unpatch_doc,
 \n\
 Swap out helpers.");
 
+/*
+    Shared clocks: a clock state in a buffer shared between processes, such
+    as an mmap'd file, which many processes can read and write at once. The
+    buffer holds four int64 fields: a sequence counter, the destination
+    timestamp, the real timestamp that ticking counts from, and whether to
+    tick.
+
+    Access follows the seqlock pattern. Writers make the counter odd while
+    they update the other fields, and even again after. Readers take no lock,
+    retrying whenever the counter was odd or changed during their read, so
+    they always see a consistent state without blocking writers.
+*/
+
+#define SHARED_CLOCK_SEQUENCE 0
+#define SHARED_CLOCK_DESTINATION 1
+#define SHARED_CLOCK_REAL_START 2
+#define SHARED_CLOCK_TICK 3
+#define SHARED_CLOCK_SIZE (4 * sizeof(int64_t))
+
+#ifdef MS_WINDOWS
+static inline int64_t
+shared_clock_load_relaxed(int64_t *p)
+{
+    return *(volatile int64_t *)p;
+}
+static inline void
+shared_clock_store_relaxed(int64_t *p, int64_t value)
+{
+    *(volatile int64_t *)p = value;
+}
+static inline int64_t
+shared_clock_load_acquire(int64_t *p)
+{
+    int64_t value = *(volatile int64_t *)p;
+    MemoryBarrier();
+    return value;
+}
+static inline void
+shared_clock_store_release(int64_t *p, int64_t value)
+{
+    MemoryBarrier();
+    *(volatile int64_t *)p = value;
+}
+static inline int
+shared_clock_compare_exchange(int64_t *p, int64_t expected, int64_t desired)
+{
+    return InterlockedCompareExchange64(
+               (volatile LONG64 *)p, (LONG64)desired, (LONG64)expected) == expected;
+}
+static inline void
+shared_clock_fence(void)
+{
+    MemoryBarrier();
+}
+#else
+static inline int64_t
+shared_clock_load_relaxed(int64_t *p)
+{
+    return __atomic_load_n(p, __ATOMIC_RELAXED);
+}
+static inline void
+shared_clock_store_relaxed(int64_t *p, int64_t value)
+{
+    __atomic_store_n(p, value, __ATOMIC_RELAXED);
+}
+static inline int64_t
+shared_clock_load_acquire(int64_t *p)
+{
+    return __atomic_load_n(p, __ATOMIC_ACQUIRE);
+}
+static inline void
+shared_clock_store_release(int64_t *p, int64_t value)
+{
+    __atomic_store_n(p, value, __ATOMIC_RELEASE);
+}
+static inline int
+shared_clock_compare_exchange(int64_t *p, int64_t expected, int64_t desired)
+{
+    return __atomic_compare_exchange_n(
+        p, &expected, desired, 0, __ATOMIC_ACQUIRE, __ATOMIC_RELAXED);
+}
+static inline void
+shared_clock_fence(void)
+{
+    __atomic_thread_fence(__ATOMIC_SEQ_CST);
+}
+#endif
+
+/*
+    Get a view of a shared clock buffer, returning its fields, or NULL with
+    an exception set.
+*/
+static int64_t *
+shared_clock_get_buffer(PyObject *buffer, Py_buffer *view, int flags)
+{
+    if (PyObject_GetBuffer(buffer, view, flags) < 0) {
+        return NULL;
+    }
+    if ((size_t)view->len < SHARED_CLOCK_SIZE || (uintptr_t)view->buf % sizeof(int64_t) != 0) {
+        PyBuffer_Release(view);
+        PyErr_SetString(PyExc_ValueError,
+            "Shared clock buffer must be at least 32 bytes and 8-byte aligned.");
+        return NULL;
+    }
+    return (int64_t *)view->buf;
+}
+
+/* Start a write, returning the sequence counter's previous, even, value. */
+static inline int64_t
+shared_clock_write_begin(int64_t *fields)
+{
+    int64_t *sequence = &fields[SHARED_CLOCK_SEQUENCE];
+    int64_t value;
+    do {
+        value = shared_clock_load_relaxed(sequence);
+    } while ((value & 1) || !shared_clock_compare_exchange(sequence, value, value + 1));
+    // Order the odd counter before the field updates.
+    shared_clock_fence();
+    return value;
+}
+
+static inline void
+shared_clock_write_end(int64_t *fields, int64_t sequence)
+{
+    shared_clock_store_release(&fields[SHARED_CLOCK_SEQUENCE], sequence + 2);
+}
+
+static PyObject *
+_time_machine_shared_clock_read(PyObject *module, PyObject *buffer)
+{
+    Py_buffer view;
+    int64_t *fields = shared_clock_get_buffer(buffer, &view, PyBUF_SIMPLE);
+    if (fields == NULL) {
+        return NULL;
+    }
+
+    int64_t before, after, destination, real_start, tick;
+    do {
+        before = shared_clock_load_acquire(&fields[SHARED_CLOCK_SEQUENCE]);
+        destination = shared_clock_load_relaxed(&fields[SHARED_CLOCK_DESTINATION]);
+        real_start = shared_clock_load_relaxed(&fields[SHARED_CLOCK_REAL_START]);
+        tick = shared_clock_load_relaxed(&fields[SHARED_CLOCK_TICK]);
+        // Order the field reads before re-reading the counter.
+        shared_clock_fence();
+        after = shared_clock_load_relaxed(&fields[SHARED_CLOCK_SEQUENCE]);
+    } while ((before & 1) || before != after);
+
+    PyBuffer_Release(&view);
+
+    return Py_BuildValue(
+        "(LLO)", (long long)destination, (long long)real_start, tick ? Py_True : Py_False);
+}
+PyDoc_STRVAR(shared_clock_read_doc,
+    "shared_clock_read(buffer) -> tuple[int, int, bool]\n\
+\n\
+Read a shared clock's destination, real start, and tick, without locking.");
+
+static PyObject *
+_time_machine_shared_clock_write(PyObject *module, PyObject *args)
+{
+    PyObject *buffer;
+    long long destination, real_start;
+    int tick;
+    if (!PyArg_ParseTuple(args, "OLLp", &buffer, &destination, &real_start, &tick)) {
+        return NULL;
+    }
+
+    Py_buffer view;
+    int64_t *fields = shared_clock_get_buffer(buffer, &view, PyBUF_WRITABLE);
+    if (fields == NULL) {
+        return NULL;
+    }
+
+    int64_t sequence = shared_clock_write_begin(fields);
+    shared_clock_store_relaxed(&fields[SHARED_CLOCK_DESTINATION], destination);
+    shared_clock_store_relaxed(&fields[SHARED_CLOCK_REAL_START], real_start);
+    shared_clock_store_relaxed(&fields[SHARED_CLOCK_TICK], tick);
+    shared_clock_write_end(fields, sequence);
+
+    PyBuffer_Release(&view);
+
+    Py_RETURN_NONE;
+}
+PyDoc_STRVAR(shared_clock_write_doc,
+    "shared_clock_write(buffer, destination_ns, real_start_ns, tick) -> None\n\
+\n\
+Set a shared clock's destination, real start, and tick.");
+
+static PyObject *
+_time_machine_shared_clock_shift(PyObject *module, PyObject *args)
+{
+    PyObject *buffer;
+    long long delta;
+    if (!PyArg_ParseTuple(args, "OL", &buffer, &delta)) {
+        return NULL;
+    }
+
+    Py_buffer view;
+    int64_t *fields = shared_clock_get_buffer(buffer, &view, PyBUF_WRITABLE);
+    if (fields == NULL) {
+        return NULL;
+    }
+
+    // Add within the write, so concurrent shifts from different processes
+    // all apply.
+    int64_t sequence = shared_clock_write_begin(fields);
+    int64_t *destination = &fields[SHARED_CLOCK_DESTINATION];
+    shared_clock_store_relaxed(destination, shared_clock_load_relaxed(destination) + delta);
+    shared_clock_write_end(fields, sequence);
+
+    PyBuffer_Release(&view);
+
+    Py_RETURN_NONE;
+}
+PyDoc_STRVAR(shared_clock_shift_doc,
+    "shared_clock_shift(buffer, delta_ns) -> None\n\
+\n\
+Add to a shared clock's destination.");
+
+static PyObject *
+_time_machine_set_ignore(PyObject *module, PyObject *ignore)
+{
+    _time_machine_state *state = get_time_machine_state(module);
+
+    if (!PyTuple_Check(ignore)) {
+        PyErr_SetString(PyExc_TypeError, "ignore must be a tuple.");
+        return NULL;
+    }
+    for (Py_ssize_t i = 0; i < PyTuple_GET_SIZE(ignore); i++) {
+        if (!PyUnicode_Check(PyTuple_GET_ITEM(ignore, i))) {
+            PyErr_SetString(PyExc_TypeError, "ignore must contain module names.");
+            return NULL;
+        }
+    }
+
+    PyObject *pair = NULL;
+    if (PyTuple_GET_SIZE(ignore) > 0) {
+        PyObject *ignore_cache = PyDict_New();
+        if (ignore_cache == NULL) {
+            return NULL;
+        }
+        pair = PyTuple_Pack(2, ignore, ignore_cache);
+        Py_DECREF(ignore_cache);
+        if (pair == NULL) {
+            return NULL;
+        }
+    }
+
+    // Swap the pair under the lock, but release the old one outside it,
+    // since that may run arbitrary code.
+    patch_mutex_lock();
+    PyObject *old_pair = state->ignore;
+    state->ignore = pair;
+    patch_mutex_unlock();
+    Py_XDECREF(old_pair);
+
+    Py_RETURN_NONE;
+}
+PyDoc_STRVAR(set_ignore_doc,
+    "set_ignore(ignore: tuple[str, ...]) -> None\n\
+\n\
+Set the module names whose callers see the real time, clearing the cache of\n\
+decisions per calling code object.");
+
 PyDoc_STRVAR(module_doc, "_time_machine module");
 
 static PyMethodDef module_functions[] = {
@@ -953,6 +1433,14 @@ static PyMethodDef module_functions[] = {
         (PyCFunction)_time_machine_original_utcnow,
         METH_NOARGS,
         original_utcnow_doc},
+    {"original_today",
+        (PyCFunction)_time_machine_original_today,
+        METH_NOARGS,
+        original_today_doc},
+    {"original_date_today",
+        (PyCFunction)_time_machine_original_date_today,
+        METH_NOARGS,
+        original_date_today_doc},
 #if PY_VERSION_HEX >= 0x030d00a2
     {"original_clock_gettime",
         (PyCFunction)_time_machine_original_clock_gettime,
@@ -994,6 +1482,19 @@ static PyMethodDef module_functions[] = {
         original_time_ns_doc},
     {"patch", (PyCFunction)_time_machine_patch, METH_NOARGS, patch_doc},
     {"unpatch", (PyCFunction)_time_machine_unpatch, METH_NOARGS, unpatch_doc},
+    {"set_ignore", (PyCFunction)_time_machine_set_ignore, METH_O, set_ignore_doc},
+    {"shared_clock_read",
+        (PyCFunction)_time_machine_shared_clock_read,
+        METH_O,
+        shared_clock_read_doc},
+    {"shared_clock_write",
+        (PyCFunction)_time_machine_shared_clock_write,
+        METH_VARARGS,
+        shared_clock_write_doc},
+    {"shared_clock_shift",
+        (PyCFunction)_time_machine_shared_clock_shift,
+        METH_VARARGS,
+        shared_clock_shift_doc},
     {NULL, NULL} /* sentinel */
 };
 
@@ -1022,6 +1523,16 @@ _time_machine_exec(PyObject *module)
         goto error;
     }
 
+    state->str_date = PyUnicode_InternFromString("date");
+    if (state->str_date == NULL) {
+        goto error;
+    }
+
+    state->str___name__ = PyUnicode_InternFromString("__name__");
+    if (state->str___name__ == NULL) {
+        goto error;
+    }
+
     PyObject *str_tzinfo = PyUnicode_InternFromString("tzinfo");
     if (str_tzinfo == NULL) {
         goto error;
@@ -1187,6 +1698,9 @@ error:
     Py_CLEAR(state->str_time_ns);
     Py_CLEAR(state->str_replace);
     Py_CLEAR(state->str_fromtimestamp);
+    Py_CLEAR(state->str_date);
+    Py_CLEAR(state->str___name__);
+    Py_CLEAR(state->ignore);
     Py_CLEAR(state->tzinfo_kwnames);
     Py_CLEAR(state->microsecond_kwnames);
     Py_CLEAR(state->nanoseconds_per_second);
@@ -1217,6 +1731,9 @@ _time_machine_traverse(PyObject *module, visitproc visit, void *arg)
     Py_VISIT(state->str_time_ns);
     Py_VISIT(state->str_replace);
     Py_VISIT(state->str_fromtimestamp);
+    Py_VISIT(state->str_date);
+    Py_VISIT(state->str___name__);
+    Py_VISIT(state->ignore);
     Py_VISIT(state->tzinfo_kwnames);
     Py_VISIT(state->microsecond_kwnames);
     Py_VISIT(state->nanoseconds_per_second);
@@ -1247,6 +1764,9 @@ _time_machine_clear(PyObject *module)
     Py_CLEAR(state->str_time_ns);
     Py_CLEAR(state->str_replace);
     Py_CLEAR(state->str_fromtimestamp);
+    Py_CLEAR(state->str_date);
+    Py_CLEAR(state->str___name__);
+    Py_CLEAR(state->ignore);
     Py_CLEAR(state->tzinfo_kwnames);
     Py_CLEAR(state->microsecond_kwnames);
     Py_CLEAR(state->nanoseconds_per_second);
@@ -0,0 +1,141 @@
+"""
+Start travel at interpreter startup, per the TIME_MACHINE_TRAVEL environment
+variable, called by the time_machine.pth startup hook.
+
+This module is kept separate from time_machine, and minimal, to keep startup
+fast: it avoids importing time_machine, which imports pytest, dateutil, and
+inspect. When time_machine is imported later, it adopts the travel started
+here. Until then, the patched functions find travellers in this module's
+traveller_stack.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import os
+import sys
+import time
+import uuid
+
+import _time_machine
+
+TRAVEL_ENV_VAR = "TIME_MACHINE_TRAVEL"
+TICK_ENV_VAR = "TIME_MACHINE_TICK"
+TZ_ENV_VAR = "TIME_MACHINE_TZ"
+
+NANOSECONDS_PER_SECOND = 1_000_000_000
+
+FALSE_VALUES = frozenset(("0", "false", "no", "off"))
+
+
+class StartupTraveller:
+    """
+    A minimal Traveller, with the same attributes that time_machine uses.
+    """
+
+    def __init__(
+        self,
+        destination_timestamp_ns: int,
+        destination_tzname: str | None,
+        tick: bool,
+    ) -> None:
+        self._destination_timestamp_ns = destination_timestamp_ns
+        self._destination_tzname = destination_tzname
+        self._tick = tick
+        self._requested = False
+        self._real_start_timestamp_ns = 0
+        self._orig_tz: str | None = None
+
+    def time_ns(self) -> int:
+        if not self._tick:
+            return self._destination_timestamp_ns
+
+        now_ns: int = _time_machine.original_time_ns()
+
+        if not self._requested:
+            self._requested = True
+            self._real_start_timestamp_ns = now_ns
+            return self._destination_timestamp_ns
+
+        return self._destination_timestamp_ns + (now_ns - self._real_start_timestamp_ns)
+
+
+traveller_stack: list[StartupTraveller] = []
+original_uuid_generate_time_safe = None
+original_uuid_uuid_create = None
+
+
+def parse_destination(value: str) -> int:
+    """
+    Parse a destination from a Unix timestamp or an ISO 8601 string, with
+    naive strings in local time, returning a timestamp in nanoseconds.
+    """
+    try:
+        return round(float(value) * NANOSECONDS_PER_SECOND)
+    except ValueError:
+        pass
+    if value.endswith(("Z", "z")) and sys.version_info < (3, 11):
+        # fromisoformat() only supports "Z" on Python 3.11+.
+        value = value[:-1] + "+00:00"
+    try:
+        destination = dt.datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Invalid {TRAVEL_ENV_VAR} value {value!r}.") from None
+    seconds = int(destination.replace(microsecond=0).timestamp())
+    return seconds * NANOSECONDS_PER_SECOND + destination.microsecond * 1_000
+
+
+def patch_uuid() -> None:
+    """
+    Make uuid generate time-based UUIDs from the patched time functions, like
+    time_machine._patch_uuid(), and clear the timestamps it has cached.
+    """
+    global original_uuid_generate_time_safe
+    global original_uuid_uuid_create
+
+    original_uuid_generate_time_safe = uuid._generate_time_safe  # type: ignore[attr-defined]
+    original_uuid_uuid_create = uuid._UuidCreate  # type: ignore[attr-defined]
+    uuid._generate_time_safe = None  # type: ignore[attr-defined]
+    uuid._UuidCreate = None  # type: ignore[attr-defined]
+    uuid._last_timestamp = None  # type: ignore[attr-defined]
+    if sys.version_info >= (3, 14):
+        uuid._last_timestamp_v6 = None  # type: ignore[attr-defined]
+        uuid._last_timestamp_v7 = None  # type: ignore[attr-defined]
+
+
+def start() -> None:
+    """
+    Start travelling per the environment variables.
+    """
+    if traveller_stack:
+        return
+
+    tzname = os.environ.get(TZ_ENV_VAR) or None
+    orig_tz = os.environ.get("TZ")
+    if tzname is not None and hasattr(time, "tzset"):
+        # Change timezone first, so naive destinations use it.
+        os.environ["TZ"] = tzname
+        time.tzset()
+    else:
+        tzname = None
+
+    try:
+        destination_timestamp_ns = parse_destination(os.environ[TRAVEL_ENV_VAR])
+    except ValueError:
+        if tzname is not None:
+            if orig_tz is None:
+                del os.environ["TZ"]
+            else:
+                os.environ["TZ"] = orig_tz
+            time.tzset()
+        raise
+
+    traveller = StartupTraveller(
+        destination_timestamp_ns=destination_timestamp_ns,
+        destination_tzname=tzname,
+        tick=os.environ.get(TICK_ENV_VAR, "").lower() not in FALSE_VALUES,
+    )
+    traveller._orig_tz = orig_tz
+    _time_machine.patch()
+    patch_uuid()
+    traveller_stack.append(traveller)
@@ -3,17 +3,18 @@ from __future__ import annotations
 import datetime as dt
 import functools
 import inspect
+import mmap
 import os
 import sys
 import time as time_module
 import uuid
-from collections.abc import Awaitable, Callable, Generator
+from collections.abc import Awaitable, Callable, Generator, Iterable
 from collections.abc import Generator as TypingGenerator
 from enum import Enum
 from time import gmtime as orig_gmtime
 from time import struct_time
 from types import TracebackType
-from typing import Any, TypeAlias, TypeVar, cast, overload
+from typing import Any, NamedTuple, TypeAlias, TypeVar, cast, overload
 from unittest import TestCase
 from zoneinfo import ZoneInfo
 
@@ -80,6 +81,9 @@ if sys.version_info >= (3, 14):
 
 def _reset_uuid_timestamps() -> None:
     _uuid_dict.update(_uuid_reset)
+    for traveller in traveller_stack:
+        if traveller._uuids is not None:
+            traveller._uuids.reset_timestamps()
 
 
 DestinationBaseType: TypeAlias = (
@@ -123,6 +127,83 @@ def _timedelta_to_ns(delta: dt.timedelta) -> int:
     ) * NANOSECONDS_PER_SECOND + delta.microseconds * 1_000
 
 
+def _delta_to_ns(delta: dt.timedelta | int | float) -> int:
+    if isinstance(delta, dt.timedelta):
+        return _timedelta_to_ns(delta)
+    elif isinstance(delta, int):
+        return delta * NANOSECONDS_PER_SECOND
+    elif isinstance(delta, float):
+        return round(delta * NANOSECONDS_PER_SECOND)
+    else:
+        raise TypeError(f"Unsupported type for delta argument: {delta!r}")
+
+
+# Test suites tend to reuse a small set of destination strings, so cache their
+# parsed timestamps, since parsing is slow.
+STRING_DESTINATION_CACHE_SIZE = 1024
+
+
+def _apply_naive_mode(parsed: dt.datetime, mode: NaiveMode) -> dt.datetime:
+    if parsed.tzinfo is None:
+        if mode == NaiveMode.MIXED:
+            # Keep as naive, for backwards compatibility
+            pass
+        elif mode == NaiveMode.UTC:
+            parsed = parsed.replace(tzinfo=dt.timezone.utc)
+        elif mode == NaiveMode.LOCAL:
+            pass
+        elif mode == NaiveMode.ERROR:
+            raise RuntimeError(
+                "Naive datetime string provided while time_machine.naive_mode is set to ERROR. "
+                "Please provide a timezone-aware datetime string."
+            )
+        else:  # pragma: no cover
+            assert_never(mode)
+    return parsed
+
+
+@functools.lru_cache(maxsize=STRING_DESTINATION_CACHE_SIZE)
+def _iso_string_to_ns(dest: str, mode: NaiveMode, tz: str | None) -> int:
+    # Only ISO 8601 strings are cached, since they fully specify the time.
+    # dateutil fills in missing parts, such as the date of "10:00", from the
+    # current time, which may itself be travelled.
+    return _datetime_to_ns(_apply_naive_mode(dt.datetime.fromisoformat(dest), mode))
+
+
+def _string_to_ns(dest: str, mode: NaiveMode, tz: str | None) -> int:
+    try:
+        return _iso_string_to_ns(dest, mode, tz)
+    except ValueError:
+        if not HAVE_DATEUTIL:
+            raise
+    try:
+        parsed = parse_datetime(dest)
+    except ValueError as dateutil_exc:
+        raise dateutil_exc from None
+    return _datetime_to_ns(_apply_naive_mode(parsed, mode))
+
+
+def clear_destination_cache() -> None:
+    """
+    Clear the cache of parsed destination strings.
+    """
+    _iso_string_to_ns.cache_clear()
+
+
+class DestinationCacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int | None
+    currsize: int
+
+
+def destination_cache_info() -> DestinationCacheInfo:
+    """
+    Return statistics for the cache of parsed destination strings.
+    """
+    return DestinationCacheInfo(*_iso_string_to_ns.cache_info())
+
+
 def extract_timestamp_tzname(
     destination: DestinationType,
 ) -> tuple[int, str | None]:
@@ -175,39 +256,50 @@ def extract_timestamp_tzname(
         else:  # pragma: no cover
             assert_never(naive_mode)
     elif isinstance(dest, str):
-        try:
-            parsed = dt.datetime.fromisoformat(dest)
-        except ValueError as exc:
-            if HAVE_DATEUTIL:
-                try:
-                    parsed = parse_datetime(dest)
-                except ValueError as dateutil_exc:
-                    raise dateutil_exc from None
-            else:
-                raise exc
-
-        if parsed.tzinfo is None:
-            if naive_mode == NaiveMode.MIXED:
-                # Keep as naive, for backwards compatibility
-                pass
-            elif naive_mode == NaiveMode.UTC:
-                parsed = parsed.replace(tzinfo=dt.timezone.utc)
-            elif naive_mode == NaiveMode.LOCAL:
-                pass
-            elif naive_mode == NaiveMode.ERROR:
-                raise RuntimeError(
-                    "Naive datetime string provided while time_machine.naive_mode is set to ERROR. "
-                    "Please provide a timezone-aware datetime string."
-                )
-            else:  # pragma: no cover
-                assert_never(naive_mode)
-        timestamp_ns = _datetime_to_ns(parsed)
+        timestamp_ns = _string_to_ns(
+            dest,
+            naive_mode,
+            # Naive strings are in local time in these modes, so their
+            # timestamps depend on the current timezone.
+            os.environ.get("TZ")
+            if naive_mode == NaiveMode.MIXED or naive_mode == NaiveMode.LOCAL
+            else None,
+        )
     else:
         raise TypeError(f"Unsupported destination {dest!r}")
 
     return timestamp_ns, tzname
 
 
+class Checkpoint:
+    """
+    A saved state of a Traveller, from Traveller.checkpoint().
+    """
+
+    __slots__ = (
+        "_traveller",
+        "_destination_timestamp_ns",
+        "_destination_tzname",
+        "_tick",
+        "_requested",
+        "_real_start_timestamp_ns",
+        "_uuids_state",
+    )
+
+    def __init__(self, traveller: Traveller) -> None:
+        self._traveller = traveller
+        self._destination_timestamp_ns = traveller._destination_timestamp_ns
+        self._destination_tzname = traveller._destination_tzname
+        self._tick = traveller._tick
+        # Whether the time has been requested since starting, and the real
+        # time of that request, from which ticking counts.
+        self._requested = traveller._requested
+        self._real_start_timestamp_ns = traveller._real_start_timestamp_ns
+        self._uuids_state = (
+            None if traveller._uuids is None else traveller._uuids.get_state()
+        )
+
+
 class Traveller:
     def __init__(
         self,
@@ -219,6 +311,16 @@ class Traveller:
         self._destination_tzname = destination_tzname
         self._tick = tick
         self._requested = False
+        self._real_start_timestamp_ns = 0
+        # Whether to export the state for child processes, per
+        # travel(propagate=True), and the exported value this replaced.
+        self._propagate = False
+        self._orig_propagated_state: str | None = None
+        # Module names whose callers see the real time, per
+        # travel(ignore=...).
+        self._ignore: tuple[str, ...] = ()
+        # Generator for travel(uuid="deterministic").
+        self._uuids: _DeterministicUUIDs | None = None
 
     def time_ns(self) -> int:
         if not self._tick:
@@ -235,14 +337,7 @@ class Traveller:
         return base + (now_ns - self._real_start_timestamp_ns)
 
     def shift(self, delta: dt.timedelta | int | float) -> None:
-        if isinstance(delta, dt.timedelta):
-            delta_ns = _timedelta_to_ns(delta)
-        elif isinstance(delta, int):
-            delta_ns = delta * NANOSECONDS_PER_SECOND
-        elif isinstance(delta, float):
-            delta_ns = round(delta * NANOSECONDS_PER_SECOND)
-        else:
-            raise TypeError(f"Unsupported type for delta argument: {delta!r}")
+        delta_ns = _delta_to_ns(delta)
 
         self._destination_timestamp_ns += delta_ns
 
@@ -251,6 +346,8 @@ class Traveller:
             # only pay for resetting them when moving backwards.
             _reset_uuid_timestamps()
 
+        self._propagate_state()
+
     def move_to(
         self,
         destination: DestinationType,
@@ -265,6 +362,45 @@ class Traveller:
         if tick is not None:
             self._tick = tick
 
+        self._propagate_state()
+
+    def freeze(self) -> None:
+        now_ns = self.time_ns()
+        # Stop ticking before changing the destination, so other threads
+        # never add the time ticked so far to the new destination.
+        self._tick = False
+        self._destination_timestamp_ns = now_ns
+
+        self._propagate_state()
+
+    def checkpoint(self) -> Checkpoint:
+        return Checkpoint(self)
+
+    def restore(self, checkpoint: Checkpoint) -> None:
+        if checkpoint._traveller is not self:
+            raise ValueError("Checkpoint is from a different Traveller.")
+        if checkpoint._destination_tzname != self._destination_tzname:
+            self._stop()
+            self._destination_tzname = checkpoint._destination_tzname
+            self._start()
+        elif (
+            checkpoint._destination_timestamp_ns < self._destination_timestamp_ns
+            or self._tick
+            or checkpoint._tick
+        ):
+            # As in shift(), only reset uuid timestamps when possibly moving
+            # backwards, which may be the case whenever ticking.
+            _reset_uuid_timestamps()
+        self._destination_timestamp_ns = checkpoint._destination_timestamp_ns
+        self._tick = checkpoint._tick
+        self._requested = checkpoint._requested
+        self._real_start_timestamp_ns = checkpoint._real_start_timestamp_ns
+        if self._uuids is not None:
+            assert checkpoint._uuids_state is not None
+            self._uuids.set_state(checkpoint._uuids_state)
+
+        self._propagate_state()
+
     def _start(self) -> None:
         _reset_uuid_timestamps()
 
@@ -281,63 +417,450 @@ class Traveller:
                 os.environ["TZ"] = self._orig_tz
             tzset()
 
+    def _start_propagating(self) -> None:
+        self._propagate = True
+        self._orig_propagated_state = os.environ.get(PROPAGATE_ENV_VAR)
+        self._export_state()
+
+    def _stop_propagating(self) -> None:
+        for traveller in reversed(traveller_stack):
+            if traveller._propagate:
+                # Export the outer traveller, which may have changed since
+                # this one started.
+                traveller._export_state()
+                return
+        if self._orig_propagated_state is None:
+            del os.environ[PROPAGATE_ENV_VAR]
+        else:
+            os.environ[PROPAGATE_ENV_VAR] = self._orig_propagated_state
+
+    def _propagate_state(self) -> None:
+        """
+        Export the state after a change, if this is the innermost traveller
+        with propagate=True, whose state child processes resume.
+        """
+        if not self._propagate:
+            return
+        for traveller in reversed(traveller_stack):
+            if traveller is self:
+                self._export_state()
+                return
+            if traveller._propagate:
+                return
+
+    def _export_state(self) -> None:
+        if self._tick and not self._requested:
+            # Child processes can start at any point, so start ticking now,
+            # rather than on the first request, to give them a fixed origin.
+            self.time_ns()
+        os.environ[PROPAGATE_ENV_VAR] = ":".join(
+            (
+                str(self._destination_timestamp_ns),
+                str(self._real_start_timestamp_ns),
+                "1" if self._tick else "0",
+                naive_mode.name,
+                self._destination_tzname or "",
+            )
+        )
+
+
+# Environment variable holding the state of the innermost travel() with
+# propagate=True, which the time_machine.pth startup hook resumes in child
+# processes.
+PROPAGATE_ENV_VAR = "TIME_MACHINE_PROPAGATE"
+
+# The travel() resumed from PROPAGATE_ENV_VAR, in a child process.
+propagated_travel: travel | None = None
+
+
+def _resume_propagated_travel() -> None:
+    """
+    Resume the travel exported by a parent process, if any. Called by the
+    time_machine.pth startup hook.
+    """
+    global naive_mode, propagated_travel
+
+    state = os.environ.get(PROPAGATE_ENV_VAR)
+    if not state or propagated_travel is not None:
+        return
+
+    destination_ns, real_start_ns, tick, mode, tzname = state.split(":", 4)
+    naive_mode = NaiveMode[mode]
+    propagated_travel = travel(0, tick=(tick == "1"), propagate=True)
+    propagated_travel._destination = None
+    propagated_travel._destination_timestamp_ns = int(destination_ns)
+    propagated_travel._destination_tzname = tzname or None
+    traveller = propagated_travel.start()
+    if traveller._tick:
+        traveller._requested = True
+        traveller._real_start_timestamp_ns = int(real_start_ns)
+
 
 traveller_stack: list[Traveller] = []
 original_uuid_generate_time_safe = None
 original_uuid_uuid_create = None
 
 
-class travel:
-    def __init__(self, destination: DestinationType, *, tick: bool = True) -> None:
-        self.destination_timestamp_ns, self.destination_tzname = (
-            extract_timestamp_tzname(destination)
+def _push_traveller(traveller: Traveller) -> None:
+    """
+    Make the traveller the active one, patching on the first.
+    """
+    if "freezegun" in sys.modules and dt.datetime.__name__ == "FakeDatetime":
+        raise RuntimeError("time-machine cannot start when freezegun is active.")
+
+    if not traveller_stack:
+        _time_machine.patch()
+        _patch_uuid()
+
+    traveller_stack.append(traveller)
+    traveller._start()
+    _time_machine.set_ignore(traveller._ignore)
+    if traveller._uuids is not None and not original_uuid_functions:
+        _patch_uuid_functions()
+
+
+def _pop_traveller() -> Traveller:
+    """
+    Remove the active traveller, unpatching after the last.
+    """
+    traveller = traveller_stack.pop()
+    traveller._stop()
+    _time_machine.set_ignore(traveller_stack[-1]._ignore if traveller_stack else ())
+    if original_uuid_functions and all(t._uuids is None for t in traveller_stack):
+        _unpatch_uuid_functions()
+
+    _reset_uuid_timestamps()
+
+    if not traveller_stack:
+        _time_machine.unpatch()
+        _unpatch_uuid()
+
+    return traveller
+
+
+def active_traveller() -> Traveller:
+    """
+    Return the Traveller of the innermost active travel.
+    """
+    if not traveller_stack:
+        raise RuntimeError("Not currently time-travelling.")
+    return traveller_stack[-1]
+
+
+def _patch_uuid() -> None:
+    # During time travel, patch the uuid module's time-based generation function to
+    # None, which makes it use time.time(). Otherwise it makes a system call to
+    # find the current datetime. The time it finds is stored in generated UUID1
+    # values.
+    global original_uuid_generate_time_safe
+    global original_uuid_uuid_create
+
+    original_uuid_generate_time_safe = uuid._generate_time_safe  # type: ignore[attr-defined]
+    original_uuid_uuid_create = uuid._UuidCreate  # type: ignore[attr-defined]
+    uuid._generate_time_safe = None  # type: ignore[attr-defined]
+    uuid._UuidCreate = None  # type: ignore[attr-defined]
+
+
+def _unpatch_uuid() -> None:
+    global original_uuid_generate_time_safe
+    global original_uuid_uuid_create
+
+    uuid._generate_time_safe = original_uuid_generate_time_safe  # type: ignore[attr-defined]
+    uuid._UuidCreate = original_uuid_uuid_create  # type: ignore[attr-defined]
+    original_uuid_generate_time_safe = None
+    original_uuid_uuid_create = None
+
+
+# Offset from the UUID epoch, 1582-10-15, to the Unix epoch, in the 100
+# nanosecond intervals that version 1 and 6 UUIDs count.
+UUID_EPOCH_OFFSET = 0x01B2_1DD2_1381_4000
+
+_MASK_64 = (1 << 64) - 1
+
+# Variant bits for RFC 9562 UUIDs.
+_UUID_VARIANT = 0x8000 << 48
+
+
+class _DeterministicUUIDs:
+    """
+    Generate time-based UUIDs for travel(uuid="deterministic"), taking
+    timestamps from the traveller, and "random" bits from a seeded counter
+    mixed with SplitMix64, so the values are reproducible and cost no system
+    calls.
+    """
+
+    def __init__(self, traveller: Traveller, seed: int) -> None:
+        self._traveller = traveller
+        self._counter = seed & _MASK_64
+        # Set the multicast bit, which marks a node that isn't a real MAC
+        # address, per RFC 9562.
+        self._node = (self._random() & 0xFFFF_FFFF_FFFF) | 0x0100_0000_0000
+        self._clock_seq = self._random() & 0x3FFF
+        self._last_timestamp = -1
+        self._last_timestamp_v7 = -1
+        self._counter_v7 = 0
+
+    def _random(self) -> int:
+        self._counter = (self._counter + 0x9E37_79B9_7F4A_7C15) & _MASK_64
+        z = self._counter
+        z = ((z ^ (z >> 30)) * 0xBF58_476D_1CE4_E5B9) & _MASK_64
+        z = ((z ^ (z >> 27)) * 0x94D0_49BB_1331_11EB) & _MASK_64
+        return z ^ (z >> 31)
+
+    def get_state(self) -> tuple[int, int, int, int, int]:
+        return (
+            self._counter,
+            self._clock_seq,
+            self._last_timestamp,
+            self._last_timestamp_v7,
+            self._counter_v7,
         )
-        self.tick = tick
 
-    def start(self) -> Traveller:
-        if "freezegun" in sys.modules and dt.datetime.__name__ == "FakeDatetime":
-            raise RuntimeError("time-machine cannot start when freezegun is active.")
+    def set_state(self, state: tuple[int, int, int, int, int]) -> None:
+        (
+            self._counter,
+            self._clock_seq,
+            self._last_timestamp,
+            self._last_timestamp_v7,
+            self._counter_v7,
+        ) = state
+
+    def reset_timestamps(self) -> None:
+        self._last_timestamp = -1
+        self._last_timestamp_v7 = -1
+        # Change the clock sequence when time may have gone backwards, per
+        # RFC 9562, so values don't repeat.
+        self._clock_seq = self._random() & 0x3FFF
+
+    def _timestamp(self) -> int:
+        # Never repeat a timestamp, like uuid1().
+        timestamp = self._traveller.time_ns() // 100 + UUID_EPOCH_OFFSET
+        if timestamp <= self._last_timestamp:
+            timestamp = self._last_timestamp + 1
+        self._last_timestamp = timestamp
+        return timestamp
+
+    def uuid1(self, node: int | None = None, clock_seq: int | None = None) -> uuid.UUID:
+        timestamp = self._timestamp()
+        value = (
+            ((timestamp & 0xFFFF_FFFF) << 96)
+            | (((timestamp >> 32) & 0xFFFF) << 80)
+            | (0x1000 | ((timestamp >> 48) & 0x0FFF)) << 64
+            | _UUID_VARIANT
+            | ((self._clock_seq if clock_seq is None else clock_seq) & 0x3FFF) << 48
+            | ((self._node if node is None else node) & 0xFFFF_FFFF_FFFF)
+        )
+        return uuid.UUID(int=value)
+
+    def uuid6(self, node: int | None = None, clock_seq: int | None = None) -> uuid.UUID:
+        timestamp = self._timestamp()
+        value = (
+            ((timestamp >> 12) & 0xFFFF_FFFF_FFFF) << 80
+            | (0x6000 | (timestamp & 0x0FFF)) << 64
+            | _UUID_VARIANT
+            | ((self._clock_seq if clock_seq is None else clock_seq) & 0x3FFF) << 48
+            | ((self._node if node is None else node) & 0xFFFF_FFFF_FFFF)
+        )
+        return uuid.UUID(int=value)
+
+    def uuid7(self) -> uuid.UUID:
+        # Like uuid7(), use a 42-bit counter, started from a random value
+        # with its top bit clear, to order values within a millisecond.
+        timestamp_ms = self._traveller.time_ns() // 1_000_000
+        if timestamp_ms > self._last_timestamp_v7:
+            counter = self._random() >> 23
+        else:
+            timestamp_ms = self._last_timestamp_v7
+            counter = self._counter_v7 + 1
+            if counter > 0x3FF_FFFF_FFFF:
+                timestamp_ms += 1
+                counter = self._random() >> 23
+        self._last_timestamp_v7 = timestamp_ms
+        self._counter_v7 = counter
+        value = (
+            (timestamp_ms & 0xFFFF_FFFF_FFFF) << 80
+            | (0x7000 | (counter >> 30)) << 64
+            | _UUID_VARIANT
+            | (counter & 0x3FFF_FFFF) << 32
+            | (self._random() & 0xFFFF_FFFF)
+        )
+        return uuid.UUID(int=value)
+
+
+def _deterministic_uuid1(
+    node: int | None = None, clock_seq: int | None = None
+) -> uuid.UUID:
+    uuids = traveller_stack[-1]._uuids
+    if uuids is None:
+        result: uuid.UUID = original_uuid_functions["uuid1"](node, clock_seq)
+        return result
+    return uuids.uuid1(node, clock_seq)
+
+
+def _deterministic_uuid6(
+    node: int | None = None, clock_seq: int | None = None
+) -> uuid.UUID:
+    uuids = traveller_stack[-1]._uuids
+    if uuids is None:
+        result: uuid.UUID = original_uuid_functions["uuid6"](node, clock_seq)
+        return result
+    return uuids.uuid6(node, clock_seq)
 
-        if not traveller_stack:
-            _time_machine.patch()
 
-            # During time travel, patch the uuid module's time-based generation function to
-            # None, which makes it use time.time(). Otherwise it makes a system call to
-            # find the current datetime. The time it finds is stored in generated UUID1
-            # values.
-            global original_uuid_generate_time_safe
-            global original_uuid_uuid_create
+def _deterministic_uuid7() -> uuid.UUID:
+    uuids = traveller_stack[-1]._uuids
+    if uuids is None:
+        result: uuid.UUID = original_uuid_functions["uuid7"]()
+        return result
+    return uuids.uuid7()
+
+
+# The uuid module functions replaced whilst travelling with
+# uuid="deterministic", on Python versions that have them.
+DETERMINISTIC_UUID_FUNCTIONS = {
+    name: function
+    for name, function in (
+        ("uuid1", _deterministic_uuid1),
+        ("uuid6", _deterministic_uuid6),
+        ("uuid7", _deterministic_uuid7),
+    )
+    if hasattr(uuid, name)
+}
+
+original_uuid_functions: dict[str, Any] = {}
+
+
+def _patch_uuid_functions() -> None:
+    for name, function in DETERMINISTIC_UUID_FUNCTIONS.items():
+        original_uuid_functions[name] = getattr(uuid, name)
+        setattr(uuid, name, function)
+
 
-            original_uuid_generate_time_safe = uuid._generate_time_safe  # type: ignore[attr-defined]
-            original_uuid_uuid_create = uuid._UuidCreate  # type: ignore[attr-defined]
-            uuid._generate_time_safe = None  # type: ignore[attr-defined]
-            uuid._UuidCreate = None  # type: ignore[attr-defined]
+def _unpatch_uuid_functions() -> None:
+    for name, function in original_uuid_functions.items():
+        setattr(uuid, name, function)
+    original_uuid_functions.clear()
 
+
+def _adopt_startup_travel() -> None:
+    """
+    Take over travel started at interpreter startup by the
+    _time_machine_startup module, per the TIME_MACHINE_TRAVEL environment
+    variable, replacing its minimal travellers with full ones.
+    """
+    startup: Any = sys.modules.get("_time_machine_startup")
+    if startup is None or not startup.traveller_stack:
+        return
+
+    for startup_traveller in startup.traveller_stack:
         traveller = Traveller(
-            destination_timestamp_ns=self.destination_timestamp_ns,
-            destination_tzname=self.destination_tzname,
-            tick=self.tick,
+            destination_timestamp_ns=startup_traveller._destination_timestamp_ns,
+            destination_tzname=startup_traveller._destination_tzname,
+            tick=startup_traveller._tick,
         )
+        traveller._requested = startup_traveller._requested
+        traveller._real_start_timestamp_ns = startup_traveller._real_start_timestamp_ns
+        traveller._orig_tz = startup_traveller._orig_tz
         traveller_stack.append(traveller)
-        traveller._start()
+    startup.traveller_stack = traveller_stack
+    # The startup module already patched uuid, so take its originals, to
+    # restore when travel ends.
+    global original_uuid_generate_time_safe
+    global original_uuid_uuid_create
+    original_uuid_generate_time_safe = startup.original_uuid_generate_time_safe
+    original_uuid_uuid_create = startup.original_uuid_uuid_create
 
-        return traveller
 
-    def stop(self) -> None:
-        traveller_stack.pop()._stop()
+_adopt_startup_travel()
 
-        _reset_uuid_timestamps()
 
-        if not traveller_stack:
-            _time_machine.unpatch()
+# Destination types that resolve to the same time whenever they are resolved.
+STATIC_DESTINATION_TYPES = (int, float, dt.date, str)
+
 
-            global original_uuid_generate_time_safe
-            global original_uuid_uuid_create
+RESET_MODES = (None, "per_test")
 
-            uuid._generate_time_safe = original_uuid_generate_time_safe  # type: ignore[attr-defined]
-            uuid._UuidCreate = original_uuid_uuid_create  # type: ignore[attr-defined]
-            original_uuid_generate_time_safe = None
-            original_uuid_uuid_create = None
+UUID_MODES = (None, "deterministic")
+
+
+class travel:
+    def __init__(
+        self,
+        destination: DestinationType,
+        *,
+        tick: bool = True,
+        reset: str | None = None,
+        propagate: bool = False,
+        ignore: Iterable[str] = (),
+        uuid: str | None = None,
+        seed: int = 0,
+    ) -> None:
+        if reset not in RESET_MODES:
+            raise ValueError(f"Unsupported reset mode {reset!r}.")
+        if uuid not in UUID_MODES:
+            raise ValueError(f"Unsupported uuid mode {uuid!r}.")
+        if isinstance(ignore, str):
+            raise TypeError("ignore must be a list of module names, not a string.")
+        self._destination: DestinationBaseType | None
+        self._destination_timestamp_ns: int
+        self._destination_tzname: str | None
+        if isinstance(destination, STATIC_DESTINATION_TYPES):
+            # Defer resolving static destinations to the first start(), so
+            # that decorating tests that never run, such as deselected ones,
+            # doesn’t pay for parsing them.
+            self._destination = destination
+        else:
+            # timedelta and callable destinations depend on when travel() is
+            # called, so resolve them now.
+            self._destination = None
+            self._destination_timestamp_ns, self._destination_tzname = (
+                extract_timestamp_tzname(destination)
+            )
+        self.tick = tick
+        self.reset = reset
+        self.propagate = propagate
+        self.ignore = tuple(ignore)
+        self.uuid = uuid
+        self.seed = seed
+
+    def _resolve(self) -> None:
+        if self._destination is not None:
+            self._destination_timestamp_ns, self._destination_tzname = (
+                extract_timestamp_tzname(self._destination)
+            )
+            self._destination = None
+
+    @property
+    def destination_timestamp_ns(self) -> int:
+        self._resolve()
+        return self._destination_timestamp_ns
+
+    @property
+    def destination_tzname(self) -> str | None:
+        self._resolve()
+        return self._destination_tzname
+
+    def start(self) -> Traveller:
+        self._resolve()
+
+        traveller = Traveller(
+            destination_timestamp_ns=self._destination_timestamp_ns,
+            destination_tzname=self._destination_tzname,
+            tick=self.tick,
+        )
+        traveller._ignore = self.ignore
+        if self.uuid == "deterministic":
+            traveller._uuids = _DeterministicUUIDs(traveller, self.seed)
+        _push_traveller(traveller)
+        if self.propagate:
+            traveller._start_propagating()
+
+        return traveller
+
+    def stop(self) -> None:
+        traveller = _pop_traveller()
+        if traveller._propagate:
+            traveller._stop_propagating()
 
     def __enter__(self) -> Traveller:
         return self.start()
@@ -384,15 +907,23 @@ class travel:
             if not issubclass(wrapped, TestCase):
                 raise TypeError("Can only decorate unittest.TestCase subclasses.")
 
+            # Checkpoints of the class-level state for reset="per_test", one
+            # per class currently set up, innermost last.
+            checkpoints: list[Checkpoint] = []
+
             # Modify the setUpClass method
             orig_setUpClass = wrapped.setUpClass.__func__  # type: ignore[attr-defined]
 
             @functools.wraps(orig_setUpClass)
             def setUpClass(cls: type[TestCase]) -> None:
-                self.__enter__()
+                traveller = self.__enter__()
+                if self.reset == "per_test":
+                    checkpoints.append(traveller.checkpoint())
                 try:
                     orig_setUpClass(cls)
                 except Exception:
+                    if self.reset == "per_test":
+                        checkpoints.pop()
                     self.__exit__(*sys.exc_info())
                     raise
 
@@ -405,12 +936,32 @@ class travel:
             @functools.wraps(orig_tearDownClass)
             def tearDownClass(cls: type[TestCase]) -> None:
                 orig_tearDownClass(cls)
+                if self.reset == "per_test":
+                    checkpoints.pop()
                 self.__exit__(None, None, None)
 
             wrapped.tearDownClass = classmethod(  # type: ignore[assignment]
                 tearDownClass
             )
+
+            if self.reset == "per_test":
+                # Restore the class-level state after each test, including
+                # its setUp() and cleanups, without stopping travel.
+                orig_setUp = wrapped.setUp
+
+                @functools.wraps(orig_setUp)
+                def setUp(test: TestCase) -> None:
+                    checkpoint = checkpoints[-1]
+                    test.addCleanup(checkpoint._traveller.restore, checkpoint)
+                    orig_setUp(test)
+
+                wrapped.setUp = setUp  # type: ignore[method-assign,assignment]
+
             return cast(TestCaseType, wrapped)
+        elif self.reset is not None:
+            raise TypeError(
+                "reset can only be used when decorating unittest.TestCase subclasses."
+            )
         elif inspect.iscoroutinefunction(wrapped):
 
             @functools.wraps(wrapped)
@@ -430,17 +981,220 @@ class travel:
             return cast(_F, wrapper)
 
 
+# Size of a shared clock file: a sequence counter, destination timestamp,
+# real start timestamp, and tick flag, as int64s.
+SHARED_CLOCK_SIZE = 32
+
+
+def _real_time_ns() -> int:
+    if traveller_stack:
+        real_time_ns: int = _time_machine.original_time_ns()
+        return real_time_ns
+    return time_module.time_ns()
+
+
+class SharedClock:
+    """
+    A clock stored in a memory-mapped file, which many processes can travel
+    with at once. Patched functions read it without locking, so changes made
+    by any process apply to all of them immediately.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        destination: DestinationType | None = None,
+        *,
+        tick: bool = True,
+    ) -> None:
+        self.path = path
+        flags = os.O_RDWR | getattr(os, "O_BINARY", 0)
+        if destination is not None:
+            flags |= os.O_CREAT
+        fd = os.open(path, flags, 0o600)
+        try:
+            if os.fstat(fd).st_size < SHARED_CLOCK_SIZE:
+                if destination is None:
+                    raise ValueError(f"{path!r} is not a shared clock file.")
+                # Only ever grow the file, since shrinking it would crash
+                # other processes that have it mapped.
+                os.ftruncate(fd, SHARED_CLOCK_SIZE)
+            self._mmap = mmap.mmap(fd, SHARED_CLOCK_SIZE)
+        finally:
+            os.close(fd)
+
+        if destination is not None:
+            self.move_to(destination, tick=tick)
+
+    def time_ns(self) -> int:
+        state: tuple[int, int, bool] = _time_machine.shared_clock_read(self._mmap)
+        destination_ns, real_start_ns, tick = state
+        if not tick:
+            return destination_ns
+        return (
+            SYSTEM_EPOCH_TIMESTAMP_NS + destination_ns + _real_time_ns() - real_start_ns
+        )
+
+    def shift(self, delta: dt.timedelta | int | float) -> None:
+        delta_ns = _delta_to_ns(delta)
+        _time_machine.shared_clock_shift(self._mmap, delta_ns)
+        if delta_ns < 0:
+            _reset_uuid_timestamps()
+
+    def move_to(
+        self,
+        destination: DestinationType,
+        tick: bool | None = None,
+    ) -> None:
+        # Timezones can’t be shared, since each process has its own TZ.
+        destination_ns, _ = extract_timestamp_tzname(destination)
+        if tick is None:
+            tick = _time_machine.shared_clock_read(self._mmap)[2]
+        _time_machine.shared_clock_write(
+            self._mmap, destination_ns, _real_time_ns(), tick
+        )
+        _reset_uuid_timestamps()
+
+    def start(self) -> Traveller:
+        traveller = SharedClockTraveller(self)
+        _push_traveller(traveller)
+        return traveller
+
+    def stop(self) -> None:
+        _pop_traveller()
+
+    def close(self) -> None:
+        self._mmap.close()
+
+    def __enter__(self) -> Traveller:
+        return self.start()
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        self.stop()
+
+
+class SharedClockTraveller(Traveller):
+    """
+    The Traveller for a SharedClock, reading and writing its shared state.
+    """
+
+    def __init__(self, clock: SharedClock) -> None:
+        super().__init__(
+            destination_timestamp_ns=0,
+            destination_tzname=None,
+            tick=False,
+        )
+        self.clock = clock
+
+    def time_ns(self) -> int:
+        return self.clock.time_ns()
+
+    def shift(self, delta: dt.timedelta | int | float) -> None:
+        self.clock.shift(delta)
+
+    def move_to(
+        self,
+        destination: DestinationType,
+        tick: bool | None = None,
+    ) -> None:
+        self.clock.move_to(destination, tick=tick)
+
+    def freeze(self) -> None:
+        self.clock.move_to(self.clock.time_ns() / NANOSECONDS_PER_SECOND, tick=False)
+
+    def checkpoint(self) -> Checkpoint:
+        raise TypeError("SharedClock travellers do not support checkpoints.")
+
+
 # pytest plugin
 
 if HAVE_PYTEST:  # pragma: no branch
+    marker_travel_key = pytest.StashKey[travel]()
+    scoped_marker_key = pytest.StashKey[pytest.Mark]()
+
+    MARKER_SCOPES = ("function", "class", "module", "session")
 
     def pytest_collection_modifyitems(items: list[pytest.Item]) -> None:
         """
-        Add the fixture to any tests with the marker.
+        Add the fixture to any tests with the marker, and create each distinct
+        marker’s travel object once, for the fixture to start. For markers
+        with a scope, add the scoped fixture instead, recording the marker on
+        the node that the fixture is scoped to.
         """
+        # Markers from classes, modules, and parametrized functions are shared
+        # between items, so key on their identity, keeping them alive too.
+        marker_travels: dict[int, tuple[pytest.Mark, travel | None]] = {}
         for item in items:
-            if item.get_closest_marker("time_machine"):
-                item.fixturenames.insert(0, "time_machine")  # type: ignore[attr-defined]
+            marker = item.get_closest_marker("time_machine")
+            if marker is None:
+                continue
+            scope = _marker_scope(marker)
+            if scope != "function":
+                _add_scoped_marker(item, marker, scope)
+                continue
+            item.fixturenames.insert(0, "time_machine")  # type: ignore[attr-defined]
+            try:
+                marker_travel = marker_travels[id(marker)][1]
+            except KeyError:
+                marker_travel = _marker_travel(marker)
+                marker_travels[id(marker)] = (marker, marker_travel)
+            if marker_travel is not None:
+                item.stash[marker_travel_key] = marker_travel
+
+    def _marker_scope(marker: pytest.Mark) -> str:
+        scope = marker.kwargs.get("scope", "function")
+        if scope not in MARKER_SCOPES:
+            raise pytest.UsageError(
+                f"Invalid scope {scope!r} for time_machine marker, "
+                + f"must be one of: {', '.join(MARKER_SCOPES)}."
+            )
+        return scope  # type: ignore[no-any-return]
+
+    def _marker_kwargs(marker: pytest.Mark) -> dict[str, Any]:
+        return {key: value for key, value in marker.kwargs.items() if key != "scope"}
+
+    def _marker_travel(marker: pytest.Mark) -> travel | None:
+        """
+        Create the travel object for a marker, if it has a static destination
+        and valid arguments. Otherwise, the fixture handles the marker per
+        test, so that other destinations resolve when the test runs, and
+        errors fail the test rather than collection.
+        """
+        kwargs = _marker_kwargs(marker)
+        if not (
+            len(marker.args) == 1
+            and isinstance(marker.args[0], STATIC_DESTINATION_TYPES)
+            and kwargs.keys() <= {"tick"}
+        ):
+            return None
+        return travel(*marker.args, **kwargs)
+
+    def _add_scoped_marker(item: pytest.Item, marker: pytest.Mark, scope: str) -> None:
+        node: pytest.Item | pytest.Collector | pytest.Session | None
+        if scope == "class":
+            node = item.getparent(pytest.Class)
+        elif scope == "module":
+            node = item.getparent(pytest.Module)
+        else:
+            node = item.session
+        if node is None:
+            raise pytest.UsageError(
+                f"time_machine marker with scope={scope!r} used on "
+                + f"{item.nodeid}, which is not in a {scope}."
+            )
+        existing = node.stash.get(scoped_marker_key, None)
+        if existing is not None and existing != marker:
+            raise pytest.UsageError(
+                f"Conflicting time_machine markers with scope={scope!r} for "
+                + f"{item.nodeid}: {existing.args!r} and {marker.args!r}."
+            )
+        node.stash[scoped_marker_key] = marker
+        item.fixturenames.insert(0, f"time_machine_{scope}")  # type: ignore[attr-defined]
 
     def pytest_configure(config: pytest.Config) -> None:
         """
@@ -450,19 +1204,64 @@ if HAVE_PYTEST:  # pragma: no branch
             "markers", "time_machine(...): set the time with time-machine"
         )
 
+    # Whether a test function or function-scoped fixture is running, and the
+    # scoped fixtures changed while it ran, to reset afterwards. Stored per
+    # config, since pytester runs sessions within tests.
+    test_running_key = pytest.StashKey[bool]()
+    changed_scoped_fixtures_key = pytest.StashKey[list["TimeMachineFixture"]]()
+
+    @pytest.hookimpl(wrapper=True)
+    def pytest_fixture_setup(
+        fixturedef: pytest.FixtureDef[object], request: pytest.FixtureRequest
+    ) -> TypingGenerator[None, object, object]:
+        # Only changes from function-scoped fixtures belong to the test, not
+        # those from broader-scoped fixtures set up alongside it.
+        stash = request.config.stash
+        previous = stash.get(test_running_key, False)
+        stash[test_running_key] = fixturedef.scope == "function"
+        try:
+            return (yield)
+        finally:
+            stash[test_running_key] = previous
+
+    @pytest.hookimpl(wrapper=True)
+    def pytest_runtest_call(item: pytest.Item) -> TypingGenerator[None, None, None]:
+        item.config.stash[test_running_key] = True
+        try:
+            return (yield)
+        finally:
+            item.config.stash[test_running_key] = False
+
+    @pytest.hookimpl(wrapper=True)
+    def pytest_runtest_teardown(
+        item: pytest.Item,
+    ) -> TypingGenerator[None, None, None]:
+        try:
+            return (yield)
+        finally:
+            # Reset after function-scoped fixtures, which may have nested
+            # travels on top, have been torn down.
+            changed = item.config.stash.get(changed_scoped_fixtures_key, [])
+            while changed:
+                changed.pop()._reset_test_changes()
+
     class TimeMachineFixture:
         traveller: travel | None
         traveller_obj: Traveller | None
 
-        def __init__(self) -> None:
+        def __init__(self, config: pytest.Config | None = None) -> None:
             self.traveller = None
             self.traveller_obj = None
+            # Set for scoped fixtures, to reset changes made by tests.
+            self._config = config
+            self._test_checkpoint: Checkpoint | None = None
 
         def move_to(
             self,
             destination: DestinationType,
             tick: bool | None = None,
         ) -> None:
+            self._before_change()
             if self.traveller is None:
                 if tick is None:
                     tick = True
@@ -478,48 +1277,112 @@ if HAVE_PYTEST:  # pragma: no branch
                     "Initialize time_machine with move_to() before using shift()."
                 )
             assert self.traveller_obj is not None
+            self._before_change()
             self.traveller_obj.shift(delta=delta)
 
+        def _before_change(self) -> None:
+            """
+            For scoped fixtures, save the state before the first change made
+            by a test function, to reset to afterwards.
+            """
+            if self._config is None or not self._config.stash.get(
+                test_running_key, False
+            ):
+                return
+            changed = self._config.stash.setdefault(changed_scoped_fixtures_key, [])
+            if self not in changed:
+                changed.append(self)
+                self._test_checkpoint = (
+                    None
+                    if self.traveller_obj is None
+                    else self.traveller_obj.checkpoint()
+                )
+
+        def _reset_test_changes(self) -> None:
+            if self._test_checkpoint is None:
+                # Travel started within the test.
+                self.stop()
+            else:
+                assert self.traveller_obj is not None
+                self.traveller_obj.restore(self._test_checkpoint)
+                self._test_checkpoint = None
+
+        def _start(self, traveller: travel) -> None:
+            self.traveller = traveller
+            self.traveller_obj = traveller.start()
+
         def stop(self) -> None:
+            if self._config is not None:
+                changed = self._config.stash.get(changed_scoped_fixtures_key, [])
+                if self in changed:
+                    changed.remove(self)
             if self.traveller is not None:
                 self.traveller.stop()
+                self.traveller = None
+                self.traveller_obj = None
 
     @pytest.fixture(name="time_machine")
     def time_machine_fixture(
         request: pytest.FixtureRequest,
     ) -> TypingGenerator[TimeMachineFixture, None, None]:
         fixture = TimeMachineFixture()
-        marker = request.node.get_closest_marker("time_machine")
-        if marker:
-            fixture.move_to(*marker.args, **marker.kwargs)
+        marker_travel = request.node.stash.get(marker_travel_key, None)
+        if marker_travel is not None:
+            fixture._start(marker_travel)
+        else:
+            marker = request.node.get_closest_marker("time_machine")
+            if marker and _marker_scope(marker) == "function":
+                fixture.move_to(*marker.args, **_marker_kwargs(marker))
 
         yield fixture
         fixture.stop()
 
+    def _scoped_time_machine_fixture(
+        request: pytest.FixtureRequest,
+    ) -> TypingGenerator[TimeMachineFixture, None, None]:
+        fixture = TimeMachineFixture(request.config)
+        marker = request.node.stash.get(scoped_marker_key, None)
+        if marker is not None:
+            fixture.move_to(*marker.args, **_marker_kwargs(marker))
+
+        yield fixture
+        fixture.stop()
+
+    @pytest.fixture(name="time_machine_class", scope="class")
+    def time_machine_class_fixture(
+        request: pytest.FixtureRequest,
+    ) -> TypingGenerator[TimeMachineFixture, None, None]:
+        yield from _scoped_time_machine_fixture(request)
+
+    @pytest.fixture(name="time_machine_module", scope="module")
+    def time_machine_module_fixture(
+        request: pytest.FixtureRequest,
+    ) -> TypingGenerator[TimeMachineFixture, None, None]:
+        yield from _scoped_time_machine_fixture(request)
+
+    @pytest.fixture(name="time_machine_session", scope="session")
+    def time_machine_session_fixture(
+        request: pytest.FixtureRequest,
+    ) -> TypingGenerator[TimeMachineFixture, None, None]:
+        yield from _scoped_time_machine_fixture(request)
+
 
 # escape hatch
 
+# The escape hatch functions that read the current time are the C functions
+# themselves, rather than Python wrappers, so that reading the real time costs
+# no extra Python frame. Functions taking other arguments keep wrappers, to
+# accept keyword arguments and None like their signatures below.
+
 
 class _EscapeHatchDatetimeDate:
-    def today(self) -> dt.date:
-        # date.today() is equivalent to datetime.now().date().
-        result: dt.datetime = _time_machine.original_now(None)
-        return result.date()
+    today: Callable[[], dt.date] = _time_machine.original_date_today
 
 
 class _EscapeHatchDatetimeDatetime:
-    def now(self, tz: dt.tzinfo | None = None) -> dt.datetime:
-        result: dt.datetime = _time_machine.original_now(tz)
-        return result
-
-    def today(self) -> dt.datetime:
-        # datetime.today() is equivalent to datetime.now() without a timezone.
-        result: dt.datetime = _time_machine.original_now(None)
-        return result
-
-    def utcnow(self) -> dt.datetime:
-        result: dt.datetime = _time_machine.original_utcnow()
-        return result
+    now: Callable[..., dt.datetime] = _time_machine.original_now
+    today: Callable[[], dt.datetime] = _time_machine.original_today
+    utcnow: Callable[[], dt.datetime] = _time_machine.original_utcnow
 
 
 class _EscapeHatchDatetime:
@@ -529,6 +1392,9 @@ class _EscapeHatchDatetime:
 
 
 class _EscapeHatchTime:
+    time: Callable[[], float] = _time_machine.original_time
+    time_ns: Callable[[], int] = _time_machine.original_time_ns
+
     def clock_gettime(self, clk_id: int) -> float:
         result: float = _time_machine.original_clock_gettime(clk_id)
         return result
@@ -553,14 +1419,6 @@ class _EscapeHatchTime:
             result = _time_machine.original_strftime(format)
         return result
 
-    def time(self) -> float:
-        result: float = _time_machine.original_time()
-        return result
-
-    def time_ns(self) -> int:
-        result: int = _time_machine.original_time_ns()
-        return result
-
 
 class _EscapeHatch:
     def __init__(self) -> None:
@@ -2,11 +2,33 @@ from __future__ import annotations
 
 import argparse
 import ast
+import bisect
+import difflib
+import hashlib
+import io
+import json
+import mmap
+import os
+import re
+import struct
 import sys
+import time
+import tokenize
 import warnings
-from collections import defaultdict
-from collections.abc import Callable, Mapping, MutableMapping, Sequence
+from collections import Counter, defaultdict
+from collections.abc import (
+    Callable,
+    Iterable,
+    Iterator,
+    Mapping,
+    MutableMapping,
+    Sequence,
+)
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stderr, redirect_stdout
 from functools import partial
+from importlib.metadata import version
+from typing import Any, BinaryIO, Generic, TypeVar
 
 from tokenize_rt import (
     NON_CODING_TOKENS,
@@ -34,51 +56,935 @@ def main(argv: Sequence[str] | None = None) -> int:
         "migrate",
         help="Migrate Python files from freezegun to time-machine",
     )
-    migrate_parser.add_argument("file", nargs="+")
+    migrate_parser.add_argument(
+        "file",
+        nargs="*",
+        help="Files or directories to migrate, or - for stdin.",
+    )
+    input_group = migrate_parser.add_mutually_exclusive_group()
+    input_group.add_argument(
+        "--stdin-filenames",
+        action="store_true",
+        help="Read NUL-separated names of files to migrate from stdin.",
+    )
+    input_group.add_argument(
+        "--serve",
+        action="store_true",
+        help=(
+            "Migrate file contents sent over stdin, replying on stdout, "
+            + "using length-prefixed frames."
+        ),
+    )
+    migrate_parser.add_argument(
+        "-j",
+        "--jobs",
+        type=positive_int,
+        default=None,
+        help="Number of processes to use (default: the CPU count).",
+    )
+    migrate_parser.add_argument(
+        "--exclude",
+        action="append",
+        default=[],
+        metavar="PATTERN",
+        help=(
+            "Gitignore-style pattern of paths to skip within directories. "
+            + "Can be repeated."
+        ),
+    )
+    migrate_parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Don’t write files, just exit with code 1 if any need changes.",
+    )
+    migrate_parser.add_argument(
+        "--diff",
+        action="store_true",
+        help="Don’t write files, just output a unified diff of the changes.",
+    )
+    migrate_parser.add_argument(
+        "--format",
+        choices=["text", "json"],
+        default="text",
+        help="Output format for results (default: text).",
+    )
+    migrate_parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help=f"Don’t read or write the cache of unchanged files in {CACHE_DIR}.",
+    )
+
+    scan_parser = subparsers.add_parser(
+        "scan",
+        help="Report uses of freezegun and time mocking, without changing files",
+    )
+    scan_parser.add_argument(
+        "path",
+        nargs="+",
+        help="Files or directories to scan.",
+    )
+    scan_parser.add_argument(
+        "-j",
+        "--jobs",
+        type=positive_int,
+        default=None,
+        help="Number of processes to use (default: the CPU count).",
+    )
+    scan_parser.add_argument(
+        "--exclude",
+        action="append",
+        default=[],
+        metavar="PATTERN",
+        help=(
+            "Gitignore-style pattern of paths to skip within directories. "
+            + "Can be repeated."
+        ),
+    )
+    scan_parser.add_argument(
+        "--format",
+        choices=["text", "json"],
+        default="text",
+        help="Output format for results (default: text).",
+    )
 
     args = parser.parse_args(argv)
 
     if args.command == "migrate":
-        return migrate_files(files=args.file)
+        if args.stdin_filenames or args.serve:
+            if args.file:
+                flag = "--stdin-filenames" if args.stdin_filenames else "--serve"
+                migrate_parser.error(f"file arguments are not allowed with {flag}")
+        elif not args.file:
+            migrate_parser.error("the following arguments are required: file")
+        if args.serve and (args.check or args.diff or args.format != "text"):
+            migrate_parser.error(
+                "--check, --diff, and --format are not allowed with --serve"
+            )
+        if args.format == "json":
+            if args.diff:
+                migrate_parser.error("--diff is not allowed with --format=json")
+            if "-" in args.file:
+                migrate_parser.error("- is not allowed with --format=json")
+
+        if args.serve:
+            return serve(sys.stdin.buffer, sys.stdout.buffer)
+
+        paths = args.file
+        if args.stdin_filenames:
+            paths = read_filenames(sys.stdin.buffer)
+        files = find_files(paths, excludes=[*DEFAULT_EXCLUDES, *args.exclude])
+        cache = None if args.no_cache else MigrateCache.load()
+        options = MigrateOptions(
+            cache=cache,
+            check=args.check,
+            diff=args.diff,
+            report=args.format == "json",
+        )
+        returncode = migrate_files(files=files, jobs=args.jobs, options=options)
+        if cache is not None:
+            cache.save()
+        return returncode
+    elif args.command == "scan":
+        files = find_files(args.path, excludes=[*DEFAULT_EXCLUDES, *args.exclude])
+        return scan_files(files=files, jobs=args.jobs, report=args.format == "json")
     else:  # pragma: no cover
         # Unreachable
         raise NotImplementedError(f"Command {args.command} does not exist.")
 
 
-def migrate_files(files: list[str]) -> int:
+def read_filenames(stdin: BinaryIO) -> list[str]:
+    """
+    Read NUL-separated filenames, as output by ``git ls-files -z`` or
+    ``find -print0``.
+    """
+    return [os.fsdecode(name) for name in stdin.read().split(b"\0") if name]
+
+
+# Frame headers for --serve. Each request is a big-endian 4 byte length
+# followed by that many bytes of UTF-8 source. Each response is a status
+# byte, then a length and that many bytes of the migrated source, or for
+# errors, a UTF-8 message.
+REQUEST_HEADER = struct.Struct(">I")
+RESPONSE_HEADER = struct.Struct(">BI")
+STATUS_UNCHANGED = 0
+STATUS_CHANGED = 1
+STATUS_ERROR = 2
+
+
+def serve(stdin: BinaryIO, stdout: BinaryIO) -> int:
+    """
+    Migrate sources received over stdin, one frame at a time, until it
+    closes, so callers can stream many files through one process.
+    """
+    while True:
+        header = stdin.read(REQUEST_HEADER.size)
+        if not header:
+            return 0
+        if len(header) < REQUEST_HEADER.size:
+            print("Truncated frame header.", file=sys.stderr)
+            return 1
+        (length,) = REQUEST_HEADER.unpack(header)
+        contents_bytes = stdin.read(length)
+        if len(contents_bytes) < length:
+            print("Truncated frame.", file=sys.stderr)
+            return 1
+
+        try:
+            contents_text = contents_bytes.decode()
+        except UnicodeDecodeError:
+            status = STATUS_ERROR
+            response = b"non-utf-8 (not supported)"
+        else:
+            migrated = migrate_contents(contents_text)
+            if migrated == contents_text:
+                status = STATUS_UNCHANGED
+                response = contents_bytes
+            else:
+                status = STATUS_CHANGED
+                response = migrated.encode()
+
+        stdout.write(RESPONSE_HEADER.pack(status, len(response)))
+        stdout.write(response)
+        stdout.flush()
+
+
+def positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"{value!r} is not a positive integer")
+    return number
+
+
+# Skipped within directories: hidden directories like .git and .venv, and
+# others that hold tooling or third-party code rather than project code.
+DEFAULT_EXCLUDES = (".*/", "__pycache__/", "node_modules/", "venv/")
+
+
+def find_files(paths: list[str], *, excludes: Sequence[str]) -> list[str]:
+    """
+    Expand directories in the given paths to the Python files they contain,
+    recursively, skipping any that match the gitignore-style exclude
+    patterns. Other paths are passed through unchanged.
+    """
+    exclude_regexes = [compile_exclude(pattern) for pattern in excludes]
+
+    def excluded(path: str, *, is_dir: bool) -> bool:
+        return any(
+            regex.fullmatch(path) and (is_dir or not dir_only)
+            for regex, dir_only in exclude_regexes
+        )
+
+    files = []
+    for path in paths:
+        if path == "-" or not os.path.isdir(path):
+            files.append(path)
+            continue
+
+        for dirpath, dirnames, filenames in os.walk(path):
+            relative_dir = os.path.relpath(dirpath, path).replace(os.sep, "/")
+            prefix = "" if relative_dir == "." else f"{relative_dir}/"
+            dirnames[:] = sorted(
+                dirname
+                for dirname in dirnames
+                if not excluded(prefix + dirname, is_dir=True)
+            )
+            files.extend(
+                os.path.join(dirpath, filename)
+                for filename in sorted(filenames)
+                if filename.endswith(".py")
+                and not excluded(prefix + filename, is_dir=False)
+            )
+    return files
+
+
+def compile_exclude(pattern: str) -> tuple[re.Pattern[str], bool]:
+    """
+    Compile a gitignore-style pattern to a regex matching paths relative to
+    the walked directory, and whether it only matches directories.
+    """
+    dir_only = pattern.endswith("/")
+    pattern = pattern.rstrip("/")
+    # Like gitignore, a pattern with a slash is relative to the root,
+    # otherwise it matches a name at any depth.
+    anchored = "/" in pattern
+    pattern = pattern.lstrip("/")
+
+    parts = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            parts.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("/**", i) and i + 3 == len(pattern):
+            parts.append("/.*")
+            i += 3
+        elif pattern[i] == "*":
+            parts.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            parts.append("[^/]")
+            i += 1
+        elif pattern[i] == "[" and (end := pattern.find("]", i + 2)) != -1:
+            body = pattern[i + 1 : end].replace("\\", "\\\\")
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            parts.append(f"[{body}]")
+            i = end + 1
+        else:
+            parts.append(re.escape(pattern[i]))
+            i += 1
+
+    regex = "".join(parts)
+    if not anchored:
+        regex = "(?:.*/)?" + regex
+    return re.compile(regex), dir_only
+
+
+CACHE_DIR = ".time_machine_cache"
+
+
+class MigrateCache:
+    """
+    Hashes of the contents of files that need no changes, by path, stored on
+    disk so that later runs can skip migrating them again. The cache is keyed
+    by the time-machine and Python versions, since either can change the
+    result.
+
+    Each path keeps only the hash of its latest contents, and paths that no
+    longer exist are dropped on saving, so the cache doesn't grow as files
+    are edited. Saving merges this run's changes into the cache on disk, but
+    if concurrent runs save at the same moment, the last writer wins, and
+    the others' changes are lost, costing only a re-check next run.
+    """
+
+    __slots__ = ("unchanged", "updates")
+
+    def __init__(self, unchanged: dict[str, str]) -> None:
+        self.unchanged = unchanged
+        self.updates: dict[str, str] = {}
+
+    @staticmethod
+    def key() -> str:
+        return f"{version('time-machine')}-{sys.implementation.cache_tag}"
+
+    @staticmethod
+    def digest(contents_bytes: bytes) -> str:
+        return hashlib.blake2b(contents_bytes, digest_size=16).hexdigest()
+
+    @classmethod
+    def load(cls, directory: str = CACHE_DIR) -> MigrateCache:
+        try:
+            with open(os.path.join(directory, "migrate.json"), "rb") as fb:
+                data = json.load(fb)
+            unchanged = data["unchanged"]
+            if (
+                data["key"] == cls.key()
+                and isinstance(unchanged, dict)
+                and all(isinstance(value, str) for value in unchanged.values())
+            ):
+                return cls(unchanged)
+        except (OSError, ValueError, TypeError, KeyError):
+            # Missing or corrupt, start afresh.
+            pass
+        return cls({})
+
+    def is_unchanged(self, filename: str, digest: str) -> bool:
+        return self.unchanged.get(os.path.normpath(filename)) == digest
+
+    def update(self, filename: str, digest: str) -> None:
+        path = os.path.normpath(filename)
+        self.unchanged[path] = digest
+        self.updates[path] = digest
+
+    def save(self, directory: str = CACHE_DIR) -> None:
+        if not self.updates:
+            return
+        os.makedirs(directory, exist_ok=True)
+        gitignore = os.path.join(directory, ".gitignore")
+        if not os.path.exists(gitignore):
+            with open(gitignore, "w") as f:
+                f.write("# Created by time-machine’s migrate command.\n*\n")
+        # Merge into the latest saved state, to keep changes saved by
+        # concurrent runs since loading.
+        unchanged = self.load(directory).unchanged
+        unchanged.update(self.updates)
+        unchanged = {
+            path: digest
+            for path, digest in sorted(unchanged.items())
+            if os.path.exists(path)
+        }
+        # Write then rename, so concurrent runs never see a partial file.
+        path = os.path.join(directory, "migrate.json")
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump({"key": self.key(), "unchanged": unchanged}, f)
+        os.replace(temp_path, path)
+        self.unchanged = unchanged
+        self.updates.clear()
+
+
+class MigrateOptions:
+    """
+    Options for migrating files, shared with worker processes.
+    """
+
+    __slots__ = ("cache", "check", "diff", "report")
+
+    def __init__(
+        self,
+        *,
+        cache: MigrateCache | None = None,
+        check: bool = False,
+        diff: bool = False,
+        report: bool = False,
+    ) -> None:
+        self.cache = cache
+        self.check = check
+        self.diff = diff
+        self.report = report
+
+    @property
+    def write(self) -> bool:
+        return not (self.check or self.diff)
+
+
+UNCHANGED = "unchanged"
+REWRITTEN = "rewritten"
+WOULD_REWRITE = "would_rewrite"
+ERROR = "error"
+
+
+class FileResult:
+    """
+    The outcome of migrating a single file, for --format=json.
+    """
+
+    __slots__ = ("filename", "status", "rewrites", "time", "error")
+
+    def __init__(
+        self,
+        filename: str,
+        status: str,
+        *,
+        rewrites: Mapping[str, int] | None = None,
+        time: float = 0.0,
+        error: str | None = None,
+    ) -> None:
+        self.filename = filename
+        self.status = status
+        self.rewrites = dict(rewrites or {})
+        self.time = time
+        self.error = error
+
+    @property
+    def returncode(self) -> int:
+        return self.status != UNCHANGED
+
+    def as_json(self) -> dict[str, object]:
+        data: dict[str, object] = {
+            "filename": self.filename,
+            "status": self.status,
+            "rewrites": self.rewrites,
+            "time": self.time,
+        }
+        if self.error is not None:
+            data["error"] = self.error
+        return data
+
+
+def migrate_files(
+    files: list[str],
+    jobs: int | None = None,
+    options: MigrateOptions | None = None,
+) -> int:
+    if options is None:
+        options = MigrateOptions()
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    jobs = min(jobs, len(files))
+
+    start = time.perf_counter()
+    results = []
+    if jobs <= 1 or "-" in files:
+        for filename in files:
+            results.append(migrate_file(filename, options))
+    else:
+        for result, out, err, updates in map_in_processes(
+            migrate_file_captured,
+            files,
+            jobs=jobs,
+            initializer=init_worker,
+            initargs=(options,),
+        ):
+            sys.stdout.write(out)
+            sys.stderr.write(err)
+            results.append(result)
+            if options.cache is not None:
+                for filename, digest in updates.items():
+                    options.cache.update(filename, digest)
+
+    if options.report:
+        json.dump(
+            {
+                "files": [result.as_json() for result in results],
+                "time": time.perf_counter() - start,
+            },
+            sys.stdout,
+            indent=2,
+        )
+        sys.stdout.write("\n")
+
     returncode = 0
-    for filename in files:
-        returncode |= migrate_file(filename)
+    for result in results:
+        returncode |= result.returncode
     return returncode
 
 
-def migrate_file(filename: str) -> int:
+R = TypeVar("R")
+
+
+def map_in_processes(
+    func: Callable[[str], R],
+    files: list[str],
+    *,
+    jobs: int,
+    initializer: Callable[..., None] | None = None,
+    initargs: tuple[Any, ...] = (),
+) -> Iterator[R]:
+    """
+    Call func on each file in a pool of worker processes, yielding the
+    results in order, so output matches a serial run.
+    """
+    # Hand out files in chunks, to amortize inter-process overhead, but
+    # keep several chunks per process so uneven files even out.
+    chunksize = max(1, len(files) // (jobs * 4))
+    with ProcessPoolExecutor(
+        max_workers=jobs,
+        initializer=initializer,
+        initargs=initargs,
+    ) as executor:
+        yield from executor.map(func, files, chunksize=chunksize)
+
+
+# The options in a worker process, set by init_worker().
+worker_options = MigrateOptions()
+
+
+def init_worker(options: MigrateOptions) -> None:
+    global worker_options
+    worker_options = options
+
+
+def migrate_file_captured(
+    filename: str,
+) -> tuple[FileResult, str, str, dict[str, str]]:
+    """
+    Run migrate_file(), capturing its output and the hashes it adds to the
+    cache, for use in worker processes.
+    """
+    out = io.StringIO()
+    err = io.StringIO()
+    with redirect_stdout(out), redirect_stderr(err):
+        result = migrate_file(filename, worker_options)
+    updates = {}
+    if worker_options.cache is not None:
+        updates = worker_options.cache.updates.copy()
+        worker_options.cache.updates.clear()
+    return result, out.getvalue(), err.getvalue(), updates
+
+
+# Every rewrite depends on one of "freezegun", "freeze_time", or "freezer"
+# appearing in the source, which all contain "freeze", or on a mock patch.
+PREFILTERS = (b"freeze", b"patch")
+
+# Files at least this large are searched for PREFILTERS with mmap, to avoid
+# reading the whole file when it does not match.
+MMAP_THRESHOLD = 1024 * 1024
+
+
+def migrate_file(filename: str, options: MigrateOptions | None = None) -> FileResult:
+    if options is None:
+        options = MigrateOptions()
+    start = time.perf_counter()
+    cache = options.cache
+    digest = None
     if filename == "-":
         contents_bytes = sys.stdin.buffer.read()
     else:
-        with open(filename, "rb") as fb:
-            contents_bytes = fb.read()
+        maybe_contents_bytes = read_if_prefilter_matches(filename)
+        if maybe_contents_bytes is None:
+            return FileResult(filename, UNCHANGED, time=time.perf_counter() - start)
+        contents_bytes = maybe_contents_bytes
+        if cache is not None:
+            digest = cache.digest(contents_bytes)
+            if cache.is_unchanged(filename, digest):
+                return FileResult(filename, UNCHANGED, time=time.perf_counter() - start)
 
     try:
         contents_text_orig = contents_text = contents_bytes.decode()
     except UnicodeDecodeError:
-        print(f"{filename} is non-utf-8 (not supported)")
-        return 1
+        if not options.report:
+            print(f"{filename} is non-utf-8 (not supported)")
+        return FileResult(
+            filename,
+            ERROR,
+            time=time.perf_counter() - start,
+            error="non-utf-8 (not supported)",
+        )
 
-    contents_text = migrate_contents(contents_text)
+    rewrites: Counter[str] = Counter()
+    contents_text = migrate_contents(contents_text, rewrites=rewrites)
+    changed = contents_text != contents_text_orig
 
-    if filename == "-":
+    if filename == "-" and options.write:
         print(contents_text, end="")
-    elif contents_text != contents_text_orig:
-        print(f"Rewriting {filename}", file=sys.stderr)
+    elif not changed:
+        if cache is not None and digest is not None:
+            cache.update(filename, digest)
+    elif options.diff:
+        sys.stdout.write(unified_diff(filename, contents_text_orig, contents_text))
+    elif options.check:
+        if not options.report:
+            print(f"Would rewrite {filename}", file=sys.stderr)
+    else:
+        if not options.report:
+            print(f"Rewriting {filename}", file=sys.stderr)
         with open(filename, "w", encoding="UTF-8", newline="") as f:
             f.write(contents_text)
 
-    return contents_text != contents_text_orig
+    if not changed:
+        status = UNCHANGED
+    elif options.write:
+        status = REWRITTEN
+    else:
+        status = WOULD_REWRITE
+    return FileResult(
+        filename,
+        status,
+        rewrites=rewrites,
+        time=time.perf_counter() - start,
+    )
+
+
+def unified_diff(filename: str, before: str, after: str) -> str:
+    lines = []
+    for line in difflib.unified_diff(
+        before.splitlines(keepends=True),
+        after.splitlines(keepends=True),
+        fromfile=filename,
+        tofile=filename,
+    ):
+        lines.append(line)
+        if not line.endswith("\n"):
+            lines.append("\n\\ No newline at end of file\n")
+    return "".join(lines)
+
+
+def read_if_prefilter_matches(filename: str) -> bytes | None:
+    """
+    Read the given file’s contents, or return None if its raw bytes do not
+    contain any of PREFILTERS, so it cannot need any changes.
+    """
+    with open(filename, "rb") as fb:
+        if os.fstat(fb.fileno()).st_size >= MMAP_THRESHOLD:
+            with mmap.mmap(fb.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                if all(mapped.find(prefilter) == -1 for prefilter in PREFILTERS):
+                    return None
+                return mapped[:]
+        contents_bytes = fb.read()
+    if not any(prefilter in contents_bytes for prefilter in PREFILTERS):
+        return None
+    return contents_bytes
+
+
+# Kinds of finding reported by scan, with the REWRITE_KINDS entry that
+# migrates each.
+FREEZEGUN_IMPORT = "freezegun_import"
+FREEZE_TIME_DECORATOR = "freeze_time_decorator"
+FREEZE_TIME_CONTEXT_MANAGER = "freeze_time_context_manager"
+FREEZE_TIME_MARKER = "freeze_time_marker"
+FREEZE_TIME_CALL = "freeze_time_call"
+FREEZER_FIXTURE = "freezer_fixture"
+TICK_TRUE = "tick_true"
+MOCK_TIME_PATCH = "mock_time_patch"
+
+FINDING_KINDS = (
+    FREEZEGUN_IMPORT,
+    FREEZE_TIME_DECORATOR,
+    FREEZE_TIME_CONTEXT_MANAGER,
+    FREEZE_TIME_MARKER,
+    FREEZE_TIME_CALL,
+    FREEZER_FIXTURE,
+    TICK_TRUE,
+    MOCK_TIME_PATCH,
+)
+
+
+class Finding:
+    """
+    A use of freezegun or time mocking found by scan.
+    """
+
+    __slots__ = ("kind", "line", "column", "migratable")
+
+    def __init__(self, kind: str, line: int, column: int, migratable: bool) -> None:
+        self.kind = kind
+        self.line = line
+        self.column = column
+        self.migratable = migratable
+
+    def as_json(self) -> dict[str, object]:
+        return {
+            "kind": self.kind,
+            "line": self.line,
+            "column": self.column,
+            "migratable": self.migratable,
+        }
+
+
+class ScanResult:
+    """
+    The findings in a single file.
+    """
+
+    __slots__ = ("filename", "findings", "error")
+
+    def __init__(
+        self,
+        filename: str,
+        findings: list[Finding] | None = None,
+        *,
+        error: str | None = None,
+    ) -> None:
+        self.filename = filename
+        self.findings = findings or []
+        self.error = error
+
+    def as_json(self) -> dict[str, object]:
+        data: dict[str, object] = {
+            "filename": self.filename,
+            "findings": [finding.as_json() for finding in self.findings],
+        }
+        if self.error is not None:
+            data["error"] = self.error
+        return data
+
+
+def scan_files(files: list[str], jobs: int | None = None, report: bool = False) -> int:
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    jobs = min(jobs, len(files))
+
+    start = time.perf_counter()
+    results: Iterable[ScanResult]
+    if jobs <= 1:
+        results = map(scan_file, files)
+    else:
+        results = map_in_processes(scan_file, files, jobs=jobs)
+
+    totals = {kind: {"count": 0, "migratable": 0} for kind in FINDING_KINDS}
+    reported = []
+    for result in results:
+        for finding in result.findings:
+            totals[finding.kind]["count"] += 1
+            totals[finding.kind]["migratable"] += finding.migratable
+        if not result.findings and result.error is None:
+            continue
+        if report:
+            reported.append(result.as_json())
+        elif result.error is not None:
+            print(f"{result.filename}: {result.error}")
+        else:
+            for finding in result.findings:
+                suffix = " (migratable)" if finding.migratable else ""
+                print(
+                    f"{result.filename}:{finding.line}:{finding.column}: "
+                    + f"{finding.kind}{suffix}"
+                )
+
+    if report:
+        json.dump(
+            {
+                "files": reported,
+                "scanned": len(files),
+                "totals": totals,
+                "time": time.perf_counter() - start,
+            },
+            sys.stdout,
+            indent=2,
+        )
+        sys.stdout.write("\n")
+    else:
+        count = sum(total["count"] for total in totals.values())
+        migratable = sum(total["migratable"] for total in totals.values())
+        print(
+            f"Scanned {len(files)} files, found {count} uses, {migratable} migratable."
+        )
+        for kind, total in totals.items():
+            if total["count"]:
+                print(f"  {kind}: {total['count']} ({total['migratable']} migratable)")
+    return 0
+
+
+def scan_file(filename: str) -> ScanResult:
+    contents_bytes = read_if_prefilter_matches(filename)
+    if contents_bytes is None:
+        return ScanResult(filename)
+    try:
+        contents_text = contents_bytes.decode()
+    except UnicodeDecodeError:
+        return ScanResult(filename, error="non-utf-8 (not supported)")
+    try:
+        tree = ast_parse(contents_text)
+    except SyntaxError as exc:
+        return ScanResult(filename, error=f"syntax error: {exc.msg}")
+    return ScanResult(filename, scan_tree(tree))
+
+
+def scan_tree(tree: ast.Module) -> list[Finding]:
+    """
+    Find uses of freezegun and time mocking in the AST, marking those that
+    visit() migrates, by checking for its callbacks at their offsets.
+    """
+    callbacks = visit(tree)
+    findings = []
+    # Calls already reported as decorators or context managers.
+    seen: set[ast.expr] = set()
+
+    def add(
+        kind: str,
+        node: ast.arg | ast.expr | ast.stmt,
+        rewrite_kind: str,
+        offset_node: ast.arg | ast.expr | ast.stmt | None = None,
+    ) -> None:
+        offset = ast_start_offset(offset_node or node)
+        migratable = any(
+            REWRITE_KINDS.get(getattr(func, "func", func)) == rewrite_kind
+            for func in callbacks.get(offset, ())
+        )
+        findings.append(Finding(kind, node.lineno, node.col_offset + 1, migratable))
+
+    for node in ast.walk(tree):
+        match node:
+            case ast.Import() if any(
+                alias.name.split(".")[0] == "freezegun" for alias in node.names
+            ):
+                add(FREEZEGUN_IMPORT, node, "import")
+            case ast.ImportFrom(module=str(module), level=0) if (
+                module.split(".")[0] == "freezegun"
+            ):
+                add(FREEZEGUN_IMPORT, node, "import")
+            case ast.FunctionDef() | ast.AsyncFunctionDef() | ast.ClassDef():
+                for decorator in node.decorator_list:
+                    if (callee := freeze_time_callee(decorator)) is None:
+                        continue
+                    seen.add(decorator)
+                    if is_freeze_time_marker(callee):
+                        add(FREEZE_TIME_MARKER, decorator, "marker", callee)
+                    else:
+                        add(FREEZE_TIME_DECORATOR, decorator, "freeze_time", callee)
+                if not isinstance(node, ast.ClassDef):
+                    for arg in (*node.args.args, *node.args.kwonlyargs):
+                        if arg.arg == "freezer":
+                            add(FREEZER_FIXTURE, arg, "freezer_to_time_machine")
+            case ast.With() | ast.AsyncWith():
+                for item in node.items:
+                    expr = item.context_expr
+                    if (callee := freeze_time_callee(expr)) is not None:
+                        seen.add(expr)
+                        add(FREEZE_TIME_CONTEXT_MANAGER, expr, "freeze_time", callee)
+            case ast.Call():
+                callee = freeze_time_callee(node)
+                if callee is not None:
+                    if node not in seen:
+                        add(FREEZE_TIME_CALL, node, "freeze_time", callee)
+                    if any(
+                        kw.arg == "tick"
+                        and isinstance(kw.value, ast.Constant)
+                        and kw.value.value is True
+                        for kw in node.keywords
+                    ):
+                        rewrite_kind = (
+                            "marker" if is_freeze_time_marker(callee) else "freeze_time"
+                        )
+                        add(TICK_TRUE, node, rewrite_kind, callee)
+                elif is_mock_time_patch(node):
+                    add(MOCK_TIME_PATCH, node, "mock_patch")
+
+    findings.sort(key=lambda finding: (finding.line, finding.column))
+    return findings
 
 
-def migrate_contents(contents_text: str) -> str:
-    """Migrate a single text from freezegun to time-machine."""
+def freeze_time_callee(node: ast.expr) -> ast.expr | None:
+    """
+    If the expression is freeze_time, or a call to it, in any spelling like
+    ``freeze_time``, ``freezegun.freeze_time``, or
+    ``pytest.mark.freeze_time``, return the callee.
+    """
+    callee = node.func if isinstance(node, ast.Call) else node
+    match callee:
+        case ast.Name(id="freeze_time") | ast.Attribute(attr="freeze_time"):
+            return callee
+    return None
+
+
+def is_freeze_time_marker(node: ast.expr) -> bool:
+    match node:
+        case ast.Attribute(attr="freeze_time", value=ast.Attribute(attr="mark")):
+            return True
+    return False
+
+
+# Final names of mock patch targets reported by scan, covering the time and
+# datetime functions that time-machine patches, and the modules and classes
+# that provide them.
+SCAN_MOCK_PATCH_NAMES = frozenset(
+    [
+        "date",
+        "datetime",
+        "gmtime",
+        "localtime",
+        "now",
+        "strftime",
+        "time",
+        "time_ns",
+        "today",
+        "utcnow",
+    ]
+)
+
+
+def is_mock_time_patch(node: ast.Call) -> bool:
+    """
+    Check if the call looks like a mock patch of time, such as
+    ``mock.patch("time.time")`` or ``mock.patch.object(datetime, "now")``.
+    Unlike find_mock_time_patch(), which only accepts calls it can migrate,
+    this matches any target with a name in SCAN_MOCK_PATCH_NAMES.
+    """
+    func = node.func
+    if is_mock_patch(func):
+        index = 0
+    elif (
+        isinstance(func, ast.Attribute)
+        and func.attr == "object"
+        and is_mock_patch(func.value)
+    ):
+        index = 1
+    else:
+        return False
+    if len(node.args) <= index:
+        return False
+    match node.args[index]:
+        case ast.Constant(value=str(target)):
+            return target.rpartition(".")[2] in SCAN_MOCK_PATCH_NAMES
+    return False
+
+
+def migrate_contents(contents_text: str, rewrites: Counter[str] | None = None) -> str:
+    """
+    Migrate a single text from freezegun to time-machine, optionally
+    counting the rewrites made by kind.
+    """
     try:
         ast_obj = ast_parse(contents_text)
     except SyntaxError:
@@ -89,20 +995,139 @@ def migrate_contents(contents_text: str) -> str:
     if not callbacks:
         return contents_text
 
-    tokens = src_to_tokens(contents_text)
+    if rewrites is not None:
+        rewrites.update(count_rewrites(callbacks))
+
+    rewritten = rewrite_spans(contents_text, ast_obj, callbacks)
+    if rewritten is not None:
+        return rewritten
+    return rewrite_all(contents_text, callbacks)
 
+
+def count_rewrites(callbacks: Mapping[Offset, list[TokenFunc]]) -> Counter[str]:
+    """
+    Count the rewrites that the callbacks make, by kind.
+    """
+    counts: Counter[str] = Counter()
+    for funcs in callbacks.values():
+        for func in funcs:
+            kind = REWRITE_KINDS.get(getattr(func, "func", func))
+            if kind is not None:
+                counts[kind] += 1
+    return counts
+
+
+def rewrite_all(contents_text: str, callbacks: Mapping[Offset, list[TokenFunc]]) -> str:
+    """
+    Apply the callbacks by tokenizing the whole text.
+    """
+    tokens = src_to_tokens(contents_text)
     fixup_dedent_tokens(tokens)
+    apply_callbacks(tokens, callbacks)
+    # no types for tokenize-rt
+    return tokens_to_src(tokens)  # type: ignore [no-any-return]
+
+
+def rewrite_spans(
+    contents_text: str,
+    tree: ast.Module,
+    callbacks: Mapping[Offset, list[TokenFunc]],
+) -> str | None:
+    """
+    Apply the callbacks by tokenizing only the spans of lines containing
+    their offsets, splicing the rewritten spans back into the text, so the
+    cost scales with the number of edits rather than the size of the text.
 
+    Return None if a span does not tokenize on its own, or its callbacks do
+    not all match tokens, so the caller can fall back to rewrite_all().
+    """
+    if "\r" in contents_text.replace("\r\n", ""):
+        # ast treats lone carriage returns as newlines, but tokenize-rt does
+        # not, so line numbers could disagree.
+        return None
+
+    lines = io.StringIO(contents_text).readlines()
+    starts = logical_line_starts(tree, lines)
+
+    # Each span runs from the start of a logical line up to, but excluding,
+    # the next one. Adjacent spans are merged, to tokenize fewer pieces.
+    spans: list[tuple[int, int, dict[Offset, list[TokenFunc]]]] = []
+    for offset in sorted(callbacks):
+        i = bisect.bisect_right(starts, offset.line)
+        start = starts[i - 1] if i > 0 else 1
+        end = starts[i] if i < len(starts) else len(lines) + 1
+        if spans and spans[-1][1] >= start:
+            start, _, span_callbacks = spans[-1]
+            spans[-1] = (start, end, span_callbacks)
+        else:
+            span_callbacks = {}
+            spans.append((start, end, span_callbacks))
+        span_callbacks[offset] = callbacks[offset]
+
+    # Work backwards so earlier line indexes stay valid when splicing.
+    for start, end, span_callbacks in reversed(spans):
+        try:
+            tokens = src_to_tokens("".join(lines[start - 1 : end - 1]))
+        except (tokenize.TokenError, SyntaxError):
+            return None
+        line_delta = start - 1
+        tokens = [
+            token._replace(line=token.line + line_delta)
+            if token.line is not None
+            else token
+            for token in tokens
+        ]
+        fixup_dedent_tokens(tokens)
+        if apply_callbacks(tokens, span_callbacks) != len(span_callbacks):
+            return None
+        lines[start - 1 : end - 1] = [tokens_to_src(tokens)]
+
+    return "".join(lines)
+
+
+def logical_line_starts(tree: ast.Module, lines: list[str]) -> list[int]:
+    """
+    Return the sorted numbers of lines that begin with a statement, decorator,
+    or except clause. Since these cannot begin within brackets or strings,
+    each line begins a logical line that tokenizes the same on its own.
+    """
+    linenos = set()
+    nodes: list[ast.AST] = [tree]
+    while nodes:
+        node = nodes.pop()
+        for field in ("body", "orelse", "finalbody", "handlers", "cases"):
+            for child in getattr(node, field, ()):
+                nodes.append(child)
+                if isinstance(child, (ast.stmt, ast.ExceptHandler)):
+                    line = lines[child.lineno - 1]
+                    if not line[: child.col_offset].strip(" \t\f"):
+                        linenos.add(child.lineno)
+                for decorator in getattr(child, "decorator_list", ()):
+                    line = lines[decorator.lineno - 1]
+                    if line.lstrip(" \t\f").startswith("@"):
+                        linenos.add(decorator.lineno)
+    return sorted(linenos)
+
+
+def apply_callbacks(
+    tokens: list[Token], callbacks: Mapping[Offset, list[TokenFunc]]
+) -> int:
+    """
+    Apply the callbacks to the tokens at their offsets, returning the number
+    of offsets matched.
+    """
+    matched = 0
     for i, token in reversed_enumerate(tokens):
         if not token.src:
             continue
         # though this is a defaultdict, by using `.get()` this function's
         # self time is almost 50% faster
-        for callback in callbacks.get(token.offset, ()):
-            callback(tokens, i)
-
-    # no types for tokenize-rt
-    return tokens_to_src(tokens)  # type: ignore [no-any-return]
+        token_callbacks = callbacks.get(token.offset, ())
+        if token_callbacks:
+            matched += 1
+            for callback in token_callbacks:
+                callback(tokens, i)
+    return matched
 
 
 def ast_parse(contents_text: str) -> ast.Module:
@@ -147,6 +1172,69 @@ class FreezerFunction:
         self.marker_seen = marker_seen
 
 
+T = TypeVar("T")
+
+
+class LineInterval(Generic[T]):
+    __slots__ = ("lineno", "end_lineno", "value", "parent")
+
+    def __init__(
+        self,
+        lineno: int,
+        end_lineno: int,
+        value: T,
+        parent: LineInterval[T] | None,
+    ) -> None:
+        self.lineno = lineno
+        self.end_lineno = end_lineno
+        self.value = value
+        self.parent = parent
+
+
+class LineIntervalIndex(Generic[T]):
+    """
+    Index of line ranges of AST nodes, for finding the innermost range
+    containing a line in logarithmic time, rather than scanning them all.
+
+    Ranges must be nested or disjoint, like those of function definitions,
+    and added outermost first, as ast.walk() yields them. Each range links to
+    its innermost enclosing range, so a lookup bisects the range starts and
+    then walks up from the closest preceding range.
+    """
+
+    __slots__ = ("linenos", "intervals")
+
+    def __init__(self) -> None:
+        self.linenos: list[int] = []
+        self.intervals: list[LineInterval[T]] = []
+
+    def add(self, lineno: int, end_lineno: int, value: T) -> None:
+        i = bisect.bisect_right(self.linenos, lineno)
+        # Since ranges nest, the innermost one containing the start contains
+        # the whole range.
+        parent = self.find_interval(lineno, i)
+        self.linenos.insert(i, lineno)
+        self.intervals.insert(i, LineInterval(lineno, end_lineno, value, parent))
+
+    def find(self, lineno: int) -> T | None:
+        """
+        Return the value of the innermost range containing the line, if any.
+        """
+        interval = self.find_interval(lineno, bisect.bisect_right(self.linenos, lineno))
+        if interval is None:
+            return None
+        return interval.value
+
+    def find_interval(self, lineno: int, i: int) -> LineInterval[T] | None:
+        # The closest range starting at or before the line is the innermost
+        # candidate. If it ends before the line, its enclosing ranges might
+        # not.
+        interval = self.intervals[i - 1] if i > 0 else None
+        while interval is not None and interval.end_lineno < lineno:
+            interval = interval.parent
+        return interval
+
+
 class TravellerVar:
     """
     Details of a variable bound with ``as`` to a migrated freeze_time()
@@ -169,9 +1257,12 @@ def visit(tree: ast.Module) -> Mapping[Offset, list[TokenFunc]]:
     ret: defaultdict[Offset, list[TokenFunc]] = defaultdict(list)
     freezegun_import_seen = False
     freeze_time_import_seen = False
-    freezer_functions: list[FreezerFunction] = []
+    freezer_functions: LineIntervalIndex[FreezerFunction] = LineIntervalIndex()
     marker_class_methods: set[ast.FunctionDef | ast.AsyncFunctionDef] = set()
-    traveller_vars: list[TravellerVar] = []
+    traveller_vars: defaultdict[str, LineIntervalIndex[TravellerVar]] = defaultdict(
+        LineIntervalIndex
+    )
+    mock_patches: list[tuple[ast.Call, ast.expr]] = []
     for node in ast.walk(tree):
         match node:
             case ast.Import() if (
@@ -223,8 +1314,9 @@ def visit(tree: ast.Module) -> Mapping[Offset, list[TokenFunc]]:
                 if freezer_args:
                     for arg in freezer_args:
                         ret[ast_start_offset(arg)].append(replace_freezer)
-                    freezer_functions.append(
-                        FreezerFunction(node, marker_seen=marker_seen)
+                    function = FreezerFunction(node, marker_seen=marker_seen)
+                    freezer_functions.add(
+                        function.lineno, function.end_lineno, function
                     )
 
             case ast.ClassDef() if node.decorator_list:
@@ -256,6 +1348,11 @@ def visit(tree: ast.Module) -> Mapping[Offset, list[TokenFunc]]:
                                 freeze_time_import_seen=freeze_time_import_seen,
                                 freezer_functions=freezer_functions,
                             )
+                            mock_patch = find_mock_time_patch(
+                                item.context_expr, freezer_functions=freezer_functions
+                            )
+                            if mock_patch is not None:
+                                mock_patches.append(mock_patch)
                         case ast.Name(id=name) as binding:
                             if traveller_var_uses_compatible(
                                 node, binding
@@ -266,7 +1363,10 @@ def visit(tree: ast.Module) -> Mapping[Offset, list[TokenFunc]]:
                                 freeze_time_import_seen=freeze_time_import_seen,
                                 freezer_functions=freezer_functions,
                             ):
-                                traveller_vars.append(TravellerVar(name, node))
+                                var = TravellerVar(name, node)
+                                traveller_vars[name].add(
+                                    var.lineno, var.end_lineno, var
+                                )
 
             case ast.Expr(
                 value=ast.Call(
@@ -285,14 +1385,9 @@ def visit(tree: ast.Module) -> Mapping[Offset, list[TokenFunc]]:
                     ret[ast_start_offset(receiver_node)].append(
                         partial(replace_tick_with_shift, node=call_node)
                     )
-                elif any(
-                    traveller_var.name == receiver
-                    and (
-                        traveller_var.lineno
-                        <= call_node.lineno
-                        <= traveller_var.end_lineno
-                    )
-                    for traveller_var in traveller_vars
+                elif (
+                    receiver in traveller_vars
+                    and traveller_vars[receiver].find(call_node.lineno) is not None
                 ):
                     ret[ast_start_offset(receiver_node)].append(
                         partial(replace_tick_with_shift, node=call_node)
@@ -315,20 +1410,138 @@ def visit(tree: ast.Module) -> Mapping[Offset, list[TokenFunc]]:
                         partial(add_tick_false, node=node)
                     )
 
+    if mock_patches and (import_node := time_machine_import_target(tree)):
+        if import_node is not True:
+            ret[ast_start_offset(import_node)].append(add_import_time_machine)
+        for call, value in mock_patches:
+            ret[ast_start_offset(call)].append(
+                partial(replace_mock_patch, node=call, value=value)
+            )
+
     return ret
 
 
+MOCK_TIME_PATCH_TARGETS = frozenset(["time.time"])
+
+
+def find_mock_time_patch(
+    node: ast.expr, *, freezer_functions: LineIntervalIndex[FreezerFunction]
+) -> tuple[ast.Call, ast.expr] | None:
+    """
+    If the given expression is a migratable mock patch of time.time() that
+    returns a fixed value, like ``mock.patch("time.time", return_value=1.5)``,
+    return the call and the value’s nodes.
+
+    Only non-negative number literals that time-machine reproduces exactly
+    are accepted, so that time.time() returns the same value after migration.
+    time.time_ns() is not supported, since time-machine takes destinations in
+    seconds.
+    """
+    if not (
+        isinstance(node, ast.Call)
+        and len(node.keywords) == 1
+        and node.keywords[0].arg == "return_value"
+    ):
+        return None
+
+    func = node.func
+    if is_mock_patch(func):
+        if not (
+            len(node.args) == 1
+            and isinstance(node.args[0], ast.Constant)
+            and node.args[0].value in MOCK_TIME_PATCH_TARGETS
+        ):
+            return None
+    elif (
+        isinstance(func, ast.Attribute)
+        and func.attr == "object"
+        and is_mock_patch(func.value)
+    ):
+        if not (
+            len(node.args) == 2
+            and isinstance(node.args[0], ast.Name)
+            and isinstance(node.args[1], ast.Constant)
+            and isinstance(node.args[1].value, str)
+            and f"{node.args[0].id}.{node.args[1].value}" in MOCK_TIME_PATCH_TARGETS
+        ):
+            return None
+    else:
+        return None
+
+    if find_freezer_function(freezer_functions, node) is not None:
+        # The time_machine module is shadowed, as in maybe_migrate_call().
+        return None
+
+    value = node.keywords[0].value
+    match value:
+        case ast.Constant(value=int() | float() as number) if (
+            not isinstance(number, bool)
+            and number >= 0
+            # time-machine stores destinations in integer nanoseconds.
+            and round(number * 1_000_000_000) / 1_000_000_000 == number
+        ):
+            return node, value
+    return None
+
+
+def is_mock_patch(node: ast.expr) -> bool:
+    """
+    Check if the expression looks like unittest.mock’s patch(), as
+    ``patch``, ``mock.patch``, or ``unittest.mock.patch``.
+    """
+    match node:
+        case ast.Name(id="patch"):
+            return True
+        case ast.Attribute(value=ast.Name(id="mock"), attr="patch"):
+            return True
+        case ast.Attribute(
+            value=ast.Attribute(value=ast.Name(id="unittest"), attr="mock"),
+            attr="patch",
+        ):
+            return True
+    return False
+
+
+def time_machine_import_target(tree: ast.Module) -> ast.stmt | bool:
+    """
+    Find where to add ``import time_machine`` for migrated mock patches.
+    Return True if the module already imports it, or will once migrated from
+    freezegun, the first top-level import to add it before, or False if there
+    is no suitable place.
+    """
+    target: ast.stmt | None = None
+    for stmt in tree.body:
+        match stmt:
+            case ast.Import(names=names) if any(
+                alias.name in ("time_machine", "freezegun") and alias.asname is None
+                for alias in names
+            ):
+                return True
+            case ast.ImportFrom(module="freezegun", level=0, names=names) if any(
+                alias.name == "freeze_time" and alias.asname is None for alias in names
+            ):
+                return True
+            case ast.Import() | ast.ImportFrom() if (
+                target is None
+                and stmt.col_offset == 0
+                and not (
+                    isinstance(stmt, ast.ImportFrom) and stmt.module == "__future__"
+                )
+            ):
+                target = stmt
+    if target is None:
+        return False
+    return target
+
+
 def find_freezer_function(
-    freezer_functions: list[FreezerFunction], node: ast.expr
+    freezer_functions: LineIntervalIndex[FreezerFunction], node: ast.expr
 ) -> FreezerFunction | None:
     """
     Find the innermost function with a freezer fixture argument containing the
     given node, if any.
     """
-    for function in reversed(freezer_functions):
-        if function.lineno <= node.lineno <= function.end_lineno:
-            return function
-    return None
+    return freezer_functions.find(node.lineno)
 
 
 def maybe_migrate_call(
@@ -337,7 +1550,7 @@ def maybe_migrate_call(
     *,
     freezegun_import_seen: bool,
     freeze_time_import_seen: bool,
-    freezer_functions: list[FreezerFunction],
+    freezer_functions: LineIntervalIndex[FreezerFunction],
 ) -> bool:
     """
     Add the callbacks to rewrite the given expression, if it is a migratable
@@ -580,7 +1793,8 @@ def line_indent(tokens: list[Token], i: int) -> str:
     if (
         i > 0
         and tokens[i - 1].name in (INDENT, UNIMPORTANT_WS)
-        and tokens[i - 2].name in ("NEWLINE", "NL", DEDENT)
+        # i == 1 for the first line of a span from rewrite_spans().
+        and (i == 1 or tokens[i - 2].name in ("NEWLINE", "NL", DEDENT))
     ):
         # no types for tokenize-rt
         return tokens[i - 1].src  # type: ignore [no-any-return]
@@ -633,6 +1847,39 @@ def add_tick_false(tokens: list[Token], i: int, node: ast.Call) -> None:
         tokens.insert(j, Token(name=CODE, src=", tick=False"))
 
 
+def add_import_time_machine(tokens: list[Token], i: int) -> None:
+    tokens.insert(i, Token(name=CODE, src="import time_machine\n"))
+
+
+def replace_mock_patch(
+    tokens: list[Token], i: int, node: ast.Call, value: ast.expr
+) -> None:
+    """
+    Replace a mock patch of time.time() with an equivalent travel().
+    """
+    j = find_last_token(tokens, i, node=node)
+    k = i
+    while tokens[k].offset != ast_start_offset(value):
+        k += 1
+    value_src = tokens_to_src(tokens[k : find_last_token(tokens, k, node=value) + 1])
+    tokens[i : j + 1] = [
+        Token(name=CODE, src=f"time_machine.travel({value_src}, tick=False)")
+    ]
+
+
+# Kinds of rewrite reported by --format=json, by the callback making them.
+# Adding tick=False is part of other rewrites, so is not counted.
+REWRITE_KINDS: dict[Callable[..., None], str] = {
+    replace_import: "import",
+    replace_import_from: "import",
+    switch_to_travel: "freeze_time",
+    switch_to_marker: "marker",
+    replace_tick_with_shift: "tick_to_shift",
+    replace_freezer: "freezer_to_time_machine",
+    replace_mock_patch: "mock_patch",
+}
+
+
 # Token functions
 
 
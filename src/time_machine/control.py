@@ -0,0 +1,181 @@
+"""
+A control server, to change the time in a running process from another
+process, over a Unix domain socket.
+
+The protocol is line-based: clients send commands, each on its own line, and
+the server replies to each with a line that starts with "ok" or "error".
+Commands apply to the active Traveller:
+
+* "shift <seconds>" - shift the time by a number of seconds.
+* "move_to <destination>" - move to a Unix timestamp, or a datetime string.
+* "freeze" - stop ticking at the current time.
+* "status" - reply with the current time, in nanoseconds since the epoch.
+"""
+
+from __future__ import annotations
+
+import os
+import socket
+import threading
+from types import TracebackType
+
+from time_machine import active_traveller
+
+
+class ControlServer:
+    """
+    Listen on a Unix domain socket for commands to change the time, in a
+    background thread, serving each client on its own thread.
+    """
+
+    def __init__(self, path: str | os.PathLike[str]) -> None:
+        if not hasattr(socket, "AF_UNIX"):  # pragma: no cover
+            raise RuntimeError("ControlServer requires Unix domain sockets.")
+        self.path = os.fspath(path)
+        self._socket: socket.socket | None = None
+        self._thread: threading.Thread | None = None
+        self._stopping = False
+        # Open client connections, and the threads serving them.
+        self._clients: dict[socket.socket, threading.Thread] = {}
+        self._clients_lock = threading.Lock()
+
+    def start(self) -> None:
+        if self._socket is not None:
+            raise RuntimeError("ControlServer is already started.")
+        self._stopping = False
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            self._socket.bind(self.path)
+            # Only let the process's user connect, since clients control the
+            # time.
+            os.chmod(self.path, 0o600)
+            self._socket.listen()
+        except OSError:
+            self._socket.close()
+            self._socket = None
+            raise
+        self._thread = threading.Thread(
+            target=self._serve,
+            name="time-machine control server",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._socket is None:
+            raise RuntimeError("ControlServer is not started.")
+        assert self._thread is not None
+        self._stopping = True
+        # Connect to wake the thread from accept(), since closing a socket
+        # doesn't reliably interrupt it.
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as waker:
+            waker.connect(self.path)
+        self._thread.join()
+        # Shut down open connections to end their threads' reads, since
+        # clients may hold them open indefinitely.
+        with self._clients_lock:
+            clients = list(self._clients.items())
+        for connection, _ in clients:
+            try:
+                connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                # Already closed by its thread.
+                pass
+        for _, thread in clients:
+            thread.join()
+        self._socket.close()
+        os.unlink(self.path)
+        self._socket = None
+        self._thread = None
+
+    def __enter__(self) -> ControlServer:
+        self.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        self.stop()
+
+    def _serve(self) -> None:
+        assert self._socket is not None
+        while True:
+            connection, _ = self._socket.accept()
+            if self._stopping:
+                connection.close()
+                return
+            thread = threading.Thread(
+                target=self._serve_client,
+                args=(connection,),
+                name="time-machine control server client",
+                daemon=True,
+            )
+            with self._clients_lock:
+                self._clients[connection] = thread
+            thread.start()
+
+    def _serve_client(self, connection: socket.socket) -> None:
+        try:
+            with connection:
+                self._handle(connection)
+        except OSError:
+            # The client went away.
+            pass
+        finally:
+            with self._clients_lock:
+                del self._clients[connection]
+
+    def _handle(self, connection: socket.socket) -> None:
+        with (
+            connection.makefile("r", encoding="utf-8") as reader,
+            connection.makefile("w", encoding="utf-8") as writer,
+        ):
+            for line in reader:
+                writer.write(run_command(line) + "\n")
+                writer.flush()
+
+
+def run_command(line: str) -> str:
+    """
+    Run a command on the active Traveller, returning the reply.
+    """
+    command, _, argument = line.strip().partition(" ")
+    argument = argument.strip()
+    try:
+        # Within the try, since travel may stop in another thread.
+        traveller = active_traveller()
+        if command == "shift":
+            traveller.shift(float(argument))
+        elif command == "move_to":
+            if not argument:
+                raise ValueError("move_to requires a destination.")
+            destination: float | str
+            try:
+                destination = float(argument)
+            except ValueError:
+                destination = argument
+            traveller.move_to(destination)
+        elif command == "freeze":
+            traveller.freeze()
+        elif command == "status":
+            return f"ok {traveller.time_ns()}"
+        else:
+            return f"error Unknown command {command!r}."
+    except Exception as exc:
+        return f"error {exc}"
+    return "ok"
+
+
+def send_command(path: str | os.PathLike[str], command: str) -> str:
+    """
+    Send a command to the ControlServer listening at path, returning its
+    reply.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(os.fspath(path))
+        client.sendall(command.encode() + b"\n")
+        with client.makefile("r", encoding="utf-8") as reader:
+            return reader.readline().rstrip("\n")
@@ -0,0 +1,140 @@
+"""
+Hypothesis strategies for travel() destinations, and a decorator to travel
+once per test while resetting the time for each example.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import functools
+from collections.abc import Callable
+from typing import Any, TypeVar
+from zoneinfo import ZoneInfo
+
+from hypothesis import strategies as st
+
+from time_machine import Checkpoint, DestinationType, Traveller, travel
+
+_F = TypeVar("_F", bound=Callable[..., Any])
+
+# Bounds that keep timestamps positive, whatever timezone offset is applied,
+# since Windows cannot convert negative timestamps, and within the year range
+# that all supported platforms can convert.
+MIN_DATETIME = dt.datetime(1970, 1, 2)
+MAX_DATETIME = dt.datetime(2500, 1, 1)
+
+# Bounds for timedelta destinations, relative to the current time.
+MIN_TIMEDELTA = dt.timedelta(days=-365 * 50)
+MAX_TIMEDELTA = dt.timedelta(days=365 * 50)
+
+
+def zoneinfos() -> st.SearchStrategy[ZoneInfo]:
+    """
+    Generate ZoneInfo timezones that time-machine can mock.
+    """
+    # The "right/*" zones count leap seconds in POSIX timestamps, which makes
+    # timestamps inconsistent with datetime arithmetic.
+    return st.timezones().filter(lambda tz: not tz.key.startswith("right/"))
+
+
+def aware_datetimes(
+    min_value: dt.datetime = MIN_DATETIME,
+    max_value: dt.datetime = MAX_DATETIME,
+) -> st.SearchStrategy[dt.datetime]:
+    """
+    Generate aware datetimes in UTC or a ZoneInfo timezone, between the given
+    naive bounds.
+    """
+    return st.datetimes(
+        min_value=min_value,
+        max_value=max_value,
+        timezones=st.just(dt.timezone.utc) | zoneinfos(),
+    )
+
+
+def timestamps(
+    min_value: dt.datetime = MIN_DATETIME,
+    max_value: dt.datetime = MAX_DATETIME,
+) -> st.SearchStrategy[float]:
+    """
+    Generate float Unix timestamps between the given naive bounds, taken as
+    UTC.
+    """
+    return st.floats(
+        min_value=min_value.replace(tzinfo=dt.timezone.utc).timestamp(),
+        max_value=max_value.replace(tzinfo=dt.timezone.utc).timestamp(),
+    )
+
+
+def timedeltas(
+    min_value: dt.timedelta = MIN_TIMEDELTA,
+    max_value: dt.timedelta = MAX_TIMEDELTA,
+) -> st.SearchStrategy[dt.timedelta]:
+    """
+    Generate timedeltas, for destinations relative to the current time.
+    """
+    return st.timedeltas(min_value=min_value, max_value=max_value)
+
+
+def destinations() -> st.SearchStrategy[dt.datetime | float | dt.timedelta]:
+    """
+    Generate destinations of any of the above kinds.
+    """
+    return aware_datetimes() | timestamps() | timedeltas()
+
+
+# Travellers started by travel_per_example(), innermost last.
+_travellers: list[Traveller] = []
+
+
+def current_traveller() -> Traveller:
+    """
+    Return the Traveller started by the innermost travel_per_example().
+    """
+    if not _travellers:
+        raise RuntimeError("No travel_per_example() test is running.")
+    return _travellers[-1]
+
+
+def travel_per_example(
+    destination: DestinationType, *, tick: bool = True
+) -> Callable[[_F], _F]:
+    """
+    Travel for a whole Hypothesis test, resetting the time to the
+    destination before each example with a checkpoint, rather than starting
+    and stopping travel for every example. Apply above @given.
+    """
+
+    def decorator(test: _F) -> _F:
+        if not getattr(test, "is_hypothesis_test", False):
+            raise TypeError(
+                "travel_per_example() must be applied to a Hypothesis test, "
+                + "above @given."
+            )
+
+        checkpoints: list[Checkpoint] = []
+        inner_test = test.hypothesis.inner_test  # type: ignore[attr-defined]
+
+        @functools.wraps(inner_test)
+        def reset_inner_test(*args: Any, **kwargs: Any) -> Any:
+            try:
+                return inner_test(*args, **kwargs)
+            finally:
+                _travellers[-1].restore(checkpoints[-1])
+
+        test.hypothesis.inner_test = reset_inner_test  # type: ignore[attr-defined]
+
+        @functools.wraps(test)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with travel(destination, tick=tick) as traveller:
+                _travellers.append(traveller)
+                checkpoints.append(traveller.checkpoint())
+                try:
+                    return test(*args, **kwargs)
+                finally:
+                    checkpoints.pop()
+                    _travellers.pop()
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
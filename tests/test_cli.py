@@ -1,20 +1,46 @@
 from __future__ import annotations
 
+import ast
 import io
+import json
+import struct
 import subprocess
 import sys
+from collections import Counter
 from pathlib import Path
 from textwrap import dedent
 from unittest import mock
 
 import pytest
+from tokenize_rt import Offset, src_to_tokens
 
 # import __main__ for coverage
-from time_machine import __main__  # noqa: F401
-from time_machine.cli import main, migrate_contents
+from time_machine import (
+    __main__,  # noqa: F401
+    cli,
+)
+from time_machine.cli import (
+    LineIntervalIndex,
+    MigrateCache,
+    MigrateOptions,
+    compile_exclude,
+    main,
+    migrate_contents,
+    migrate_file_captured,
+    rewrite_all,
+    rewrite_spans,
+    scan_tree,
+    serve,
+    visit,
+)
 
 
 class TestMain:
+    @pytest.fixture(autouse=True)
+    def chdir_tmp_path(self, monkeypatch, tmp_path):
+        # Isolate the cache directory.
+        monkeypatch.chdir(tmp_path)
+
     def test_no_subcommand(self, capsys):
         with pytest.raises(SystemExit) as excinfo:
             main([])
@@ -27,7 +53,7 @@ class TestMain:
             else Path(sys.argv[0]).name
         )
         assert err == (
-            f"usage: {prog_name} [-h] {{migrate}} ...\n"
+            f"usage: {prog_name} [-h] {{migrate,scan}} ...\n"
             + f"{prog_name}: error: the following arguments are required: command\n"
         )
         assert out == ""
@@ -78,7 +104,7 @@ class TestMain:
 
     def test_migrate_syntax_error(self, capsys, tmp_path):
         path = tmp_path / "example.py"
-        path.write_text("def def def\n")
+        path.write_text("import freezegun\ndef def def\n")
 
         result = main(["migrate", str(path)])
 
@@ -87,11 +113,13 @@ class TestMain:
         assert out == ""
         assert err == ""
 
-        assert path.read_text() == "def def def\n"
+        assert path.read_text() == "import freezegun\ndef def def\n"
 
     def test_migrate_non_utf8(self, capsys, tmp_path):
         path = tmp_path / "example.py"
-        path.write_bytes("# -*- coding: cp1252 -*-\nx = €\n".encode("cp1252"))
+        path.write_bytes(
+            "# -*- coding: cp1252 -*-\nimport freezegun\nx = €\n".encode("cp1252")
+        )
 
         result = main(["migrate", str(path)])
 
@@ -135,6 +163,1108 @@ class TestMain:
         assert out == "import time_machine\n"
         assert err == ""
 
+    def test_migrate_jobs_zero(self, capsys):
+        with pytest.raises(SystemExit) as excinfo:
+            main(["migrate", "--jobs", "0", "example.py"])
+
+        assert excinfo.value.code == 2
+        out, err = capsys.readouterr()
+        assert err.endswith(
+            "argument -j/--jobs: '0' is not a positive integer\n",
+        )
+
+    def test_migrate_jobs_not_integer(self, capsys):
+        with pytest.raises(SystemExit) as excinfo:
+            main(["migrate", "--jobs", "many", "example.py"])
+
+        assert excinfo.value.code == 2
+
+    def test_migrate_jobs_one(self, capsys, tmp_path):
+        path1 = tmp_path / "example1.py"
+        path1.write_text("import freezegun\n")
+        path2 = tmp_path / "example2.py"
+        path2.write_text("import freezegun\n")
+
+        result = main(["migrate", "-j", "1", str(path1), str(path2)])
+
+        assert result == 1
+        out, err = capsys.readouterr()
+        assert out == ""
+        assert err == f"Rewriting {path1}\nRewriting {path2}\n"
+
+    def test_migrate_jobs_multiple(self, capfd, tmp_path):
+        paths = []
+        for i in range(10):
+            path = tmp_path / f"example{i}.py"
+            path.write_text("import freezegun\n" if i % 2 else "\n")
+            paths.append(path)
+        non_utf8 = tmp_path / "non_utf8.py"
+        non_utf8.write_bytes("import freezegun\nx = '€'\n".encode("cp1252"))
+
+        result = main(["migrate", "--jobs", "3", *map(str, paths), str(non_utf8)])
+
+        assert result == 1
+        out, err = capfd.readouterr()
+        assert out == f"{non_utf8} is non-utf-8 (not supported)\n"
+        assert err == "".join(f"Rewriting {path}\n" for path in paths[1::2])
+        for i, path in enumerate(paths):
+            expected = "import time_machine\n" if i % 2 else "\n"
+            assert path.read_text() == expected
+
+    def test_migrate_jobs_unchanged(self, capfd, tmp_path):
+        path1 = tmp_path / "example1.py"
+        path1.write_text("\n")
+        path2 = tmp_path / "example2.py"
+        path2.write_text("\n")
+
+        result = main(["migrate", "--jobs", "2", "--no-cache", str(path1), str(path2)])
+
+        assert result == 0
+        out, err = capfd.readouterr()
+        assert out == ""
+        assert err == ""
+
+    def test_migrate_jobs_stdin(self, capsys, tmp_path):
+        path = tmp_path / "example.py"
+        path.write_text("import freezegun\n")
+        stdin = io.TextIOWrapper(io.BytesIO(b"import freezegun\n"), "UTF-8")
+
+        with mock.patch.object(sys, "stdin", stdin):
+            result = main(["migrate", "--jobs", "2", "-", str(path)])
+
+        assert result == 1
+        out, err = capsys.readouterr()
+        assert out == "import time_machine\n"
+        assert err == f"Rewriting {path}\n"
+        assert path.read_text() == "import time_machine\n"
+
+    def test_migrate_file_captured(self, capsys, tmp_path):
+        path = tmp_path / "example.py"
+        path.write_text("import freezegun\n")
+
+        result, out, err, updates = migrate_file_captured(str(path))
+
+        assert result.status == "rewritten"
+        assert result.rewrites == {"import": 1}
+        assert (out, err, updates) == ("", f"Rewriting {path}\n", {})
+        out, err = capsys.readouterr()
+        assert out == ""
+        assert err == ""
+
+    def test_migrate_non_utf8_no_freezegun(self, capsys, tmp_path):
+        path = tmp_path / "example.py"
+        path.write_bytes("# -*- coding: cp1252 -*-\nx = €\n".encode("cp1252"))
+
+        result = main(["migrate", str(path)])
+
+        # Skipped by the prefilter, before decoding.
+        assert result == 0
+        out, err = capsys.readouterr()
+        assert out == ""
+        assert err == ""
+
+    def test_migrate_prefilter_no_match(self, capsys, tmp_path):
+        path = tmp_path / "example.py"
+        path.write_text("import time\n")
+
+        with mock.patch.object(cli, "ast_parse") as mock_ast_parse:
+            result = main(["migrate", str(path)])
+
+        assert result == 0
+        mock_ast_parse.assert_not_called()
+
+    def test_migrate_prefilter_patch(self, capsys, tmp_path):
+        path = tmp_path / "example.py"
+        path.write_text(
+            "from unittest import mock\n"
+            + "with mock.patch('time.time', return_value=1):\n"
+            + "    pass\n"
+        )
+
+        result = main(["migrate", str(path)])
+
+        assert result == 1
+        assert path.read_text() == (
+            "import time_machine\n"
+            + "from unittest import mock\n"
+            + "with time_machine.travel(1, tick=False):\n"
+            + "    pass\n"
+        )
+
+    def test_migrate_prefilter_match_unchanged(self, capsys, tmp_path):
+        path = tmp_path / "example.py"
+        path.write_text("freezer = 1\n")
+
+        result = main(["migrate", str(path)])
+
+        assert result == 0
+        out, err = capsys.readouterr()
+        assert out == ""
+        assert err == ""
+        assert path.read_text() == "freezer = 1\n"
+
+    def test_migrate_prefilter_mmap(self, capsys, tmp_path):
+        path1 = tmp_path / "example1.py"
+        path1.write_text("import freezegun\n")
+        path2 = tmp_path / "example2.py"
+        path2.write_text("import time\n")
+
+        with mock.patch.object(cli, "MMAP_THRESHOLD", 1):
+            result = main(["migrate", "-j", "1", str(path1), str(path2)])
+
+        assert result == 1
+        out, err = capsys.readouterr()
+        assert out == ""
+        assert err == f"Rewriting {path1}\n"
+        assert path1.read_text() == "import time_machine\n"
+        assert path2.read_text() == "import time\n"
+
+    def test_migrate_directory(self, capsys, tmp_path):
+        (tmp_path / "tests").mkdir()
+        (tmp_path / "tests" / "test_a.py").write_text("import freezegun\n")
+        (tmp_path / "tests" / "sub").mkdir()
+        (tmp_path / "tests" / "sub" / "test_b.py").write_text("import freezegun\n")
+        (tmp_path / "tests" / "README.txt").write_text("import freezegun\n")
+        (tmp_path / "setup.py").write_text("import freezegun\n")
+        (tmp_path / ".venv").mkdir()
+        (tmp_path / ".venv" / "lib.py").write_text("import freezegun\n")
+        (tmp_path / "__pycache__").mkdir()
+        (tmp_path / "__pycache__" / "x.py").write_text("import freezegun\n")
+
+        result = main(["migrate", "-j", "1", str(tmp_path)])
+
+        assert result == 1
+        out, err = capsys.readouterr()
+        assert out == ""
+        assert err == (
+            f"Rewriting {tmp_path / 'setup.py'}\n"
+            + f"Rewriting {tmp_path / 'tests' / 'test_a.py'}\n"
+            + f"Rewriting {tmp_path / 'tests' / 'sub' / 'test_b.py'}\n"
+        )
+        assert (tmp_path / "tests" / "README.txt").read_text() == "import freezegun\n"
+        assert (tmp_path / ".venv" / "lib.py").read_text() == "import freezegun\n"
+        assert (tmp_path / "__pycache__" / "x.py").read_text() == "import freezegun\n"
+
+    def test_migrate_directory_exclude(self, capsys, tmp_path):
+        (tmp_path / "tests").mkdir()
+        (tmp_path / "tests" / "test_a.py").write_text("import freezegun\n")
+        (tmp_path / "tests" / "test_b.py").write_text("import freezegun\n")
+        (tmp_path / "build").mkdir()
+        (tmp_path / "build" / "test_c.py").write_text("import freezegun\n")
+
+        result = main(
+            [
+                "migrate",
+                "-j",
+                "1",
+                "--exclude",
+                "test_b.py",
+                "--exclude",
+                "/build/",
+                str(tmp_path),
+            ]
+        )
+
+        assert result == 1
+        out, err = capsys.readouterr()
+        assert err == f"Rewriting {tmp_path / 'tests' / 'test_a.py'}\n"
+
+    def test_migrate_exclude_ignored_for_explicit_file(self, capsys, tmp_path):
+        path = tmp_path / "example.py"
+        path.write_text("import freezegun\n")
+
+        result = main(["migrate", "--exclude", "example.py", str(path)])
+
+        assert result == 1
+        assert path.read_text() == "import time_machine\n"
+
+    def test_init_worker(self):
+        options = MigrateOptions()
+
+        with mock.patch.object(cli, "worker_options", None):
+            cli.init_worker(options)
+
+            assert cli.worker_options is options
+
+    def test_migrate_file_captured_cache(self, capsys, tmp_path):
+        path = tmp_path / "example.py"
+        path.write_text("freezer = 1\n")
+        cache = MigrateCache({})
+
+        with mock.patch.object(cli, "worker_options", MigrateOptions(cache=cache)):
+            result, out, err, updates = migrate_file_captured(str(path))
+
+        digest = MigrateCache.digest(b"freezer = 1\n")
+        assert result.status == "unchanged"
+        assert (out, err, updates) == ("", "", {str(path): digest})
+        assert cache.unchanged == {str(path): digest}
+        assert cache.updates == {}
+
+    def test_migrate_cache(self, capsys, tmp_path):
+        path = tmp_path / "example.py"
+        path.write_text("freezer = 1\n")
+
+        result = main(["migrate", "example.py"])
+
+        assert result == 0
+        assert (tmp_path / ".time_machine_cache" / ".gitignore").exists()
+        data = json.loads(
+            (tmp_path / ".time_machine_cache" / "migrate.json").read_text()
+        )
+        assert data == {
+            "key": MigrateCache.key(),
+            "unchanged": {"example.py": MigrateCache.digest(b"freezer = 1\n")},
+        }
+
+        with mock.patch.object(cli, "migrate_contents") as mock_migrate_contents:
+            result = main(["migrate", "./example.py"])
+
+        assert result == 0
+        mock_migrate_contents.assert_not_called()
+
+    def test_migrate_cache_changed_file(self, capsys, tmp_path):
+        path = tmp_path / "example.py"
+        path.write_text("freezer = 1\n")
+        main(["migrate", str(path)])
+        path.write_text("freezer = 2\n")
+
+        with mock.patch.object(
+            cli, "migrate_contents", return_value="freezer = 2\n"
+        ) as mock_migrate_contents:
+            result = main(["migrate", str(path)])
+
+        assert result == 0
+        mock_migrate_contents.assert_called_once()
+        assert MigrateCache.load().unchanged == {
+            str(path): MigrateCache.digest(b"freezer = 2\n"),
+        }
+
+    def test_migrate_cache_deleted_file(self, capsys, tmp_path):
+        path1 = tmp_path / "example1.py"
+        path1.write_text("freezer = 1\n")
+        path2 = tmp_path / "example2.py"
+        path2.write_text("freezer = 2\n")
+        main(["migrate", str(path1)])
+        path1.unlink()
+
+        main(["migrate", str(path2)])
+
+        assert MigrateCache.load().unchanged == {
+            str(path2): MigrateCache.digest(b"freezer = 2\n"),
+        }
+
+    def test_migrate_cache_concurrent_save(self, capsys, tmp_path):
+        path1 = tmp_path / "example1.py"
+        path1.write_text("freezer = 1\n")
+        path2 = tmp_path / "example2.py"
+        path2.write_text("freezer = 2\n")
+        cache1 = MigrateCache.load()
+        cache2 = MigrateCache.load()
+        cache1.update(str(path1), MigrateCache.digest(b"freezer = 1\n"))
+        cache2.update(str(path2), MigrateCache.digest(b"freezer = 2\n"))
+
+        cache1.save()
+        cache2.save()
+
+        assert MigrateCache.load().unchanged == {
+            str(path1): MigrateCache.digest(b"freezer = 1\n"),
+            str(path2): MigrateCache.digest(b"freezer = 2\n"),
+        }
+
+    def test_migrate_cache_parallel(self, capfd, tmp_path):
+        path1 = tmp_path / "example1.py"
+        path1.write_text("freezer = 1\n")
+        path2 = tmp_path / "example2.py"
+        path2.write_text("freezer = 2\n")
+        path3 = tmp_path / "example3.py"
+        path3.write_text("import freezegun\n")
+
+        result = main(["migrate", "-j", "2", str(path1), str(path2), str(path3)])
+
+        assert result == 1
+        assert MigrateCache.load().unchanged == {
+            str(path1): MigrateCache.digest(b"freezer = 1\n"),
+            str(path2): MigrateCache.digest(b"freezer = 2\n"),
+        }
+
+    def test_migrate_cache_other_key(self, capsys, tmp_path):
+        path = tmp_path / "example.py"
+        path.write_text("freezer = 1\n")
+        (tmp_path / ".time_machine_cache").mkdir()
+        (tmp_path / ".time_machine_cache" / "migrate.json").write_text(
+            json.dumps(
+                {
+                    "key": "0.0.0-cpython-30",
+                    "unchanged": {str(path): MigrateCache.digest(b"freezer = 1\n")},
+                }
+            )
+        )
+
+        with mock.patch.object(
+            cli, "migrate_contents", return_value="freezer = 1\n"
+        ) as mock_migrate_contents:
+            result = main(["migrate", str(path)])
+
+        assert result == 0
+        mock_migrate_contents.assert_called_once()
+        assert MigrateCache.load().unchanged == {
+            str(path): MigrateCache.digest(b"freezer = 1\n")
+        }
+
+    @pytest.mark.parametrize(
+        "contents",
+        [
+            "",
+            "{",
+            "[]",
+            '{"key": 1}',
+            '{"key": 1, "unchanged": {}}',
+            f'{{"key": "{MigrateCache.key()}", "unchanged": ["abc"]}}',
+            f'{{"key": "{MigrateCache.key()}", "unchanged": {{"a.py": 1}}}}',
+        ],
+    )
+    def test_migrate_cache_corrupt(self, capsys, tmp_path, contents):
+        (tmp_path / ".time_machine_cache").mkdir()
+        (tmp_path / ".time_machine_cache" / "migrate.json").write_text(contents)
+
+        assert MigrateCache.load().unchanged == {}
+
+    def test_migrate_cache_no_additions(self, capsys, tmp_path):
+        path = tmp_path / "example.py"
+        path.write_text("import time\n")
+
+        result = main(["migrate", str(path)])
+
+        assert result == 0
+        assert not (tmp_path / ".time_machine_cache").exists()
+
+    def test_migrate_no_cache(self, capsys, tmp_path):
+        path = tmp_path / "example.py"
+        path.write_text("freezer = 1\n")
+
+        result = main(["migrate", "--no-cache", str(path)])
+
+        assert result == 0
+        assert not (tmp_path / ".time_machine_cache").exists()
+
+    def test_migrate_stdin_filenames(self, capsys, tmp_path):
+        path1 = tmp_path / "example 1.py"
+        path1.write_text("import freezegun\n")
+        path2 = tmp_path / "example2.py"
+        path2.write_text("import freezegun\n")
+        stdin = io.TextIOWrapper(
+            io.BytesIO(f"{path1}\0{path2}\0".encode()),
+            "UTF-8",
+        )
+
+        with mock.patch.object(sys, "stdin", stdin):
+            result = main(["migrate", "-j", "1", "--stdin-filenames"])
+
+        assert result == 1
+        out, err = capsys.readouterr()
+        assert out == ""
+        assert err == f"Rewriting {path1}\nRewriting {path2}\n"
+        assert path1.read_text() == "import time_machine\n"
+        assert path2.read_text() == "import time_machine\n"
+
+    def test_migrate_stdin_filenames_with_file(self, capsys):
+        with pytest.raises(SystemExit) as excinfo:
+            main(["migrate", "--stdin-filenames", "example.py"])
+
+        assert excinfo.value.code == 2
+        out, err = capsys.readouterr()
+        assert err.endswith(
+            "error: file arguments are not allowed with --stdin-filenames\n"
+        )
+
+    def test_migrate_serve_with_file(self, capsys):
+        with pytest.raises(SystemExit) as excinfo:
+            main(["migrate", "--serve", "example.py"])
+
+        assert excinfo.value.code == 2
+        out, err = capsys.readouterr()
+        assert err.endswith("error: file arguments are not allowed with --serve\n")
+
+    def test_migrate_serve_and_stdin_filenames(self, capsys):
+        with pytest.raises(SystemExit) as excinfo:
+            main(["migrate", "--serve", "--stdin-filenames"])
+
+        assert excinfo.value.code == 2
+
+    def test_migrate_serve(self):
+        stdin = io.TextIOWrapper(io.BytesIO(request_frame(b"import freezegun\n")))
+        stdout = io.TextIOWrapper(io.BytesIO())
+
+        with (
+            mock.patch.object(sys, "stdin", stdin),
+            mock.patch.object(sys, "stdout", stdout),
+        ):
+            result = main(["migrate", "--serve"])
+
+        assert result == 0
+        assert stdout.buffer.getvalue() == response_frame(1, b"import time_machine\n")
+
+    def test_migrate_check(self, capsys, tmp_path):
+        path1 = tmp_path / "example1.py"
+        path1.write_text("import freezegun\n")
+        path2 = tmp_path / "example2.py"
+        path2.write_text("import time\n")
+
+        result = main(["migrate", "--check", str(path1), str(path2)])
+
+        assert result == 1
+        out, err = capsys.readouterr()
+        assert out == ""
+        assert err == f"Would rewrite {path1}\n"
+        assert path1.read_text() == "import freezegun\n"
+
+    def test_migrate_check_unchanged(self, capsys, tmp_path):
+        path = tmp_path / "example.py"
+        path.write_text("freezer = 1\n")
+
+        result = main(["migrate", "--check", str(path)])
+
+        assert result == 0
+        out, err = capsys.readouterr()
+        assert out == ""
+        assert err == ""
+
+    def test_migrate_check_stdin(self, capsys):
+        stdin = io.TextIOWrapper(io.BytesIO(b"import freezegun\n"), "UTF-8")
+
+        with mock.patch.object(sys, "stdin", stdin):
+            result = main(["migrate", "--check", "-"])
+
+        assert result == 1
+        out, err = capsys.readouterr()
+        assert out == ""
+        assert err == "Would rewrite -\n"
+
+    def test_migrate_diff(self, capsys, tmp_path):
+        path1 = tmp_path / "example1.py"
+        path1.write_text("import freezegun\nimport pytest\n")
+        path2 = tmp_path / "example2.py"
+        path2.write_text("freezer = 1\n")
+
+        result = main(["migrate", "--diff", str(path1), str(path2)])
+
+        assert result == 1
+        out, err = capsys.readouterr()
+        assert out == (
+            f"--- {path1}\n"
+            + f"+++ {path1}\n"
+            + "@@ -1,2 +1,2 @@\n"
+            + "-import freezegun\n"
+            + "+import time_machine\n"
+            + " import pytest\n"
+        )
+        assert err == ""
+        assert path1.read_text() == "import freezegun\nimport pytest\n"
+
+    def test_migrate_diff_no_newline_at_end(self, capsys):
+        stdin = io.TextIOWrapper(io.BytesIO(b"import freezegun"), "UTF-8")
+
+        with mock.patch.object(sys, "stdin", stdin):
+            result = main(["migrate", "--diff", "-"])
+
+        assert result == 1
+        out, err = capsys.readouterr()
+        assert out == (
+            "--- -\n"
+            + "+++ -\n"
+            + "@@ -1 +1 @@\n"
+            + "-import freezegun\n"
+            + "\\ No newline at end of file\n"
+            + "+import time_machine\n"
+            + "\\ No newline at end of file\n"
+        )
+
+    def test_migrate_format_json(self, capsys, tmp_path):
+        path1 = tmp_path / "example1.py"
+        path1.write_text(
+            dedent(
+                """\
+                import freezegun
+
+                @freezegun.freeze_time("2020-01-01")
+                def test_one(freezer):
+                    freezer.tick()
+                """
+            )
+        )
+        path2 = tmp_path / "example2.py"
+        path2.write_text("import time\n")
+        path3 = tmp_path / "example3.py"
+        path3.write_bytes("import freezegun\nx = '€'\n".encode("cp1252"))
+
+        result = main(
+            [
+                "migrate",
+                "-j",
+                "1",
+                "--format",
+                "json",
+                str(path1),
+                str(path2),
+                str(path3),
+            ]
+        )
+
+        assert result == 1
+        out, err = capsys.readouterr()
+        assert err == ""
+        data = json.loads(out)
+        assert isinstance(data.pop("time"), float)
+        for file_data in data["files"]:
+            assert isinstance(file_data.pop("time"), float)
+        assert data == {
+            "files": [
+                {
+                    "filename": str(path1),
+                    "status": "rewritten",
+                    "rewrites": {
+                        "import": 1,
+                        "freeze_time": 1,
+                        "freezer_to_time_machine": 2,
+                        "tick_to_shift": 1,
+                    },
+                },
+                {
+                    "filename": str(path2),
+                    "status": "unchanged",
+                    "rewrites": {},
+                },
+                {
+                    "filename": str(path3),
+                    "status": "error",
+                    "rewrites": {},
+                    "error": "non-utf-8 (not supported)",
+                },
+            ],
+        }
+
+    def test_migrate_format_json_check(self, capfd, tmp_path):
+        path1 = tmp_path / "example1.py"
+        path1.write_text("import freezegun\n")
+        path2 = tmp_path / "example2.py"
+        path2.write_text("freezer = 1\n")
+
+        result = main(
+            ["migrate", "-j", "1", "--check", "--format=json", str(path1), str(path2)]
+        )
+
+        assert result == 1
+        out, err = capfd.readouterr()
+        assert err == ""
+        data = json.loads(out)
+        assert [(f["filename"], f["status"]) for f in data["files"]] == [
+            (str(path1), "would_rewrite"),
+            (str(path2), "unchanged"),
+        ]
+        assert path1.read_text() == "import freezegun\n"
+
+    def test_migrate_format_json_diff(self, capsys):
+        with pytest.raises(SystemExit) as excinfo:
+            main(["migrate", "--format=json", "--diff", "example.py"])
+
+        assert excinfo.value.code == 2
+        out, err = capsys.readouterr()
+        assert err.endswith("error: --diff is not allowed with --format=json\n")
+
+    def test_migrate_format_json_stdin(self, capsys):
+        with pytest.raises(SystemExit) as excinfo:
+            main(["migrate", "--format=json", "-"])
+
+        assert excinfo.value.code == 2
+        out, err = capsys.readouterr()
+        assert err.endswith("error: - is not allowed with --format=json\n")
+
+    def test_migrate_serve_check(self, capsys):
+        with pytest.raises(SystemExit) as excinfo:
+            main(["migrate", "--serve", "--check"])
+
+        assert excinfo.value.code == 2
+        out, err = capsys.readouterr()
+        assert err.endswith(
+            "error: --check, --diff, and --format are not allowed with --serve\n"
+        )
+
+    def test_scan(self, capsys, tmp_path):
+        path = tmp_path / "test_example.py"
+        path.write_text(
+            dedent(
+                """\
+                from freezegun import freeze_time
+
+                @freeze_time("2020-01-01", tick=True)
+                def test_one():
+                    freezer = freeze_time("2020-01-01")
+                """
+            )
+        )
+
+        result = main(["scan", "-j", "1", str(path)])
+
+        assert result == 0
+        out, err = capsys.readouterr()
+        assert out == (
+            f"{path}:1:1: freezegun_import (migratable)\n"
+            + f"{path}:3:2: freeze_time_decorator (migratable)\n"
+            + f"{path}:3:2: tick_true (migratable)\n"
+            + f"{path}:5:15: freeze_time_call\n"
+            + "Scanned 1 files, found 4 uses, 3 migratable.\n"
+            + "  freezegun_import: 1 (1 migratable)\n"
+            + "  freeze_time_decorator: 1 (1 migratable)\n"
+            + "  freeze_time_call: 1 (0 migratable)\n"
+            + "  tick_true: 1 (1 migratable)\n"
+        )
+        assert err == ""
+        assert "freeze_time(" in path.read_text()
+
+    def test_scan_none_found(self, capsys, tmp_path):
+        path = tmp_path / "example.py"
+        path.write_text("import time\n")
+
+        result = main(["scan", str(path)])
+
+        assert result == 0
+        out, err = capsys.readouterr()
+        assert out == "Scanned 1 files, found 0 uses, 0 migratable.\n"
+
+    def test_scan_errors(self, capsys, tmp_path):
+        non_utf8 = tmp_path / "non_utf8.py"
+        non_utf8.write_bytes("import freezegun\n'£'\n".encode("latin-1"))
+        syntax_error = tmp_path / "syntax_error.py"
+        syntax_error.write_text("import freezegun\n(\n")
+
+        result = main(["scan", "-j", "1", str(non_utf8), str(syntax_error)])
+
+        assert result == 0
+        out, err = capsys.readouterr()
+        assert out.splitlines()[:2] == [
+            f"{non_utf8}: non-utf-8 (not supported)",
+            f"{syntax_error}: syntax error: '(' was never closed",
+        ]
+
+    def test_scan_directory_exclude(self, capsys, tmp_path):
+        (tmp_path / "keep.py").write_text("import freezegun\n")
+        (tmp_path / "skip.py").write_text("import freezegun\n")
+
+        result = main(["scan", "--exclude", "skip.py", str(tmp_path)])
+
+        assert result == 0
+        out, err = capsys.readouterr()
+        assert out.splitlines()[0] == (
+            f"{tmp_path / 'keep.py'}:1:1: freezegun_import (migratable)"
+        )
+        assert "skip.py" not in out
+
+    def test_scan_format_json_parallel(self, capfd, tmp_path):
+        paths = [tmp_path / f"example{i}.py" for i in range(4)]
+        for path in paths:
+            path.write_text("import freezegun\n")
+        paths[1].write_text("import time\n")
+        non_utf8 = tmp_path / "non_utf8.py"
+        non_utf8.write_bytes(b"import freezegun\n'\xa3'\n")
+
+        result = main(
+            ["scan", "-j", "2", "--format=json", *map(str, paths), str(non_utf8)]
+        )
+
+        assert result == 0
+        out, err = capfd.readouterr()
+        assert err == ""
+        data = json.loads(out)
+        assert data["files"] == [
+            {
+                "filename": str(path),
+                "findings": [
+                    {
+                        "kind": "freezegun_import",
+                        "line": 1,
+                        "column": 1,
+                        "migratable": True,
+                    }
+                ],
+            }
+            for path in (paths[0], paths[2], paths[3])
+        ] + [
+            {
+                "filename": str(non_utf8),
+                "findings": [],
+                "error": "non-utf-8 (not supported)",
+            }
+        ]
+        assert data["scanned"] == 5
+        assert data["totals"]["freezegun_import"] == {"count": 3, "migratable": 3}
+        assert data["totals"]["mock_time_patch"] == {"count": 0, "migratable": 0}
+        assert isinstance(data["time"], float)
+
+
+def request_frame(contents: bytes) -> bytes:
+    return struct.pack(">I", len(contents)) + contents
+
+
+def response_frame(status: int, contents: bytes) -> bytes:
+    return struct.pack(">BI", status, len(contents)) + contents
+
+
+class TestServe:
+    def test_empty(self):
+        stdout = io.BytesIO()
+
+        result = serve(io.BytesIO(b""), stdout)
+
+        assert result == 0
+        assert stdout.getvalue() == b""
+
+    def test_multiple(self):
+        stdin = io.BytesIO(
+            request_frame(b"import freezegun\n")
+            + request_frame(b"import time\n")
+            + request_frame(b"")
+            + request_frame("x = '€'\n".encode("cp1252"))
+        )
+        stdout = io.BytesIO()
+
+        result = serve(stdin, stdout)
+
+        assert result == 0
+        assert stdout.getvalue() == (
+            response_frame(1, b"import time_machine\n")
+            + response_frame(0, b"import time\n")
+            + response_frame(0, b"")
+            + response_frame(2, b"non-utf-8 (not supported)")
+        )
+
+    def test_truncated_header(self, capsys):
+        stdout = io.BytesIO()
+
+        result = serve(io.BytesIO(b"\0\0"), stdout)
+
+        assert result == 1
+        assert stdout.getvalue() == b""
+        out, err = capsys.readouterr()
+        assert err == "Truncated frame header.\n"
+
+    def test_truncated_contents(self, capsys):
+        stdout = io.BytesIO()
+
+        result = serve(io.BytesIO(request_frame(b"import time\n")[:-1]), stdout)
+
+        assert result == 1
+        out, err = capsys.readouterr()
+        assert err == "Truncated frame.\n"
+
+    def test_subprocess(self):
+        proc = subprocess.run(
+            [sys.executable, "-m", "time_machine", "migrate", "--serve"],
+            input=request_frame(b"import freezegun\n"),
+            check=True,
+            capture_output=True,
+        )
+
+        assert proc.stdout == response_frame(1, b"import time_machine\n")
+
+
+class TestCompileExclude:
+    @pytest.mark.parametrize(
+        "pattern,path,is_dir,expected",
+        [
+            ("example.py", "example.py", False, True),
+            ("example.py", "a/b/example.py", False, True),
+            ("example.py", "a/example.pyc", False, False),
+            ("*.py", "a/b.py", False, True),
+            ("a?.py", "ab.py", False, True),
+            ("a?.py", "a/.py", False, False),
+            ("build/", "build", True, True),
+            ("build/", "build", False, False),
+            ("build/", "a/build", True, True),
+            ("/build", "build", True, True),
+            ("/build", "a/build", True, False),
+            ("a/b", "a/b", False, True),
+            ("a/b", "c/a/b", False, False),
+            ("a/*", "a/b", False, True),
+            ("a/*", "a/b/c", False, False),
+            ("**/b", "a/c/b", False, True),
+            ("**/b", "b", False, True),
+            ("a/**/b", "a/b", True, True),
+            ("a/**/b", "a/x/y/b", True, True),
+            ("a/**", "a/x/y", False, True),
+            ("test_[ab].py", "test_a.py", False, True),
+            ("test_[ab].py", "test_c.py", False, False),
+            ("test_[!ab].py", "test_c.py", False, True),
+            ("test_[!ab].py", "test_a.py", False, False),
+            ("test_[.py", "test_[.py", False, True),
+            ("a+b.py", "a+b.py", False, True),
+        ],
+    )
+    def test_match(self, pattern, path, is_dir, expected):
+        regex, dir_only = compile_exclude(pattern)
+        result = bool(regex.fullmatch(path)) and (is_dir or not dir_only)
+        assert result == expected
+
+
+class TestLineIntervalIndex:
+    def test_empty(self):
+        index: LineIntervalIndex[str] = LineIntervalIndex()
+
+        assert index.find(1) is None
+
+    def test_disjoint(self):
+        index: LineIntervalIndex[str] = LineIntervalIndex()
+        index.add(3, 5, "a")
+        index.add(10, 12, "b")
+
+        assert [index.find(line) for line in range(1, 14)] == [
+            *[None] * 2,
+            *["a"] * 3,
+            *[None] * 4,
+            *["b"] * 3,
+            None,
+        ]
+
+    def test_nested(self):
+        index: LineIntervalIndex[str] = LineIntervalIndex()
+        # Outermost first, with siblings in any order, as from ast.walk().
+        index.add(1, 20, "outer")
+        index.add(12, 18, "second")
+        index.add(2, 10, "first")
+        index.add(14, 15, "second inner")
+        index.add(4, 5, "first inner")
+        index.add(7, 8, "first inner 2")
+
+        assert [index.find(line) for line in range(1, 22)] == [
+            "outer",
+            "first",
+            "first",
+            "first inner",
+            "first inner",
+            "first",
+            "first inner 2",
+            "first inner 2",
+            "first",
+            "first",
+            "outer",
+            "second",
+            "second",
+            "second inner",
+            "second inner",
+            "second",
+            "second",
+            "second",
+            "outer",
+            "outer",
+            None,
+        ]
+
+    def test_single_line(self):
+        index: LineIntervalIndex[str] = LineIntervalIndex()
+        index.add(1, 1, "a")
+        index.add(2, 2, "b")
+
+        assert index.find(1) == "a"
+        assert index.find(2) == "b"
+        assert index.find(3) is None
+
+
+def scan_kinds(source: str) -> list[tuple[str, int, int, bool]]:
+    findings = scan_tree(ast.parse(dedent(source)))
+    return [(f.kind, f.line, f.column, f.migratable) for f in findings]
+
+
+class TestScanTree:
+    def test_empty(self):
+        assert scan_kinds("") == []
+
+    def test_imports(self):
+        assert scan_kinds(
+            """\
+            import freezegun
+            import freezegun as fg
+            import freezegun.api, os
+            from freezegun import freeze_time
+            from freezegun.api import FakeDatetime
+            from . import freezegun
+            import os
+            """
+        ) == [
+            ("freezegun_import", 1, 1, True),
+            ("freezegun_import", 2, 1, False),
+            ("freezegun_import", 3, 1, False),
+            ("freezegun_import", 4, 1, True),
+            ("freezegun_import", 5, 1, False),
+        ]
+
+    def test_decorators(self):
+        assert scan_kinds(
+            """\
+            from freezegun import freeze_time
+
+            @freeze_time("2020-01-01")
+            def test_one():
+                pass
+
+            @freeze_time
+            def test_two():
+                pass
+
+            @freeze_time("2020-01-01", as_kwarg="frozen")
+            async def test_three(frozen):
+                pass
+
+            @freeze_time("2020-01-01")
+            class Tests:
+                pass
+            """
+        ) == [
+            ("freezegun_import", 1, 1, True),
+            ("freeze_time_decorator", 3, 2, True),
+            ("freeze_time_decorator", 7, 2, False),
+            ("freeze_time_decorator", 11, 2, False),
+            ("freeze_time_decorator", 15, 2, False),
+        ]
+
+    def test_context_managers(self):
+        assert scan_kinds(
+            """\
+            import freezegun
+
+            def test_one():
+                with freezegun.freeze_time("2020-01-01"):
+                    pass
+                with freezegun.freeze_time("2020-01-01") as frozen:
+                    frozen.move_to("2021-01-01")
+                with freezegun.freeze_time("2020-01-01") as frozen:
+                    print(frozen())
+
+            async def test_two():
+                async with freezegun.freeze_time("2020-01-01"):
+                    pass
+            """
+        ) == [
+            ("freezegun_import", 1, 1, True),
+            ("freeze_time_context_manager", 4, 10, True),
+            ("freeze_time_context_manager", 6, 10, True),
+            ("freeze_time_context_manager", 8, 10, False),
+            ("freeze_time_context_manager", 12, 16, False),
+        ]
+
+    def test_calls(self):
+        assert scan_kinds(
+            """\
+            from freezegun import freeze_time
+
+            def setUp(self):
+                self.freezer = freeze_time("2020-01-01")
+                self.freezer.start()
+            """
+        ) == [
+            ("freezegun_import", 1, 1, True),
+            ("freeze_time_call", 4, 20, False),
+        ]
+
+    def test_markers(self):
+        assert scan_kinds(
+            """\
+            import pytest
+
+            @pytest.mark.freeze_time("2020-01-01")
+            def test_one():
+                pass
+
+            @pytest.mark.freeze_time
+            def test_two():
+                pass
+            """
+        ) == [
+            ("freeze_time_marker", 3, 2, True),
+            ("freeze_time_marker", 7, 2, False),
+        ]
+
+    def test_freezer_fixture(self):
+        assert scan_kinds(
+            """\
+            def test_one(freezer):
+                freezer.move_to("2020-01-01")
+
+            def test_two(*, freezer):
+                pass
+
+            class Tests:
+                def test_three(self, freezer):
+                    pass
+            """
+        ) == [
+            ("freezer_fixture", 1, 14, True),
+            ("freezer_fixture", 4, 17, True),
+            ("freezer_fixture", 8, 26, True),
+        ]
+
+    def test_tick_true(self):
+        assert scan_kinds(
+            """\
+            import pytest
+            from freezegun import freeze_time
+
+            @pytest.mark.freeze_time("2020-01-01", tick=True)
+            def test_one():
+                with freeze_time("2020-01-01", tick=True):
+                    pass
+                with freeze_time("2020-01-01", tick=True, tz_offset=1):
+                    pass
+                with freeze_time("2020-01-01", tick=False):
+                    pass
+            """
+        ) == [
+            ("freezegun_import", 2, 1, True),
+            ("freeze_time_marker", 4, 2, True),
+            ("tick_true", 4, 2, True),
+            ("freeze_time_context_manager", 6, 10, True),
+            ("tick_true", 6, 10, True),
+            ("freeze_time_context_manager", 8, 10, False),
+            ("tick_true", 8, 10, False),
+            ("freeze_time_context_manager", 10, 10, True),
+        ]
+
+    def test_mock_time_patch(self):
+        assert scan_kinds(
+            """\
+            import time
+            from unittest import mock
+
+            def test_one():
+                with mock.patch("time.time", return_value=1.5):
+                    pass
+                with mock.patch("time.time_ns", return_value=1):
+                    pass
+                with mock.patch.object(time, "time", return_value=1):
+                    pass
+                with mock.patch("myapp.views.datetime") as mock_datetime:
+                    pass
+                with mock.patch("myapp.views.requests"):
+                    pass
+                with mock.patch.object(time, "sleep"):
+                    pass
+                with mock.patch(), mock.patch.object(time):
+                    pass
+                with mock.patch(target):
+                    pass
+                with mock.call("time.time"):
+                    pass
+
+            @mock.patch("time.time", return_value=1)
+            def test_two(mock_time):
+                pass
+            """
+        ) == [
+            ("mock_time_patch", 5, 10, True),
+            ("mock_time_patch", 7, 10, False),
+            ("mock_time_patch", 9, 10, True),
+            ("mock_time_patch", 11, 10, False),
+            ("mock_time_patch", 24, 2, False),
+        ]
+
 
 def check_noop(given: str) -> None:
     given = dedent(given)
@@ -149,7 +1279,60 @@ def check_transformed(given: str, expected: str) -> None:
     assert result == expected
 
 
-class TestMigrateContents:
+class TestMigrateContents:
+    def test_rewrites(self):
+        rewrites: Counter[str] = Counter()
+
+        migrate_contents(
+            dedent(
+                """\
+                from freezegun import freeze_time
+                import pytest
+
+                @pytest.mark.freeze_time("2020-01-01")
+                def test_one(freezer):
+                    freezer.move_to("2021-01-01")
+
+                def test_two():
+                    with freeze_time("2022-01-01") as ft:
+                        ft.tick()
+                """
+            ),
+            rewrites=rewrites,
+        )
+
+        assert rewrites == {
+            "import": 1,
+            "marker": 1,
+            "freeze_time": 1,
+            "freezer_to_time_machine": 2,
+            "tick_to_shift": 1,
+        }
+
+    def test_rewrites_mock_patch(self):
+        rewrites: Counter[str] = Counter()
+
+        migrate_contents(
+            dedent(
+                """\
+                from unittest import mock
+
+                with mock.patch("time.time", return_value=1):
+                    pass
+                """
+            ),
+            rewrites=rewrites,
+        )
+
+        assert rewrites == {"mock_patch": 1}
+
+    def test_rewrites_none(self):
+        rewrites: Counter[str] = Counter()
+
+        migrate_contents("import time\n", rewrites=rewrites)
+
+        assert rewrites == {}
+
     def test_import_unrelated(self):
         check_noop(
             "import libfaketime",
@@ -1535,3 +2718,439 @@ class TestMigrateContents:
                 time_machine.shift(1)
             """,
         )
+
+    def test_mock_patch_time(self):
+        check_transformed(
+            """\
+            import time
+            from unittest import mock
+
+            def test_function():
+                with mock.patch("time.time", return_value=1_600_000_000):
+                    assert time.time() == 1_600_000_000
+            """,
+            """\
+            import time_machine
+            import time
+            from unittest import mock
+
+            def test_function():
+                with time_machine.travel(1_600_000_000, tick=False):
+                    assert time.time() == 1_600_000_000
+            """,
+        )
+
+    def test_mock_patch_time_float(self):
+        check_transformed(
+            """\
+            from unittest import mock
+
+            with mock.patch("time.time", return_value=0.5):
+                pass
+            """,
+            """\
+            import time_machine
+            from unittest import mock
+
+            with time_machine.travel(0.5, tick=False):
+                pass
+            """,
+        )
+
+    def test_mock_patch_time_unittest_mock(self):
+        check_transformed(
+            """\
+            import unittest.mock
+
+            with unittest.mock.patch("time.time", return_value=1):
+                pass
+            """,
+            """\
+            import time_machine
+            import unittest.mock
+
+            with time_machine.travel(1, tick=False):
+                pass
+            """,
+        )
+
+    def test_mock_patch_time_bare_patch(self):
+        check_transformed(
+            """\
+            from unittest.mock import patch
+
+            with patch("time.time", return_value=1), open("example.txt"):
+                pass
+            """,
+            """\
+            import time_machine
+            from unittest.mock import patch
+
+            with time_machine.travel(1, tick=False), open("example.txt"):
+                pass
+            """,
+        )
+
+    def test_mock_patch_object_time(self):
+        check_transformed(
+            """\
+            import time
+            from unittest import mock
+
+            with mock.patch.object(time, "time", return_value=1):
+                pass
+            """,
+            """\
+            import time_machine
+            import time
+            from unittest import mock
+
+            with time_machine.travel(1, tick=False):
+                pass
+            """,
+        )
+
+    def test_mock_patch_time_multiline(self):
+        check_transformed(
+            """\
+            from unittest import mock
+
+            with mock.patch(
+                "time.time",
+                return_value=(
+                    1
+                ),
+            ):
+                pass
+            """,
+            """\
+            import time_machine
+            from unittest import mock
+
+            with time_machine.travel(1, tick=False):
+                pass
+            """,
+        )
+
+    def test_mock_patch_time_future_import(self):
+        check_transformed(
+            """\
+            from __future__ import annotations
+            from unittest import mock
+
+            with mock.patch("time.time", return_value=1):
+                pass
+            """,
+            """\
+            from __future__ import annotations
+            import time_machine
+            from unittest import mock
+
+            with time_machine.travel(1, tick=False):
+                pass
+            """,
+        )
+
+    def test_mock_patch_time_time_machine_imported(self):
+        check_transformed(
+            """\
+            from unittest import mock
+            import time_machine
+
+            with mock.patch("time.time", return_value=1):
+                pass
+            """,
+            """\
+            from unittest import mock
+            import time_machine
+
+            with time_machine.travel(1, tick=False):
+                pass
+            """,
+        )
+
+    def test_mock_patch_time_freezegun_imported(self):
+        check_transformed(
+            """\
+            from unittest import mock
+            from freezegun import freeze_time
+
+            with mock.patch("time.time", return_value=1), freeze_time("2020"):
+                pass
+            """,
+            """\
+            from unittest import mock
+            import time_machine
+
+            with time_machine.travel(1, tick=False), time_machine.travel("2020", tick=False):
+                pass
+            """,
+        )
+
+    def test_mock_patch_time_no_imports(self):
+        check_noop(
+            """\
+            from __future__ import annotations
+
+            with mock.patch("time.time", return_value=1):
+                pass
+            """
+        )
+
+    def test_mock_patch_time_in_freezer_function(self):
+        check_transformed(
+            """\
+            from unittest import mock
+
+            def test_function(freezer):
+                with mock.patch("time.time", return_value=1):
+                    pass
+            """,
+            """\
+            from unittest import mock
+
+            def test_function(time_machine):
+                with mock.patch("time.time", return_value=1):
+                    pass
+            """,
+        )
+
+    @pytest.mark.parametrize(
+        "call",
+        [
+            'mock.patch("time.time", return_value=-1)',
+            'mock.patch("time.time", return_value=True)',
+            'mock.patch("time.time", return_value=0.1234567890123)',
+            'mock.patch("time.time", return_value="1")',
+            'mock.patch("time.time", return_value=value)',
+            'mock.patch("time.time", side_effect=[1, 2])',
+            'mock.patch("time.time", return_value=1, autospec=True)',
+            'mock.patch("time.time")',
+            'mock.patch("time.time_ns", return_value=1)',
+            'mock.patch("time.monotonic", return_value=1)',
+            'mock.patch("example.time.time", return_value=1)',
+            "mock.patch(target, return_value=1)",
+            'mock.patch.object(time, "monotonic", return_value=1)',
+            "mock.patch.object(time, name, return_value=1)",
+            'mock.patch.object(example.time, "time", return_value=1)',
+            'mock.patch.object("time", return_value=1)',
+            'mock.patch.dict(time, "time", return_value=1)',
+            'other.patch("time.time", return_value=1)',
+            'patcher("time.time", return_value=1)',
+        ],
+    )
+    def test_mock_patch_unmigratable(self, call):
+        check_noop(
+            f"""\
+            import time
+            from unittest import mock
+
+            with {call}:
+                pass
+            """
+        )
+
+    def test_mock_patch_time_as(self):
+        check_noop(
+            """\
+            from unittest import mock
+
+            with mock.patch("time.time", return_value=1) as mock_time:
+                pass
+            """
+        )
+
+    def test_mock_patch_time_decorator(self):
+        check_noop(
+            """\
+            from unittest import mock
+
+            @mock.patch("time.time", return_value=1)
+            def test_function(mock_time):
+                pass
+            """
+        )
+
+
+class TestRewriteSpans:
+    def check(self, given: str) -> str | None:
+        given = dedent(given)
+        tree = ast.parse(given)
+        callbacks = visit(tree)
+        result = rewrite_spans(given, tree, callbacks)
+        if result is not None:
+            assert result == rewrite_all(given, callbacks)
+        return result
+
+    def test_only_spans_tokenized(self):
+        given = dedent(
+            """\
+            import freezegun
+
+            def test_one():
+                assert 1 + (
+                    2
+                ) == 3
+
+            @freezegun.freeze_time("2020-01-01")
+            def test_two():
+                pass
+            """
+        )
+        tree = ast.parse(given)
+
+        with mock.patch.object(
+            cli, "src_to_tokens", wraps=src_to_tokens
+        ) as mock_src_to_tokens:
+            result = rewrite_spans(given, tree, visit(tree))
+
+        assert result == given.replace(
+            "import freezegun", "import time_machine"
+        ).replace(
+            'freezegun.freeze_time("2020-01-01")',
+            'time_machine.travel("2020-01-01", tick=False)',
+        )
+        assert [call.args[0] for call in mock_src_to_tokens.call_args_list] == [
+            '@freezegun.freeze_time("2020-01-01")\n',
+            "import freezegun\n\n",
+        ]
+
+    def test_adjacent_spans_merged(self):
+        result = self.check(
+            """\
+            import freezegun
+            @freezegun.freeze_time("2020-01-01")
+            def test_one():
+                pass
+            """
+        )
+
+        assert result is not None
+
+    def test_indented(self):
+        result = self.check(
+            """\
+            import pytest
+
+            class TestSomething:
+                def test_one(self):
+                    x = 1
+                    from freezegun import freeze_time, FakeDate
+                    with freeze_time(
+                        "2020-01-01",
+                    ):
+                        pass
+            """
+        )
+
+        assert result is not None
+
+    def test_match(self):
+        result = self.check(
+            """\
+            match x:
+                case 1:
+                    import freezegun
+            """
+        )
+
+        assert result == "match x:\n    case 1:\n        import time_machine\n"
+
+    def test_decorator_parenthesized(self):
+        result = self.check(
+            """\
+            import freezegun
+
+            @(
+                freezegun.freeze_time("2020-01-01")
+            )
+            def test_one():
+                pass
+            """
+        )
+
+        assert result is not None
+
+    def test_try(self):
+        result = self.check(
+            """\
+            try:
+                pass
+            except ImportError:
+                import freezegun
+            finally:
+                pass
+            """
+        )
+
+        assert result is not None
+
+    def test_semicolon(self):
+        result = self.check(
+            """\
+            import pytest; import freezegun
+            """
+        )
+
+        assert result == "import pytest; import time_machine\n"
+
+    def test_crlf(self):
+        result = rewrite_spans(
+            "import pytest\r\nimport freezegun\r\n",
+            ast.parse("import pytest\r\nimport freezegun\r\n"),
+            visit(ast.parse("import pytest\r\nimport freezegun\r\n")),
+        )
+
+        assert result == "import pytest\r\nimport time_machine\r\n"
+
+    def test_lone_carriage_return(self):
+        result = self.check("import pytest\rimport freezegun\n")
+
+        assert result is None
+
+    def test_dedent_in_span(self):
+        given = """\
+            def test_one():
+                if True:
+                    from freezegun import freeze_time
+                else:
+                    pass
+            """
+
+        result = self.check(given)
+
+        assert result is None
+        check_transformed(
+            given,
+            """\
+            def test_one():
+                if True:
+                    import time_machine
+                else:
+                    pass
+            """,
+        )
+
+    def test_backslash_continuation(self):
+        given = """\
+            import freezegun; \\
+            x = 1
+            """
+
+        result = self.check(given)
+
+        assert result is None
+        check_transformed(
+            given,
+            """\
+            import time_machine; \\
+            x = 1
+            """,
+        )
+
+    def test_unmatched_callback(self):
+        tree = ast.parse("x = 1\n")
+
+        result = rewrite_spans("x = 1\n", tree, {Offset(1, 100): [mock.Mock()]})
+
+        assert result is None
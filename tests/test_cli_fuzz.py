@@ -14,7 +14,7 @@ if sys.version_info[:2] == (3, 13) and not sys._is_gil_enabled():
 from hypothesis import given, settings
 from hypothesis import strategies as st
 
-from time_machine.cli import migrate_contents
+from time_machine.cli import migrate_contents, rewrite_all, rewrite_spans, visit
 
 # Fuzz the migration CLI with generated source files combining the constructs
 # that it targets, varying formatting. The generated code only needs to parse,
@@ -207,3 +207,15 @@ def test_migrate_contents_properties(source: str) -> None:
 
     # migration must be idempotent
     assert migrate_contents(migrated) == migrated
+
+
+@settings(deadline=None, max_examples=200)
+@given(source=modules())
+def test_rewrite_spans_matches_rewrite_all(source: str) -> None:
+    tree = ast.parse(source)
+    callbacks = visit(tree)
+
+    result = rewrite_spans(source, tree, callbacks)
+
+    # tokenizing only the spans with edits must not change the result
+    assert result is None or result == rewrite_all(source, callbacks)
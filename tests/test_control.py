@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import datetime as dt
+import os
+import socket
+import stat
+import threading
+import time
+from unittest import mock
+from zoneinfo import ZoneInfo
+
+import pytest
+
+import time_machine
+import time_machine.control
+from time_machine.control import ControlServer, run_command, send_command
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(socket, "AF_UNIX"), reason="Doesn't have Unix domain sockets"
+)
+
+NANOSECONDS_PER_SECOND = time_machine.NANOSECONDS_PER_SECOND
+
+
+@pytest.fixture
+def socket_path(tmp_path):
+    return tmp_path / "control.sock"
+
+
+@pytest.fixture
+def server(socket_path):
+    with ControlServer(socket_path) as server:
+        yield server
+
+
+class TestControlServer:
+    def test_status(self, server, socket_path):
+        with time_machine.travel(10.0, tick=False):
+            assert send_command(socket_path, "status") == "ok 10000000000"
+
+    def test_shift(self, server, socket_path):
+        with time_machine.travel(10.0, tick=False):
+            assert send_command(socket_path, "shift 5.5") == "ok"
+            assert time.time() == 15.5
+
+    def test_move_to_timestamp(self, server, socket_path):
+        with time_machine.travel(10.0, tick=False):
+            assert send_command(socket_path, "move_to 100") == "ok"
+            assert time.time() == 100.0
+
+    def test_move_to_string(self, server, socket_path):
+        with time_machine.travel(10.0, tick=False):
+            assert send_command(socket_path, "move_to 2030-01-01T00:00Z") == "ok"
+            assert dt.datetime.now(dt.timezone.utc) == dt.datetime(
+                2030, 1, 1, tzinfo=dt.timezone.utc
+            )
+
+    def test_freeze(self, server, socket_path):
+        with time_machine.travel(10.0) as traveller:
+            assert send_command(socket_path, "freeze") == "ok"
+            assert not traveller._tick
+            first = time.time()
+            time.sleep(0.001)
+            assert time.time() == first
+            assert 10.0 <= first < 20.0
+
+    def test_freeze_keeps_timezone(self, server, socket_path):
+        destination = dt.datetime(2020, 1, 1, tzinfo=ZoneInfo("Africa/Addis_Ababa"))
+        with time_machine.travel(destination):
+            assert send_command(socket_path, "freeze") == "ok"
+            assert time.tzname == ("EAT", "EAT")
+
+    def test_freeze_shared_clock(self, server, socket_path, tmp_path):
+        clock = time_machine.SharedClock(tmp_path / "clock", 10.0)
+        try:
+            with clock:
+                assert send_command(socket_path, "freeze") == "ok"
+                first = clock.time_ns()
+                time.sleep(0.001)
+                assert clock.time_ns() == first
+                assert first >= 10 * NANOSECONDS_PER_SECOND
+        finally:
+            clock.close()
+
+    def test_multiple_commands(self, server, socket_path):
+        with (
+            time_machine.travel(10.0, tick=False),
+            socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client,
+        ):
+            client.connect(str(socket_path))
+            client.sendall(b"shift 1\nstatus\n")
+            with client.makefile("r") as reader:
+                assert reader.readline() == "ok\n"
+                assert reader.readline() == "ok 11000000000\n"
+
+    def test_client_disconnects(self, server, socket_path):
+        with time_machine.travel(10.0, tick=False):
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+                client.connect(str(socket_path))
+                client.sendall(b"shift 1\n")
+                # Wait for the command to run, without reading the reply.
+                while time.time() != 11.0:
+                    time.sleep(0.001)
+            assert send_command(socket_path, "status") == "ok 11000000000"
+
+    def test_concurrent_clients(self, server, socket_path):
+        with (
+            time_machine.travel(10.0, tick=False),
+            socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client,
+        ):
+            client.connect(str(socket_path))
+            # The open connection doesn't block other clients.
+            assert send_command(socket_path, "status") == "ok 10000000000"
+
+    def test_stop_with_client_connected(self, socket_path):
+        server = ControlServer(socket_path)
+        server.start()
+        with (
+            time_machine.travel(10.0, tick=False),
+            socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client,
+        ):
+            client.connect(str(socket_path))
+            client.sendall(b"status\n")
+            with client.makefile("r") as reader:
+                assert reader.readline() == "ok 10000000000\n"
+
+                stopper = threading.Thread(target=server.stop)
+                stopper.start()
+                stopper.join(timeout=5.0)
+
+                assert not stopper.is_alive()
+                assert reader.readline() == ""
+        assert server._clients == {}
+        assert not os.path.exists(socket_path)
+
+    def test_socket_permissions(self, server, socket_path):
+        assert stat.S_IMODE(os.stat(socket_path).st_mode) == 0o600
+
+    def test_stop_removes_socket(self, socket_path):
+        server = ControlServer(socket_path)
+        server.start()
+        assert os.path.exists(socket_path)
+
+        server.stop()
+
+        assert not os.path.exists(socket_path)
+
+    def test_restart(self, socket_path):
+        server = ControlServer(socket_path)
+        server.start()
+        server.stop()
+        server.start()
+        try:
+            assert send_command(socket_path, "status") == (
+                "error Not currently time-travelling."
+            )
+        finally:
+            server.stop()
+
+    def test_start_twice(self, server):
+        with pytest.raises(RuntimeError) as excinfo:
+            server.start()
+
+        assert excinfo.value.args == ("ControlServer is already started.",)
+
+    def test_stop_not_started(self, socket_path):
+        with pytest.raises(RuntimeError) as excinfo:
+            ControlServer(socket_path).stop()
+
+        assert excinfo.value.args == ("ControlServer is not started.",)
+
+    def test_start_path_in_use(self, server, socket_path):
+        other = ControlServer(socket_path)
+
+        with pytest.raises(OSError):
+            other.start()
+
+        assert other._socket is None
+
+
+class TestRunCommand:
+    def test_not_travelling(self):
+        assert run_command("status") == "error Not currently time-travelling."
+
+    def test_travel_stopped_concurrently(self):
+        with (
+            time_machine.travel(10.0, tick=False),
+            mock.patch.object(
+                time_machine.control,
+                "active_traveller",
+                side_effect=RuntimeError("Not currently time-travelling."),
+            ),
+        ):
+            assert run_command("status") == "error Not currently time-travelling."
+
+    def test_unknown(self):
+        with time_machine.travel(10.0, tick=False):
+            assert run_command("jump 1") == "error Unknown command 'jump'."
+
+    def test_shift_invalid(self):
+        with time_machine.travel(10.0, tick=False):
+            assert run_command("shift soon") == (
+                "error could not convert string to float: 'soon'"
+            )
+
+    def test_move_to_missing(self):
+        with time_machine.travel(10.0, tick=False):
+            assert run_command("move_to") == "error move_to requires a destination."
+
+    def test_whitespace(self):
+        with time_machine.travel(10.0, tick=False):
+            assert run_command("  shift   2  \n") == "ok"
+            assert time.time() == 12.0
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import datetime as dt
+import sys
+import time
+from unittest import mock
+
+import pytest
+
+if sys.version_info[:2] == (3, 13) and not sys._is_gil_enabled():
+    # Hypothesis has no free-threaded wheels for Python 3.13, and cannot be
+    # built from source there, since PyO3 does not support free-threaded
+    # Python < 3.14.
+    pytest.skip("Hypothesis unavailable", allow_module_level=True)
+
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
+import time_machine
+from time_machine import Traveller
+from time_machine.hypothesis import (
+    MAX_DATETIME,
+    MIN_DATETIME,
+    aware_datetimes,
+    current_traveller,
+    destinations,
+    timedeltas,
+    timestamps,
+    travel_per_example,
+)
+
+EPOCH = 0.0
+EPOCH_PLUS_ONE_YEAR = 365 * 24 * 3600.0
+
+
+@given(aware_datetimes())
+def test_aware_datetimes(destination):
+    assert destination.tzinfo is not None
+    assert MIN_DATETIME <= destination.replace(tzinfo=None) <= MAX_DATETIME
+    with time_machine.travel(destination, tick=False):
+        assert time.time() == pytest.approx(destination.timestamp())
+
+
+@given(timestamps())
+def test_timestamps(destination):
+    with time_machine.travel(destination, tick=False):
+        assert time.time() == pytest.approx(destination)
+
+
+@given(timedeltas())
+def test_timedeltas(destination):
+    with (
+        time_machine.travel(EPOCH_PLUS_ONE_YEAR * 100, tick=False),
+        time_machine.travel(destination, tick=False),
+    ):
+        assert time.time() == pytest.approx(
+            EPOCH_PLUS_ONE_YEAR * 100 + destination.total_seconds()
+        )
+
+
+@given(destinations())
+def test_destinations(destination):
+    with time_machine.travel(destination, tick=False):
+        pass
+
+
+seen_travellers: list[Traveller] = []
+
+
+@travel_per_example(EPOCH, tick=False)
+@settings(max_examples=20)
+@given(st.integers(min_value=-1000, max_value=1000))
+def test_travel_per_example(seconds):
+    traveller = current_traveller()
+    seen_travellers.append(traveller)
+    assert time.time() == EPOCH
+    traveller.shift(seconds)
+    assert time.time() == EPOCH + seconds
+
+
+def test_travel_per_example_same_traveller():
+    seen_travellers.clear()
+
+    with mock.patch.object(
+        time_machine.travel,
+        "start",
+        autospec=True,
+        side_effect=time_machine.travel.start,
+    ) as mock_start:
+        test_travel_per_example()
+
+    assert mock_start.call_count == 1
+    assert len(seen_travellers) > 1
+    assert all(t is seen_travellers[0] for t in seen_travellers)
+    assert time_machine.traveller_stack == []
+
+
+@travel_per_example(EPOCH, tick=False)
+@settings(max_examples=5)
+@given(st.just(EPOCH_PLUS_ONE_YEAR))
+def test_travel_per_example_move_to(destination):
+    assert time.time() == EPOCH
+    current_traveller().move_to(destination)
+    assert time.time() == EPOCH_PLUS_ONE_YEAR
+
+
+@travel_per_example(EPOCH, tick=False)
+@settings(max_examples=5, database=None)
+@given(st.just(1.0))
+def failing_test(seconds):
+    current_traveller().shift(seconds)
+    raise AssertionError("Failing")
+
+
+def test_travel_per_example_failure():
+    with pytest.raises(AssertionError, match="Failing"):
+        failing_test()
+
+    assert time_machine.traveller_stack == []
+    with pytest.raises(RuntimeError) as excinfo:
+        current_traveller()
+    assert excinfo.value.args == ("No travel_per_example() test is running.",)
+
+
+def test_current_traveller_none():
+    with pytest.raises(RuntimeError) as excinfo:
+        current_traveller()
+
+    assert excinfo.value.args == ("No travel_per_example() test is running.",)
+
+
+def test_travel_per_example_not_hypothesis():
+    def test():
+        pass  # pragma: no cover
+
+    with pytest.raises(TypeError) as excinfo:
+        travel_per_example(EPOCH)(test)
+
+    assert excinfo.value.args == (
+        "travel_per_example() must be applied to a Hypothesis test, above @given.",
+    )
+
+
+def test_travel_per_example_timedelta():
+    seen = []
+
+    @travel_per_example(dt.timedelta(days=1), tick=False)
+    @settings(max_examples=3)
+    @given(st.just(None))
+    def test(value):
+        seen.append(time.time())
+        current_traveller().shift(10)
+
+    test()
+
+    assert len(set(seen)) == 1
@@ -2,11 +2,16 @@ from __future__ import annotations
 
 import asyncio
 import datetime as dt
+import logging
+import multiprocessing
 import os
 import subprocess
 import sys
+import threading
 import time
+import types
 import typing
+import unittest
 import uuid
 import warnings
 from contextlib import contextmanager
@@ -15,10 +20,12 @@ from textwrap import dedent
 from unittest import SkipTest, TestCase, mock
 from zoneinfo import ZoneInfo
 
+import _time_machine
 import freezegun
 import pytest
 from dateutil import tz
 
+import _time_machine_startup
 import time_machine
 
 NANOSECONDS_PER_SECOND = time_machine.NANOSECONDS_PER_SECOND
@@ -35,6 +42,7 @@ py_have_clock_gettime = pytest.mark.skipif(
 py_have_subinterpreters = pytest.mark.skipif(
     sys.version_info < (3, 13), reason="subinterpreter API added in Python 3.13"
 )
+py_have_fork = pytest.mark.skipif(not hasattr(os, "fork"), reason="Doesn't have fork")
 py_utcnow_deprecated = pytest.mark.skipif(
     sys.version_info < (3, 12), reason="utcnow() not deprecated before Python 3.12"
 )
@@ -44,6 +52,7 @@ py_utcnow_not_deprecated = pytest.mark.skipif(
 
 
 file_source = Path(__file__).read_text().splitlines()
+startup_hook = (Path(__file__).parent.parent / "src" / "time_machine.pth").read_text()
 
 
 def assert_warned_here(record: warnings.WarningMessage) -> None:
@@ -771,6 +780,135 @@ def test_destination_string_naive(local_tz, expected_offset, destination):
         assert time.time() == EPOCH + expected_offset
 
 
+def test_destination_string_cached():
+    time_machine.clear_destination_cache()
+
+    with time_machine.travel("1970-01-01 00:01:00+00:00"):
+        assert time.time() == EPOCH + 60.0
+    with time_machine.travel("1970-01-01 00:01:00+00:00"):
+        assert time.time() == EPOCH + 60.0
+
+    info = time_machine.destination_cache_info()
+    assert type(info) is time_machine.DestinationCacheInfo
+    assert (info.hits, info.misses, info.currsize) == (1, 1, 1)
+
+
+def test_destination_string_cache_keyed_on_local_tz():
+    time_machine.clear_destination_cache()
+
+    with change_local_timezone("UTC"), time_machine.travel("1970-01-01"):
+        assert time.time() == EPOCH
+    with change_local_timezone("Europe/Amsterdam"), time_machine.travel("1970-01-01"):
+        assert time.time() == EPOCH - 3600
+
+    assert time_machine.destination_cache_info().misses == 2
+
+
+def test_destination_string_cache_keyed_on_naive_mode():
+    time_machine.clear_destination_cache()
+
+    with change_local_timezone("Europe/Amsterdam"):
+        with time_machine.travel("1970-01-01"):
+            assert time.time() == EPOCH - 3600
+        with (
+            mock.patch.object(time_machine, "naive_mode", time_machine.NaiveMode.UTC),
+            time_machine.travel("1970-01-01"),
+        ):
+            assert time.time() == EPOCH
+
+    assert time_machine.destination_cache_info().misses == 2
+
+
+def test_destination_string_cache_errors_not_cached():
+    time_machine.clear_destination_cache()
+
+    for _ in range(2):
+        with pytest.raises(ValueError), time_machine.travel("the future"):
+            pass  # pragma: no cover
+
+    info = time_machine.destination_cache_info()
+    assert (info.hits, info.misses, info.currsize) == (0, 2, 0)
+
+
+def test_destination_string_relative_not_cached():
+    time_machine.clear_destination_cache()
+
+    # Travel to noon UTC, so the local date matches in any timezone.
+    with (
+        time_machine.travel(dt.datetime(2030, 1, 1, 12), tick=False),
+        time_machine.travel("10:00", tick=False),
+    ):
+        first = dt.datetime.now()
+    with (
+        time_machine.travel(dt.datetime(2030, 1, 2, 12), tick=False),
+        time_machine.travel("10:00", tick=False),
+    ):
+        second = dt.datetime.now()
+
+    assert first == dt.datetime(2030, 1, 1, 10)
+    assert second == dt.datetime(2030, 1, 2, 10)
+    assert time_machine.destination_cache_info().currsize == 0
+
+
+def test_clear_destination_cache():
+    with time_machine.travel("1970-01-01T00:00:00+00:00"):
+        pass
+
+    time_machine.clear_destination_cache()
+
+    info = time_machine.destination_cache_info()
+    assert (info.hits, info.misses, info.currsize) == (0, 0, 0)
+
+
+def test_destination_static_resolved_on_start():
+    traveller = time_machine.travel("the future")
+
+    with pytest.raises(ValueError):
+        traveller.start()
+
+
+def test_destination_static_resolved_once():
+    time_machine.clear_destination_cache()
+    traveller = time_machine.travel("1970-01-01T00:00:05+00:00")
+
+    for _ in range(2):
+        with traveller:
+            assert time.time() == EPOCH + 5.0
+
+    info = time_machine.destination_cache_info()
+    assert (info.hits, info.misses) == (0, 1)
+
+
+def test_destination_static_uses_naive_mode_at_start():
+    traveller = time_machine.travel(dt.datetime(1970, 1, 1))
+
+    with (
+        mock.patch.object(time_machine, "naive_mode", time_machine.NaiveMode.ERROR),
+        pytest.raises(RuntimeError),
+    ):
+        traveller.start()
+
+
+def test_destination_static_attributes():
+    traveller = time_machine.travel(
+        dt.datetime(1970, 1, 1, 0, 0, 1, tzinfo=ZoneInfo("UTC"))
+    )
+
+    assert traveller.destination_timestamp_ns == (EPOCH + 1) * NANOSECONDS_PER_SECOND
+    assert traveller.destination_tzname == "UTC"
+
+
+def test_destination_callable_resolved_immediately():
+    destination = mock.Mock(return_value=EPOCH)
+
+    traveller = time_machine.travel(destination)
+
+    destination.assert_called_once_with()
+    with traveller:
+        pass
+    destination.assert_called_once_with()
+
+
 @time_machine.travel(lambda: EPOCH + 140.0)
 def test_destination_callable_lambda_float():
     assert time.time() == EPOCH + 140.0
@@ -946,6 +1084,102 @@ class UnitTestClassSetUpClassSkipTests(TestCase):
         pass
 
 
+def test_reset_invalid():
+    with pytest.raises(ValueError) as excinfo:
+        time_machine.travel(EPOCH, reset="per_class")
+
+    assert excinfo.value.args == ("Unsupported reset mode 'per_class'.",)
+
+
+def test_reset_function_decorator():
+    with pytest.raises(TypeError) as excinfo:
+
+        @time_machine.travel(EPOCH, reset="per_test")
+        def something():  # pragma: no cover
+            pass
+
+    assert excinfo.value.args == (
+        "reset can only be used when decorating unittest.TestCase subclasses.",
+    )
+
+
+@time_machine.travel(EPOCH + 95.0, tick=False, reset="per_test")
+class UnitTestClassResetPerTestTests(TestCase):
+    traveller_count: int
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.traveller_count = len(time_machine.traveller_stack)
+
+    def setUp(self):
+        super().setUp()
+        assert time.time() == EPOCH + 95.0
+        time_machine.active_traveller().shift(5.0)
+
+    def test_one(self):
+        assert len(time_machine.traveller_stack) == self.traveller_count
+        assert time.time() == EPOCH + 100.0
+        time_machine.active_traveller().move_to(EPOCH + 200.0)
+
+    def test_two(self):
+        assert len(time_machine.traveller_stack) == self.traveller_count
+        assert time.time() == EPOCH + 100.0
+        time_machine.active_traveller().shift(-50.0)
+
+
+def test_active_traveller():
+    with time_machine.travel(EPOCH) as outer:
+        assert time_machine.active_traveller() is outer
+        with time_machine.travel(EPOCH + 10.0) as inner:
+            assert time_machine.active_traveller() is inner
+        assert time_machine.active_traveller() is outer
+
+
+def test_active_traveller_not_travelling():
+    with pytest.raises(RuntimeError) as excinfo:
+        time_machine.active_traveller()
+
+    assert excinfo.value.args == ("Not currently time-travelling.",)
+
+
+def test_reset_per_test_runs():
+    traveller_ids = []
+    times = []
+
+    @time_machine.travel(EPOCH + 10.0, tick=False, reset="per_test")
+    class Tests(TestCase):
+        def test_one(self):
+            traveller_ids.append(id(time_machine.active_traveller()))
+            times.append(time.time())
+            self.addCleanup(time_machine.active_traveller().shift, 1.0)
+            time_machine.active_traveller().shift(20.0)
+
+        def test_two(self):
+            traveller_ids.append(id(time_machine.active_traveller()))
+            times.append(time.time())
+            time_machine.active_traveller().move_to(EPOCH + 500.0)
+
+    suite = unittest.TestLoader().loadTestsFromTestCase(Tests)
+    result = unittest.TestResult()
+    suite.run(result)
+
+    assert result.wasSuccessful()
+    assert times == [EPOCH + 10.0, EPOCH + 10.0]
+    assert len(set(traveller_ids)) == 1
+    assert time.time() != EPOCH + 10.0
+
+
+@time_machine.travel(EPOCH + 110.0, reset="per_test")
+class UnitTestClassResetPerTestSkipTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        raise SkipTest("Not today")
+
+    def test_thats_always_skipped(self):  # pragma: no cover
+        pass
+
+
 # extract_timestamp_tzname() tests
 
 
@@ -1143,6 +1377,113 @@ def test_move_to_datetime_change_tick_off():
         assert time.time() == EPOCH_PLUS_ONE_YEAR
 
 
+# freeze() tests
+
+
+def test_freeze():
+    with time_machine.travel(EPOCH) as traveller:
+        traveller.freeze()
+        first = time.time_ns()
+        sleep_one_cycle(time.CLOCK_MONOTONIC)
+        assert time.time_ns() == first
+        assert not traveller._tick
+        assert EPOCH <= first / NANOSECONDS_PER_SECOND < EPOCH + 10.0
+
+
+def test_freeze_keeps_timezone():
+    destination = dt.datetime(2020, 1, 1, tzinfo=ZoneInfo("Africa/Addis_Ababa"))
+    with time_machine.travel(destination) as traveller:
+        traveller.freeze()
+        assert time.tzname == ("EAT", "EAT")
+
+
+# checkpoint() / restore() tests
+
+
+def test_restore_after_shift():
+    with time_machine.travel(EPOCH, tick=False) as traveller:
+        checkpoint = traveller.checkpoint()
+        traveller.shift(10)
+        assert time.time() == EPOCH + 10
+
+        traveller.restore(checkpoint)
+
+        assert time.time() == EPOCH
+
+
+def test_restore_repeatedly():
+    with time_machine.travel(EPOCH, tick=False) as traveller:
+        checkpoint = traveller.checkpoint()
+        for delta in (10, -10, 20):
+            traveller.shift(delta)
+            assert time.time() == EPOCH + delta
+            traveller.restore(checkpoint)
+            assert time.time() == EPOCH
+
+
+def test_restore_after_move_to_with_tick():
+    with time_machine.travel(EPOCH, tick=False) as traveller:
+        checkpoint = traveller.checkpoint()
+        traveller.move_to(EPOCH_PLUS_ONE_YEAR_DATETIME, tick=True)
+
+        traveller.restore(checkpoint)
+
+        assert time.time() == EPOCH
+        assert time.time() == EPOCH
+
+
+def test_restore_ticking():
+    with time_machine.travel(EPOCH) as traveller:
+        assert time.time() == EPOCH
+        checkpoint = traveller.checkpoint()
+        traveller.move_to(EPOCH_PLUS_ONE_YEAR_DATETIME, tick=False)
+
+        traveller.restore(checkpoint)
+
+        # Ticking continues from the original start.
+        assert EPOCH < time.time() < EPOCH + 10.0
+
+
+def test_restore_timezone():
+    with time_machine.travel(
+        EPOCH_DATETIME.replace(tzinfo=ZoneInfo("Africa/Addis_Ababa")), tick=False
+    ) as traveller:
+        checkpoint = traveller.checkpoint()
+        traveller.move_to(EPOCH_DATETIME.replace(tzinfo=ZoneInfo("Asia/Tokyo")))
+        assert time.tzname == ("JST", "JST")
+
+        traveller.restore(checkpoint)
+
+        assert time.tzname == ("EAT", "EAT")
+        assert time.time() == EPOCH - 3 * 3600
+
+
+def test_restore_timezone_unchanged():
+    with time_machine.travel(
+        EPOCH_DATETIME.replace(tzinfo=ZoneInfo("Africa/Addis_Ababa")), tick=False
+    ) as traveller:
+        checkpoint = traveller.checkpoint()
+        traveller.shift(10)
+
+        with mock.patch.object(time_machine, "tzset") as mock_tzset:
+            traveller.restore(checkpoint)
+
+        mock_tzset.assert_not_called()
+        assert time.time() == EPOCH - 3 * 3600
+
+
+def test_restore_other_traveller():
+    with (
+        time_machine.travel(EPOCH) as traveller,
+        time_machine.travel(EPOCH) as other_traveller,
+    ):
+        checkpoint = other_traveller.checkpoint()
+        with pytest.raises(ValueError) as excinfo:
+            traveller.restore(checkpoint)
+
+    assert excinfo.value.args == ("Checkpoint is from a different Traveller.",)
+
+
 # uuid tests
 
 
@@ -1229,6 +1570,31 @@ def test_uuid_move_to_backwards(generate, time_from):
         assert time_from(generate()) == past
 
 
+@pytest.mark.parametrize(("generate", "time_from"), uuid_generators)
+def test_uuid_restore_backwards(generate, time_from):
+    destination = dt.datetime(2056, 2, 6, 14, 3, 21)
+
+    with time_machine.travel(destination, tick=False) as traveller:
+        checkpoint = traveller.checkpoint()
+        traveller.shift(dt.timedelta(days=1))
+        assert time_from(generate()) == destination + dt.timedelta(days=1)
+
+        traveller.restore(checkpoint)
+
+        assert time_from(generate()) == destination
+
+
+def test_uuid_restore_forwards_no_reset():
+    with time_machine.travel(EPOCH, tick=False) as traveller:
+        checkpoint = traveller.checkpoint()
+        traveller.shift(-10)
+
+        with mock.patch.object(time_machine, "_reset_uuid_timestamps") as mock_reset:
+            traveller.restore(checkpoint)
+
+        mock_reset.assert_not_called()
+
+
 @pytest.mark.parametrize(("generate", "time_from"), uuid_generators)
 def test_uuid_after_travel(generate, time_from):
     """
@@ -1258,6 +1624,165 @@ def test_uuid_monotonic_within_travel(generate, time_from):
     assert first < second
 
 
+def time_from_uuid6_int(value: uuid.UUID) -> dt.datetime:
+    # UUID.time only supports version 6 on Python 3.14+.
+    timestamp = ((value.int >> 80) << 12) | ((value.int >> 64) & 0x0FFF)
+    return dt.datetime(1582, 10, 15) + dt.timedelta(microseconds=timestamp // 10)
+
+
+def time_from_uuid7_int(value: uuid.UUID) -> dt.datetime:
+    # UUID.time only supports version 7 on Python 3.14+.
+    return dt.datetime(1970, 1, 1) + dt.timedelta(milliseconds=value.int >> 80)
+
+
+deterministic_uuid_names = ["uuid1"]
+if sys.version_info >= (3, 14):
+    deterministic_uuid_names += ["uuid6", "uuid7"]
+
+
+def test_uuid_deterministic():
+    destination = dt.datetime(2030, 1, 1)
+
+    with time_machine.travel(destination, tick=False, uuid="deterministic"):
+        first = uuid.uuid1()
+        second = uuid.uuid1()
+
+    assert str(first) == "de488000-62b3-11f5-854f-a9397b1dcdaf"
+    assert str(second) == "de488001-62b3-11f5-854f-a9397b1dcdaf"
+    assert first.version == 1
+    assert first.variant == uuid.RFC_4122
+    assert time_from_uuid1(first) == destination
+    # Multicast bit set, since the node isn't a real MAC address.
+    assert first.node & 0x0100_0000_0000
+
+
+@pytest.mark.parametrize("name", deterministic_uuid_names)
+def test_uuid_deterministic_reproducible(name):
+    def generate(seed: int) -> list[uuid.UUID]:
+        with time_machine.travel(EPOCH, tick=False, uuid="deterministic", seed=seed):
+            function = getattr(uuid, name)
+            return [function() for _ in range(3)]
+
+    assert generate(0) == generate(0)
+    assert generate(0) != generate(1)
+
+
+@pytest.mark.parametrize("name", deterministic_uuid_names)
+def test_uuid_deterministic_unpatched(name):
+    original = getattr(uuid, name)
+
+    with time_machine.travel(EPOCH, uuid="deterministic"):
+        assert getattr(uuid, name) is not original
+
+    assert getattr(uuid, name) is original
+
+
+def test_uuid_deterministic_explicit_fields():
+    with time_machine.travel(EPOCH, tick=False, uuid="deterministic"):
+        value = uuid.uuid1(node=0x1234, clock_seq=0x0567)
+
+    assert value.node == 0x1234
+    assert value.clock_seq == 0x0567
+
+
+def test_uuid_deterministic_nested():
+    destination = dt.datetime(2030, 1, 1)
+
+    with time_machine.travel(EPOCH, tick=False, uuid="deterministic"):
+        deterministic_node = uuid.uuid1().node
+
+        with time_machine.travel(destination, tick=False):
+            value = uuid.uuid1()
+            assert time_from_uuid1(value) == destination
+            assert value.node != deterministic_node
+
+        with time_machine.travel(destination, tick=False, uuid="deterministic"):
+            assert uuid.uuid1().node == deterministic_node
+
+        assert uuid.uuid1().node == deterministic_node
+
+
+def test_uuid_deterministic_shift_backwards():
+    destination = dt.datetime(2030, 1, 1)
+
+    with time_machine.travel(
+        destination, tick=False, uuid="deterministic"
+    ) as traveller:
+        first = uuid.uuid1()
+        traveller.shift(-1)
+        traveller.shift(1)
+        second = uuid.uuid1()
+
+    assert time_from_uuid1(first) == time_from_uuid1(second) == destination
+    assert first.clock_seq != second.clock_seq
+
+
+def test_uuid_deterministic_restore():
+    with time_machine.travel(EPOCH, tick=False, uuid="deterministic") as traveller:
+        checkpoint = traveller.checkpoint()
+        first = [uuid.uuid1() for _ in range(3)]
+
+        traveller.restore(checkpoint)
+
+        assert [uuid.uuid1() for _ in range(3)] == first
+
+
+def test_uuid_deterministic_uuid6():
+    destination = dt.datetime(2030, 1, 1)
+
+    with time_machine.travel(
+        destination, tick=False, uuid="deterministic"
+    ) as traveller:
+        assert traveller._uuids is not None
+        first = traveller._uuids.uuid6()
+        second = traveller._uuids.uuid6(node=0x1234, clock_seq=0x0567)
+
+    assert first.version == 6
+    assert first.variant == uuid.RFC_4122
+    assert time_from_uuid6_int(first) == destination
+    assert first < second
+    assert second.int & 0xFFFF_FFFF_FFFF == 0x1234
+    assert (second.int >> 48) & 0x3FFF == 0x0567
+
+
+def test_uuid_deterministic_uuid7():
+    destination = dt.datetime(2030, 1, 1)
+
+    with time_machine.travel(
+        destination, tick=False, uuid="deterministic"
+    ) as traveller:
+        assert traveller._uuids is not None
+        values = [traveller._uuids.uuid7() for _ in range(3)]
+
+    assert values[0].version == 7
+    assert values[0].variant == uuid.RFC_4122
+    assert all(time_from_uuid7_int(value) == destination for value in values)
+    assert values == sorted(values)
+    assert len(set(values)) == 3
+
+
+def test_uuid_deterministic_uuid7_counter_overflow():
+    destination = dt.datetime(2030, 1, 1)
+
+    with time_machine.travel(
+        destination, tick=False, uuid="deterministic"
+    ) as traveller:
+        assert traveller._uuids is not None
+        first = traveller._uuids.uuid7()
+        traveller._uuids._counter_v7 = 0x3FF_FFFF_FFFF
+        second = traveller._uuids.uuid7()
+
+    assert time_from_uuid7_int(second) == destination + dt.timedelta(milliseconds=1)
+    assert first < second
+
+
+def test_uuid_deterministic_invalid():
+    with pytest.raises(ValueError) as excinfo:
+        time_machine.travel(EPOCH, uuid="random")
+
+    assert excinfo.value.args == ("Unsupported uuid mode 'random'.",)
+
+
 # subinterpreter tests
 
 
@@ -1436,56 +1961,839 @@ def test_subinterpreters_not_travelling_see_real_time():
     assert result.stdout == "OK\n"
 
 
-# error handling tests
+# propagate tests
 
+PROPAGATE_ENV_VAR = time_machine.PROPAGATE_ENV_VAR
 
-def test_c_extension_init_import_error():
-    code = dedent(
-        """\
-        import sys
-        sys.modules["datetime"] = None
-        try:
-            import _time_machine
-        except ImportError as exc:
-            print(exc.args[0])
-        """
-    )
 
+def run_child(code: str, env: dict[str, str] | None = None) -> str:
+    """
+    Run code in a child Python process, after the startup hook that a .pth
+    file would run, returning its output.
+    """
     result = subprocess.run(
-        [sys.executable, "-c", code],
+        [sys.executable, "-c", startup_hook + dedent(code)],
         check=True,
         stdout=subprocess.PIPE,
         text=True,
+        env={**os.environ, **(env or {})},
     )
+    return result.stdout
 
-    assert result.stdout == "import of datetime halted; None in sys.modules\n"
 
+def test_propagate_default_off():
+    with time_machine.travel(EPOCH, tick=False):
+        assert PROPAGATE_ENV_VAR not in os.environ
 
-@py_have_clock_gettime
-def test_c_extension_init_without_clock_realtime():
-    # time.CLOCK_REALTIME is not always available, e.g. on builds against old
-    # macOS = official Python.org installer. The C extension checks for it at
-    # import time; without it, time.clock_gettime() passes through to the real
-    # clock even while time travelling.
-    code = dedent(
-        """\
-        import time
-        clock_realtime = time.CLOCK_REALTIME
-        del time.CLOCK_REALTIME
 
-        import time_machine
+def test_propagate_env_var():
+    with time_machine.travel(EPOCH + 10.0, tick=False, propagate=True):
+        assert os.environ[PROPAGATE_ENV_VAR] == "10000000000:0:0:MIXED:"
 
-        with time_machine.travel(0.0, tick=False):
-            assert time.time() == 0.0
-            assert time.clock_gettime(clock_realtime) > 0.0
-        print("ok")
-        """
-    )
+    assert PROPAGATE_ENV_VAR not in os.environ
 
-    result = subprocess.run(
-        [sys.executable, "-c", code],
-        check=True,
-        stdout=subprocess.PIPE,
+
+def test_propagate_env_var_nested():
+    with time_machine.travel(EPOCH + 10.0, tick=False, propagate=True):
+        with time_machine.travel(EPOCH + 20.0, tick=False, propagate=True):
+            assert os.environ[PROPAGATE_ENV_VAR].startswith("20000000000:")
+        assert os.environ[PROPAGATE_ENV_VAR].startswith("10000000000:")
+
+    assert PROPAGATE_ENV_VAR not in os.environ
+
+
+def test_propagate_env_var_nested_outer_changed():
+    with time_machine.travel(EPOCH, tick=False, propagate=True) as outer:
+        with time_machine.travel(EPOCH + 1000.0, tick=False, propagate=True):
+            outer.shift(5)
+            assert os.environ[PROPAGATE_ENV_VAR].startswith("1000000000000:")
+            outer.move_to(EPOCH + 10.0)
+            assert os.environ[PROPAGATE_ENV_VAR].startswith("1000000000000:")
+        assert os.environ[PROPAGATE_ENV_VAR].startswith("10000000000:")
+
+    assert PROPAGATE_ENV_VAR not in os.environ
+
+
+def test_propagate_env_var_nested_not_propagating():
+    with (
+        time_machine.travel(EPOCH, tick=False, propagate=True) as outer,
+        time_machine.travel(EPOCH + 1000.0, tick=False),
+    ):
+        outer.shift(5)
+        assert os.environ[PROPAGATE_ENV_VAR].startswith("5000000000:")
+
+
+def test_propagate_env_var_zoneinfo():
+    destination = dt.datetime(1970, 1, 1, tzinfo=ZoneInfo("Africa/Addis_Ababa"))
+    with time_machine.travel(destination, tick=False, propagate=True):
+        assert os.environ[PROPAGATE_ENV_VAR].endswith(":MIXED:Africa/Addis_Ababa")
+
+
+def test_propagate_env_var_tick():
+    with time_machine.travel(EPOCH, propagate=True) as traveller:
+        assert traveller._requested
+        _, real_start_ns, tick, _, _ = os.environ[PROPAGATE_ENV_VAR].split(":")
+        assert int(real_start_ns) == traveller._real_start_timestamp_ns
+        assert tick == "1"
+
+
+def test_propagate_env_var_traveller_methods():
+    with time_machine.travel(EPOCH, tick=False, propagate=True) as traveller:
+        checkpoint = traveller.checkpoint()
+        traveller.shift(10)
+        assert os.environ[PROPAGATE_ENV_VAR].startswith("10000000000:")
+        traveller.move_to(EPOCH + 20.0)
+        assert os.environ[PROPAGATE_ENV_VAR].startswith("20000000000:")
+        traveller.restore(checkpoint)
+        assert os.environ[PROPAGATE_ENV_VAR].startswith("0:")
+
+
+def test_propagate_env_var_freeze():
+    with time_machine.travel(EPOCH, propagate=True) as traveller:
+        traveller.freeze()
+        destination_ns, _, tick, _, _ = os.environ[PROPAGATE_ENV_VAR].split(":")
+        assert int(destination_ns) == time.time_ns()
+        assert tick == "0"
+
+
+def test_propagate_subprocess():
+    with time_machine.travel(EPOCH + 10.0, tick=False, propagate=True):
+        output = run_child(
+            """
+            import time
+            print(time.time())
+            """
+        )
+
+    assert output == "10.0\n"
+
+
+def test_propagate_subprocess_shifted():
+    with time_machine.travel(EPOCH, tick=False, propagate=True) as traveller:
+        traveller.shift(dt.timedelta(days=1))
+        output = run_child(
+            """
+            import datetime as dt
+            print(dt.date.today())
+            """
+        )
+
+    assert output == "1970-01-02\n"
+
+
+def test_propagate_subprocess_tick():
+    with time_machine.travel(EPOCH_PLUS_ONE_YEAR, propagate=True):
+        output = run_child(
+            """
+            import time
+            print(time.time())
+            """
+        )
+        now = time.time()
+
+    assert EPOCH_PLUS_ONE_YEAR < float(output) < now
+
+
+def test_propagate_subprocess_zoneinfo():
+    destination = dt.datetime(1970, 1, 1, 12, tzinfo=ZoneInfo("Africa/Addis_Ababa"))
+    with time_machine.travel(destination, tick=False, propagate=True):
+        output = run_child(
+            """
+            import time
+            print(time.tzname, time.localtime().tm_hour)
+            """
+        )
+
+    assert output == "('EAT', 'EAT') 12\n"
+
+
+def test_propagate_subprocess_naive_mode():
+    with (
+        mock.patch.object(time_machine, "naive_mode", time_machine.NaiveMode.LOCAL),
+        time_machine.travel(EPOCH, tick=False, propagate=True),
+    ):
+        output = run_child(
+            """
+            import time_machine
+            print(time_machine.naive_mode)
+            """
+        )
+
+    assert output == "NaiveMode.LOCAL\n"
+
+
+def test_propagate_subprocess_not_propagating():
+    with time_machine.travel(EPOCH, tick=False):
+        output = run_child(
+            """
+            import time
+            print(time.time() > 0)
+            """
+        )
+
+    assert output == "True\n"
+
+
+def get_time() -> float:
+    return time.time()
+
+
+@py_have_fork
+def test_propagate_fork():
+    # Forked processes inherit the traveller state, with or without
+    # propagate=True.
+    context = multiprocessing.get_context("fork")
+    with (
+        time_machine.travel(EPOCH + 10.0, tick=False),
+        context.Pool(1) as pool,
+    ):
+        assert pool.apply(get_time) == EPOCH + 10.0
+
+
+def test_resume_propagated_travel():
+    with time_machine.travel(EPOCH + 10.0, tick=False, propagate=True):
+        state = os.environ[PROPAGATE_ENV_VAR]
+
+    with mock.patch.dict(os.environ, {PROPAGATE_ENV_VAR: state}):
+        time_machine._resume_propagated_travel()
+        propagated_travel = time_machine.propagated_travel
+        try:
+            assert propagated_travel is not None
+            assert time.time() == EPOCH + 10.0
+            # Only resumes once.
+            time_machine._resume_propagated_travel()
+            assert time_machine.propagated_travel is propagated_travel
+        finally:
+            assert propagated_travel is not None
+            propagated_travel.stop()
+            time_machine.propagated_travel = None
+
+    assert time.time() != EPOCH + 10.0
+
+
+def test_resume_propagated_travel_tick():
+    with time_machine.travel(EPOCH + 10.0, propagate=True):
+        state = os.environ[PROPAGATE_ENV_VAR]
+        now = time.time()
+
+    with mock.patch.dict(os.environ, {PROPAGATE_ENV_VAR: state}):
+        time_machine._resume_propagated_travel()
+        propagated_travel = time_machine.propagated_travel
+        try:
+            assert now < time.time() < EPOCH + 20.0
+        finally:
+            assert propagated_travel is not None
+            propagated_travel.stop()
+            time_machine.propagated_travel = None
+
+
+def test_resume_propagated_travel_unset():
+    time_machine._resume_propagated_travel()
+
+    assert time_machine.propagated_travel is None
+
+
+# ignore tests
+
+
+def make_clock_module(name: str) -> typing.Any:
+    """
+    Make a module with the given name, whose functions read the time.
+    """
+    module = types.ModuleType(name)
+    exec(
+        dedent(
+            """
+            import datetime as dt
+            import time
+
+            def time_time():
+                return time.time()
+
+            def readers():
+                return [
+                    time.time(),
+                    time.time_ns() / 1e9,
+                    time.mktime(time.localtime()),
+                    time.mktime(time.gmtime()),
+                    dt.datetime.now().timestamp(),
+                    dt.datetime.now(dt.timezone.utc).timestamp(),
+                    dt.datetime.today().timestamp(),
+                    int(time.strftime("%Y")),
+                    dt.date.today().year,
+                ]
+            """
+        ),
+        module.__dict__,
+    )
+    return module
+
+
+def test_ignore():
+    ignored = make_clock_module("billing")
+
+    with time_machine.travel(EPOCH, tick=False, ignore=["billing"]):
+        assert time.time() == EPOCH
+        assert ignored.time_time() > LIBRARY_EPOCH
+        # Cached decision
+        assert ignored.time_time() > LIBRARY_EPOCH
+
+
+def test_ignore_all_functions():
+    ignored = make_clock_module("billing")
+
+    with time_machine.travel(EPOCH, tick=False, ignore=["billing"]):
+        readers = ignored.readers()
+
+    assert all(value > 2000 for value in readers)
+
+
+def test_ignore_submodule():
+    submodule = make_clock_module("billing.invoices")
+    other = make_clock_module("billing_extra")
+
+    with time_machine.travel(EPOCH, tick=False, ignore=["billing"]):
+        assert submodule.time_time() > LIBRARY_EPOCH
+        assert other.time_time() == EPOCH
+
+
+def test_ignore_not_module():
+    namespace: dict[str, typing.Any] = {}
+    exec("import time\ndef time_time():\n    return time.time()", namespace)
+    del namespace["__builtins__"]
+
+    with time_machine.travel(EPOCH, tick=False, ignore=["billing"]):
+        assert namespace["time_time"]() == EPOCH
+
+
+def test_ignore_nested():
+    ignored = make_clock_module("billing")
+
+    with time_machine.travel(EPOCH, tick=False, ignore=["billing"]):
+        with time_machine.travel(EPOCH_PLUS_ONE_YEAR, tick=False):
+            assert ignored.time_time() == EPOCH_PLUS_ONE_YEAR
+        assert ignored.time_time() > LIBRARY_EPOCH
+
+    with time_machine.travel(EPOCH, tick=False):
+        assert ignored.time_time() == EPOCH
+
+
+def test_ignore_logging():
+    with time_machine.travel(EPOCH, tick=False, ignore=["logging"]):
+        record = logging.LogRecord("test", logging.INFO, __file__, 1, "", (), None)
+
+    assert record.created > LIBRARY_EPOCH
+
+
+def test_ignore_string():
+    with pytest.raises(TypeError) as excinfo:
+        time_machine.travel(EPOCH, ignore="billing")
+
+    assert excinfo.value.args == (
+        "ignore must be a list of module names, not a string.",
+    )
+
+
+def test_set_ignore_not_tuple():
+    with pytest.raises(TypeError) as excinfo:
+        _time_machine.set_ignore(["billing"])
+
+    assert excinfo.value.args == ("ignore must be a tuple.",)
+
+
+def test_set_ignore_not_strings():
+    with pytest.raises(TypeError) as excinfo:
+        _time_machine.set_ignore((1,))
+
+    assert excinfo.value.args == ("ignore must contain module names.",)
+
+
+def test_ignore_changed_concurrently():
+    ignored = make_clock_module("billing")
+    stop = threading.Event()
+
+    def toggle_ignore():
+        while not stop.is_set():
+            _time_machine.set_ignore(("billing",))
+            _time_machine.set_ignore(())
+
+    with time_machine.travel(EPOCH, tick=False):
+        thread = threading.Thread(target=toggle_ignore)
+        thread.start()
+        try:
+            for _ in range(10_000):
+                value = ignored.time_time()
+                assert value == EPOCH or value > LIBRARY_EPOCH
+        finally:
+            stop.set()
+            thread.join()
+
+
+# TIME_MACHINE_TRAVEL tests
+
+
+def test_startup_travel():
+    output = run_child(
+        """
+        import sys
+        import time
+        print(time.time())
+        print(sorted({"dateutil", "inspect", "pytest", "time_machine"} & set(sys.modules)))
+        """,
+        env={"TIME_MACHINE_TRAVEL": "2030-01-01T00:00Z", "TIME_MACHINE_TICK": "0"},
+    )
+
+    assert output == "1893456000.0\n[]\n"
+
+
+def test_startup_travel_timestamp():
+    output = run_child(
+        """
+        import datetime as dt
+        print(dt.datetime.now(dt.timezone.utc))
+        """,
+        env={"TIME_MACHINE_TRAVEL": "10.5", "TIME_MACHINE_TICK": "false"},
+    )
+
+    assert output == "1970-01-01 00:00:10.500000+00:00\n"
+
+
+def test_startup_travel_tick():
+    output = run_child(
+        """
+        import time
+        first = time.time()
+        time.sleep(0.001)
+        print(first, time.time())
+        """,
+        env={"TIME_MACHINE_TRAVEL": "2030-01-01T00:00Z"},
+    )
+
+    first, second = map(float, output.split())
+    assert 1893456000.0 == first < second < 1893456010.0
+
+
+def test_startup_travel_tz():
+    output = run_child(
+        """
+        import time
+        print(time.time(), time.tzname, time.localtime().tm_hour)
+        """,
+        env={
+            "TIME_MACHINE_TRAVEL": "2030-01-01T12:00",
+            "TIME_MACHINE_TICK": "0",
+            "TIME_MACHINE_TZ": "Africa/Addis_Ababa",
+        },
+    )
+
+    assert output == "1893488400.0 ('EAT', 'EAT') 12\n"
+
+
+def test_startup_travel_invalid():
+    output = run_child(
+        """
+        import os
+        import time
+        import _time_machine_startup
+        os.environ["TIME_MACHINE_TRAVEL"] = "next tuesday"
+        try:
+            _time_machine_startup.start()
+        except ValueError as exc:
+            print(exc)
+        print(os.environ.get("TZ"), time.time() > 1893456000.0)
+        """,
+        env={"TIME_MACHINE_TZ": "Africa/Addis_Ababa"},
+    )
+
+    assert output == (
+        "Invalid TIME_MACHINE_TRAVEL value 'next tuesday'.\n"
+        + f"{os.environ['TZ']} False\n"
+    )
+
+
+def test_startup_travel_unset():
+    output = run_child(
+        """
+        import sys
+        print("_time_machine_startup" in sys.modules)
+        """
+    )
+
+    assert output == "False\n"
+
+
+def test_startup_travel_adopted():
+    output = run_child(
+        """
+        import time
+        import time_machine
+
+        traveller = time_machine.active_traveller()
+        print(type(traveller).__name__)
+        traveller.shift(10)
+        print(time.time())
+        with time_machine.travel(0.0, tick=False):
+            print(time.time())
+        print(time.time())
+        """,
+        env={"TIME_MACHINE_TRAVEL": "2030-01-01T00:00Z", "TIME_MACHINE_TICK": "0"},
+    )
+
+    assert output == "Traveller\n1893456010.0\n0.0\n1893456010.0\n"
+
+
+def test_startup_travel_uuid():
+    output = run_child(
+        """
+        import uuid
+        print(uuid.uuid1().time)
+        import time_machine
+        print(uuid.uuid1().time)
+        """,
+        env={"TIME_MACHINE_TRAVEL": "0", "TIME_MACHINE_TICK": "0"},
+    )
+
+    # Timestamps count 100ns intervals since 1582-10-15, and increment to
+    # stay unique.
+    uuid_epoch = 0x01B21DD213814000
+    assert output == f"{uuid_epoch}\n{uuid_epoch + 1}\n"
+
+
+def test_startup_travel_started_once():
+    output = run_child(
+        """
+        import _time_machine_startup
+        _time_machine_startup.start()
+        print(len(_time_machine_startup.traveller_stack))
+        """,
+        env={"TIME_MACHINE_TRAVEL": "2030-01-01T00:00Z"},
+    )
+
+    assert output == "1\n"
+
+
+def test_adopt_startup_travel():
+    startup_traveller = _time_machine_startup.StartupTraveller(
+        destination_timestamp_ns=10 * NANOSECONDS_PER_SECOND,
+        destination_tzname=None,
+        tick=True,
+    )
+    startup_traveller._requested = True
+    startup_traveller._real_start_timestamp_ns = time.time_ns()
+    generate_time_safe = uuid._generate_time_safe  # type: ignore[attr-defined]
+    uuid_create = uuid._UuidCreate  # type: ignore[attr-defined]
+    startup = mock.Mock(
+        traveller_stack=[startup_traveller],
+        original_uuid_generate_time_safe=generate_time_safe,
+        original_uuid_uuid_create=uuid_create,
+    )
+
+    _time_machine.patch()
+    uuid._generate_time_safe = None  # type: ignore[attr-defined]
+    uuid._UuidCreate = None  # type: ignore[attr-defined]
+    with mock.patch.dict(sys.modules, {"_time_machine_startup": startup}):
+        time_machine._adopt_startup_travel()
+    try:
+        assert startup.traveller_stack is time_machine.traveller_stack
+        traveller = time_machine.active_traveller()
+        assert type(traveller) is time_machine.Traveller
+        assert traveller._destination_timestamp_ns == 10 * NANOSECONDS_PER_SECOND
+        assert traveller._tick
+        assert traveller._requested
+        assert (
+            traveller._real_start_timestamp_ns
+            == startup_traveller._real_start_timestamp_ns
+        )
+        assert EPOCH + 10.0 <= time.time() < EPOCH + 20.0
+    finally:
+        time_machine._pop_traveller()
+
+    assert time.time() > EPOCH + 20.0
+    assert uuid._generate_time_safe is generate_time_safe  # type: ignore[attr-defined]
+    assert uuid._UuidCreate is uuid_create  # type: ignore[attr-defined]
+
+
+def test_adopt_startup_travel_not_started():
+    startup = mock.Mock(traveller_stack=[])
+
+    with mock.patch.dict(sys.modules, {"_time_machine_startup": startup}):
+        time_machine._adopt_startup_travel()
+
+    assert time_machine.traveller_stack == []
+
+
+def test_startup_parse_destination():
+    parse_destination = _time_machine_startup.parse_destination
+
+    assert parse_destination("1") == NANOSECONDS_PER_SECOND
+    assert parse_destination("2030-01-01T00:00:00.000001Z") == (
+        1893456000 * NANOSECONDS_PER_SECOND + 1000
+    )
+    assert parse_destination("2030-01-01T00:00+01:00") == (
+        1893452400 * NANOSECONDS_PER_SECOND
+    )
+
+
+def test_startup_parse_destination_invalid():
+    with pytest.raises(ValueError) as excinfo:
+        _time_machine_startup.parse_destination("tomorrow")
+
+    assert excinfo.value.args == ("Invalid TIME_MACHINE_TRAVEL value 'tomorrow'.",)
+
+
+# SharedClock tests
+
+
+def test_shared_clock(tmp_path):
+    clock = time_machine.SharedClock(tmp_path / "clock", EPOCH + 10.0, tick=False)
+    try:
+        assert clock.time_ns() == 10 * NANOSECONDS_PER_SECOND
+        with clock as traveller:
+            assert isinstance(traveller, time_machine.SharedClockTraveller)
+            assert traveller.clock is clock
+            assert time.time() == EPOCH + 10.0
+        assert time.time() != EPOCH + 10.0
+    finally:
+        clock.close()
+
+
+def test_shared_clock_tick(tmp_path):
+    clock = time_machine.SharedClock(tmp_path / "clock", EPOCH_PLUS_ONE_YEAR)
+    try:
+        with clock:
+            first = time.time()
+            sleep_one_cycle(time.CLOCK_MONOTONIC)
+            second = time.time()
+        assert EPOCH_PLUS_ONE_YEAR <= first < second < EPOCH_PLUS_ONE_YEAR + 10.0
+    finally:
+        clock.close()
+
+
+def test_shared_clock_attached(tmp_path):
+    path = tmp_path / "clock"
+    clock = time_machine.SharedClock(path, EPOCH, tick=False)
+    attached = time_machine.SharedClock(path)
+    try:
+        with attached as traveller:
+            assert time.time() == EPOCH
+            clock.shift(10)
+            assert time.time() == EPOCH + 10.0
+            traveller.shift(dt.timedelta(seconds=-5))
+            assert clock.time_ns() == 5 * NANOSECONDS_PER_SECOND
+            clock.move_to(EPOCH_PLUS_ONE_YEAR)
+            assert time.time() == EPOCH_PLUS_ONE_YEAR
+            traveller.move_to(EPOCH, tick=True)
+            assert EPOCH <= time.time() < EPOCH + 10.0
+    finally:
+        attached.close()
+        clock.close()
+
+
+def test_shared_clock_nested(tmp_path):
+    clock = time_machine.SharedClock(tmp_path / "clock", EPOCH, tick=False)
+    try:
+        with time_machine.travel(EPOCH + 10.0, tick=False):
+            with clock:
+                assert time.time() == EPOCH
+            assert time.time() == EPOCH + 10.0
+    finally:
+        clock.close()
+
+
+def test_shared_clock_recreate(tmp_path):
+    path = tmp_path / "clock"
+    clock = time_machine.SharedClock(path, EPOCH, tick=False)
+    try:
+        time_machine.SharedClock(path, EPOCH + 10.0, tick=False).close()
+        assert clock.time_ns() == 10 * NANOSECONDS_PER_SECOND
+    finally:
+        clock.close()
+
+
+def test_shared_clock_not_clock_file(tmp_path):
+    path = tmp_path / "clock"
+    path.write_bytes(b"")
+
+    with pytest.raises(ValueError) as excinfo:
+        time_machine.SharedClock(path)
+
+    assert excinfo.value.args == (f"{path!r} is not a shared clock file.",)
+
+
+def test_shared_clock_missing(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        time_machine.SharedClock(tmp_path / "clock")
+
+
+def test_shared_clock_checkpoint(tmp_path):
+    clock = time_machine.SharedClock(tmp_path / "clock", EPOCH)
+    try:
+        with clock as traveller, pytest.raises(TypeError) as excinfo:
+            traveller.checkpoint()
+    finally:
+        clock.close()
+
+    assert excinfo.value.args == ("SharedClock travellers do not support checkpoints.",)
+
+
+def test_shared_clock_freeze(tmp_path):
+    clock = time_machine.SharedClock(tmp_path / "clock", EPOCH)
+    try:
+        with clock as traveller:
+            traveller.freeze()
+            first = time.time()
+            sleep_one_cycle(time.CLOCK_MONOTONIC)
+            assert time.time() == first
+    finally:
+        clock.close()
+
+
+def test_shared_clock_subprocess(tmp_path):
+    path = tmp_path / "clock"
+    clock = time_machine.SharedClock(path, EPOCH, tick=False)
+    code = dedent(
+        f"""\
+        import sys
+        import time
+        import time_machine
+
+        clock = time_machine.SharedClock({str(path)!r})
+        with clock:
+            print(time.time(), flush=True)
+            sys.stdin.readline()
+            print(time.time(), flush=True)
+        """
+    )
+    try:
+        with subprocess.Popen(
+            [sys.executable, "-c", code],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+        ) as process:
+            assert process.stdout is not None
+            assert process.stdin is not None
+            assert process.stdout.readline() == "0.0\n"
+            clock.shift(10)
+            process.stdin.write("\n")
+            process.stdin.flush()
+            assert process.stdout.readline() == "10.0\n"
+        assert process.returncode == 0
+    finally:
+        clock.close()
+
+
+def test_shared_clock_consistent_reads(tmp_path):
+    path = tmp_path / "clock"
+    clock = time_machine.SharedClock(path, EPOCH, tick=False)
+    # Write pairs of fields that should always be read together.
+    code = dedent(
+        f"""\
+        import mmap
+        import sys
+        import _time_machine
+
+        with open({str(path)!r}, "r+b") as f:
+            buffer = mmap.mmap(f.fileno(), 32)
+        _time_machine.shared_clock_write(buffer, 0, 0, False)
+        print(flush=True)
+        for i in range(1, 200_000):
+            _time_machine.shared_clock_write(buffer, i, -i, False)
+        """
+    )
+    try:
+        with subprocess.Popen(
+            [sys.executable, "-c", code],
+            stdout=subprocess.PIPE,
+            text=True,
+        ) as process:
+            assert process.stdout is not None
+            process.stdout.readline()
+            while process.poll() is None:
+                destination, real_start, _ = _time_machine.shared_clock_read(
+                    clock._mmap
+                )
+                assert destination == -real_start
+        assert process.returncode == 0
+    finally:
+        clock.close()
+
+
+def test_shared_clock_read_invalid_buffer():
+    with pytest.raises(ValueError) as excinfo:
+        _time_machine.shared_clock_read(bytearray(8))
+
+    assert excinfo.value.args == (
+        "Shared clock buffer must be at least 32 bytes and 8-byte aligned.",
+    )
+
+
+def test_shared_clock_write_unaligned_buffer():
+    buffer = memoryview(bytearray(40))[1:33]
+
+    with pytest.raises(ValueError) as excinfo:
+        _time_machine.shared_clock_write(buffer, 0, 0, False)
+
+    assert excinfo.value.args == (
+        "Shared clock buffer must be at least 32 bytes and 8-byte aligned.",
+    )
+
+
+def test_shared_clock_shift_read_only_buffer():
+    with pytest.raises(BufferError):
+        _time_machine.shared_clock_shift(bytes(32), 1)
+
+
+# error handling tests
+
+
+def test_c_extension_init_import_error():
+    code = dedent(
+        """\
+        import sys
+        sys.modules["datetime"] = None
+        try:
+            import _time_machine
+        except ImportError as exc:
+            print(exc.args[0])
+        """
+    )
+
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        check=True,
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+
+    assert result.stdout == "import of datetime halted; None in sys.modules\n"
+
+
+@py_have_clock_gettime
+def test_c_extension_init_without_clock_realtime():
+    # time.CLOCK_REALTIME is not always available, e.g. on builds against old
+    # macOS = official Python.org installer. The C extension checks for it at
+    # import time; without it, time.clock_gettime() passes through to the real
+    # clock even while time travelling.
+    code = dedent(
+        """\
+        import time
+        clock_realtime = time.CLOCK_REALTIME
+        del time.CLOCK_REALTIME
+
+        import time_machine
+
+        with time_machine.travel(0.0, tick=False):
+            assert time.time() == 0.0
+            assert time.clock_gettime(clock_realtime) > 0.0
+        print("ok")
+        """
+    )
+
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        check=True,
+        stdout=subprocess.PIPE,
         text=True,
     )
 
@@ -1877,6 +3185,423 @@ def test_marker_module(testdir):
     result.assert_outcomes(passed=1)
 
 
+def test_marker_shared_resolved_once(testdir):
+    testdir.makepyfile(
+        """
+        import pytest
+        import time
+
+        @pytest.mark.time_machine("1970-01-01T00:00:00+00:00", tick=False)
+        class TestTimeMachine:
+            @pytest.mark.parametrize("n", range(3))
+            def test(self, n):
+                assert time.time() == 0.0
+
+            def test_other(self, time_machine):
+                time_machine.shift(10)
+                assert time.time() == 10.0
+    """
+    )
+    time_machine.clear_destination_cache()
+
+    result = testdir.runpytest_inprocess("-p", "no:randomly")
+
+    result.assert_outcomes(passed=4)
+    info = time_machine.destination_cache_info()
+    assert (info.hits, info.misses) == (0, 1)
+
+
+def test_marker_timedelta(testdir):
+    testdir.makepyfile(
+        """
+        import datetime as dt
+        import pytest
+        import time
+
+        start = time.time()
+
+        @pytest.mark.time_machine(dt.timedelta(days=1))
+        def test():
+            assert time.time() >= start + 86_400
+    """
+    )
+
+    result = testdir.runpytest("-v", "-s")
+    result.assert_outcomes(passed=1)
+
+
+def test_marker_invalid_arguments(testdir):
+    testdir.makepyfile(
+        """
+        import pytest
+
+        @pytest.mark.time_machine()
+        def test():
+            pass
+    """
+    )
+
+    result = testdir.runpytest("-v", "-s")
+    result.assert_outcomes(errors=1)
+
+
+def test_fixture_module_scope(testdir):
+    testdir.makepyfile(
+        """
+        import pytest
+        import time
+        import time_machine
+
+        travellers = []
+
+        @pytest.fixture(scope="module", autouse=True)
+        def frozen(time_machine_module):
+            time_machine_module.move_to(0, tick=False)
+
+        def test_shift(time_machine_module):
+            travellers.append(time_machine_module.traveller_obj)
+            time_machine_module.shift(10)
+            assert time.time() == 10.0
+
+        def test_move_to(time_machine_module):
+            travellers.append(time_machine_module.traveller_obj)
+            assert time.time() == 0.0
+            time_machine_module.move_to(100)
+            assert time.time() == 100.0
+
+        def test_reset():
+            assert time.time() == 0.0
+            assert len(time_machine.traveller_stack) == 1
+            assert travellers[0] is travellers[1]
+    """
+    )
+
+    result = testdir.runpytest("-p", "no:randomly")
+    result.assert_outcomes(passed=3)
+
+
+def test_fixture_module_scope_backwards_and_ticking(testdir):
+    testdir.makepyfile(
+        """
+        import pytest
+        import time
+
+        @pytest.fixture(scope="module", autouse=True)
+        def frozen(time_machine_module):
+            time_machine_module.move_to(100, tick=False)
+
+        def test_backwards(time_machine_module):
+            time_machine_module.shift(-50)
+            assert time.time() == 50.0
+
+        def test_tick(time_machine_module):
+            assert time.time() == 100.0
+            time_machine_module.move_to(200, tick=True)
+            assert time.time() >= 200.0
+
+        def test_reset():
+            assert time.time() == 100.0
+    """
+    )
+
+    result = testdir.runpytest("-p", "no:randomly")
+    result.assert_outcomes(passed=3)
+
+
+def test_fixture_module_scope_timezone(testdir):
+    testdir.makepyfile(
+        """
+        import datetime as dt
+        import os
+        import pytest
+        import time
+        from zoneinfo import ZoneInfo
+
+        @pytest.fixture(scope="module", autouse=True)
+        def frozen(time_machine_module):
+            time_machine_module.move_to(
+                dt.datetime(2020, 1, 1, tzinfo=ZoneInfo("Europe/Amsterdam"))
+            )
+
+        def test_change_zone(time_machine_module):
+            time_machine_module.move_to(
+                dt.datetime(2020, 1, 1, tzinfo=ZoneInfo("America/New_York"))
+            )
+            assert os.environ["TZ"] == "America/New_York"
+
+        def test_reset():
+            assert os.environ["TZ"] == "Europe/Amsterdam"
+    """
+    )
+
+    result = testdir.runpytest("-p", "no:randomly")
+    result.assert_outcomes(passed=2)
+
+
+def test_fixture_module_scope_started_in_test(testdir):
+    testdir.makepyfile(
+        """
+        import time
+        import time_machine
+
+        def test_start(time_machine_module):
+            time_machine_module.move_to(0)
+            assert time.time() < 10.0
+
+        def test_reset(time_machine_module):
+            assert not time_machine.traveller_stack
+            assert time_machine_module.traveller is None
+    """
+    )
+
+    result = testdir.runpytest("-p", "no:randomly")
+    result.assert_outcomes(passed=2)
+
+
+def test_fixture_class_scope(testdir):
+    testdir.makepyfile(
+        """
+        import pytest
+        import time
+
+        @pytest.fixture(scope="class")
+        def frozen(time_machine_class):
+            time_machine_class.move_to(0, tick=False)
+
+        @pytest.mark.usefixtures("frozen")
+        class TestTimeMachine:
+            def test_shift(self, time_machine_class):
+                time_machine_class.shift(10)
+                assert time.time() == 10.0
+
+            def test_reset(self, time_machine_class):
+                assert time.time() == 0.0
+                # Changes in the last test, torn down with the class.
+                time_machine_class.shift(10)
+                time_machine_class.shift(10)
+                assert time.time() == 20.0
+
+        def test_outside_class():
+            assert time.time() > 20.0
+    """
+    )
+
+    result = testdir.runpytest("-p", "no:randomly")
+    result.assert_outcomes(passed=3)
+
+
+def test_fixture_module_scope_function_fixture_changes_reset(testdir):
+    testdir.makepyfile(
+        """
+        import pytest
+        import time
+
+        @pytest.fixture(scope="module", autouse=True)
+        def frozen(time_machine_module):
+            time_machine_module.move_to(0, tick=False)
+
+        @pytest.fixture
+        def shifted(time_machine_module):
+            time_machine_module.shift(10)
+
+        def test_shift(shifted):
+            assert time.time() == 10.0
+
+        def test_reset():
+            assert time.time() == 0.0
+    """
+    )
+
+    result = testdir.runpytest("-p", "no:randomly")
+    result.assert_outcomes(passed=2)
+
+
+def test_fixture_session_scope(testdir):
+    testdir.makeconftest(
+        """
+        import pytest
+
+        @pytest.fixture(scope="session", autouse=True)
+        def frozen(time_machine_session):
+            time_machine_session.move_to(0, tick=False)
+    """
+    )
+    testdir.makepyfile(
+        test_one="""
+        import time
+
+        def test_shift(time_machine_session):
+            time_machine_session.shift(10)
+            assert time.time() == 10.0
+    """,
+        test_two="""
+        import time
+
+        def test_reset():
+            assert time.time() == 0.0
+    """,
+    )
+
+    result = testdir.runpytest("-p", "no:randomly")
+    result.assert_outcomes(passed=2)
+
+
+def test_marker_scope_module(testdir):
+    testdir.makepyfile(
+        """
+        import pytest
+        import time
+
+        pytestmark = pytest.mark.time_machine(0, tick=False, scope="module")
+
+        def test_shift(time_machine_module):
+            time_machine_module.shift(10)
+            assert time.time() == 10.0
+
+        def test_function_fixture(time_machine):
+            assert time.time() == 0.0
+            time_machine.move_to(100)
+            assert time.time() >= 100.0
+
+        def test_reset():
+            assert time.time() == 0.0
+    """
+    )
+
+    result = testdir.runpytest("-p", "no:randomly")
+    result.assert_outcomes(passed=3)
+
+
+def test_marker_scope_class(testdir):
+    testdir.makepyfile(
+        """
+        import pytest
+        import time
+
+        @pytest.mark.time_machine(0, tick=False, scope="class")
+        class TestTimeMachine:
+            def test_one(self):
+                assert time.time() == 0.0
+
+            def test_two(self, time_machine_class):
+                assert time.time() == 0.0
+
+        def test_outside_class():
+            assert time.time() > 10.0
+    """
+    )
+
+    result = testdir.runpytest("-p", "no:randomly")
+    result.assert_outcomes(passed=3)
+
+
+def test_marker_scope_session(testdir):
+    testdir.makepyfile(
+        """
+        import pytest
+        import time
+
+        @pytest.mark.time_machine(0, tick=False, scope="session")
+        def test_one():
+            assert time.time() == 0.0
+
+        @pytest.mark.time_machine(0, tick=False, scope="session")
+        def test_two():
+            assert time.time() == 0.0
+    """
+    )
+
+    result = testdir.runpytest("-p", "no:randomly")
+    result.assert_outcomes(passed=2)
+
+
+def test_marker_scope_function(testdir):
+    testdir.makepyfile(
+        """
+        import pytest
+        import time
+
+        @pytest.mark.time_machine(0, tick=False, scope="function")
+        def test_one():
+            assert time.time() == 0.0
+
+        @pytest.mark.time_machine(lambda: 0, tick=False, scope="function")
+        def test_two():
+            assert time.time() == 0.0
+    """
+    )
+
+    result = testdir.runpytest("-p", "no:randomly")
+    result.assert_outcomes(passed=2)
+
+
+def test_marker_scope_invalid(testdir):
+    testdir.makepyfile(
+        """
+        import pytest
+
+        @pytest.mark.time_machine(0, scope="package")
+        def test():
+            pass
+    """
+    )
+
+    result = testdir.runpytest("-p", "no:randomly")
+    assert result.ret == pytest.ExitCode.USAGE_ERROR
+    result.stderr.fnmatch_lines(
+        [
+            "ERROR: Invalid scope 'package' for time_machine marker, "
+            + "must be one of: function, class, module, session."
+        ]
+    )
+
+
+def test_marker_scope_class_not_in_class(testdir):
+    testdir.makepyfile(
+        """
+        import pytest
+
+        @pytest.mark.time_machine(0, scope="class")
+        def test():
+            pass
+    """
+    )
+
+    result = testdir.runpytest("-p", "no:randomly")
+    assert result.ret == pytest.ExitCode.USAGE_ERROR
+    result.stderr.fnmatch_lines(
+        [
+            "ERROR: time_machine marker with scope='class' used on "
+            + "test_marker_scope_class_not_in_class.py::test, which is not in a class."
+        ]
+    )
+
+
+def test_marker_scope_conflict(testdir):
+    testdir.makepyfile(
+        """
+        import pytest
+
+        @pytest.mark.time_machine(0, scope="module")
+        def test_one():
+            pass
+
+        @pytest.mark.time_machine(1, scope="module")
+        def test_two():
+            pass
+    """
+    )
+
+    result = testdir.runpytest("-p", "no:randomly")
+    assert result.ret == pytest.ExitCode.USAGE_ERROR
+    result.stderr.fnmatch_lines(
+        [
+            "ERROR: Conflicting time_machine markers with scope='module' for "
+            + "test_marker_scope_conflict.py::test_two: (0,) and (1,)."
+        ]
+    )
+
+
 # escape hatch tests
 
 
@@ -1888,6 +3613,43 @@ class TestEscapeHatch:
         with time_machine.travel(EPOCH):
             assert time_machine.escape_hatch.is_travelling() is True
 
+    def test_functions_are_builtin(self):
+        escape_hatch = time_machine.escape_hatch
+
+        assert escape_hatch.datetime.date.today is _time_machine.original_date_today
+        assert escape_hatch.datetime.datetime.now is _time_machine.original_now
+        assert escape_hatch.datetime.datetime.today is _time_machine.original_today
+        assert escape_hatch.time.time is _time_machine.original_time
+        assert escape_hatch.time.time_ns is _time_machine.original_time_ns
+
+    def test_keyword_and_none_arguments(self):
+        escape_hatch = time_machine.escape_hatch
+
+        with time_machine.travel(EPOCH):
+            assert escape_hatch.time.gmtime(secs=EPOCH_PLUS_ONE_YEAR).tm_year == 1971
+            assert escape_hatch.time.gmtime(None).tm_year > 2000
+            assert escape_hatch.time.localtime(secs=EPOCH_PLUS_ONE_YEAR).tm_year in (
+                1970,
+                1971,
+            )
+            assert escape_hatch.time.localtime(None).tm_year > 2000
+            assert int(escape_hatch.time.strftime("%Y", None)) > 2000
+            assert (
+                escape_hatch.time.strftime(
+                    format="%Y", t=time.gmtime(EPOCH_PLUS_ONE_YEAR)
+                )
+                == "1971"
+            )
+            assert escape_hatch.datetime.datetime.now(tz=dt.timezone.utc).year > 2000
+
+    @py_have_clock_gettime
+    def test_clock_gettime_keyword(self):
+        escape_hatch = time_machine.escape_hatch
+
+        with time_machine.travel(EPOCH):
+            assert escape_hatch.time.clock_gettime(clk_id=time.CLOCK_REALTIME) > 1e9
+            assert escape_hatch.time.clock_gettime_ns(clk_id=time.CLOCK_REALTIME) > 1e18
+
     def test_date_today(self):
         real_today = dt.date.today()
 